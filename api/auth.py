@@ -1,47 +1,89 @@
+import hashlib
 import logging
+import time
 import uuid
 from datetime import datetime, timedelta, timezone
-from typing import Annotated, Any, Literal
+from functools import lru_cache
+from typing import Annotated, Any, Literal, NamedTuple
 
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
-from psycopg import AsyncConnection
 
+from .cache import TTLCache
 from .config import get_jwt_settings
-from .db import connect_to_db
-from .exceptions import credentials_exception, token_exception
-from .repositories.users import UserRow
-from .security import verify_password
+from .db import DbConnection, connect_to_db
+from .exceptions import (
+    credentials_exception,
+    token_exception,
+    user_not_confirmed_exception,
+)
+from .repositories.users import UserAuthRow, UserRow
+from .security import verify_and_update_password_async
 from .services import users as user_service
+from .throttle import get_login_throttle
+from .token_epochs import get_token_epochs
 from .utils import log_async_func, log_func
 
 logger = logging.getLogger(__name__)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/v1/auth/token")
 
 
+class TokenUser(NamedTuple):
+    """User model built from verified access token claims."""
+
+    id: uuid.UUID
+    confirmed: bool
+
+
+CurrentUser = UserRow | UserAuthRow | TokenUser
+
+
 @log_async_func(logger.debug)
 async def authenticate_user(
-    db_conn: AsyncConnection, email: str, password: str
-) -> dict[str, Any]:
-    """Authenticate user.
+    db_conn: DbConnection, email: str, password: str
+) -> UserRow:
+    """Authenticate user, rehash password if hashed with outdated parameters.
 
     Args:
         db_conn: database connection
         email: email to authenticate
         password: password corresponding to the email
 
-    Returns: user dict
+    Returns: user row
 
     Raises:
-        HTTPException: if user is not found in the database or password mismatch.
+        HTTPException: if login is throttled, user is not found in the database
+            or password mismatch.
     """
+    login_throttle = get_login_throttle()
+    await login_throttle.check(email)
     user = await user_service.select_by_email(db_conn, email)
 
-    if user is None or not verify_password(password, user.password_hash):
+    if user is None:
+        await login_throttle.failure(email)
         raise credentials_exception
 
+    verified, updated_password_hash = await verify_and_update_password_async(
+        password, user.password_hash
+    )
+
+    if not verified:
+        await login_throttle.failure(email)
+        raise credentials_exception
+
+    await login_throttle.success(email)
+
+    if updated_password_hash is not None:
+        logger.info("Password hash outdated, rehashing.")
+        user = (
+            await user_service.update_password_hash(
+                db_conn, user.id, updated_password_hash
+            )
+            or user
+        )
+
     return user
 
 
@@ -65,17 +107,38 @@ def _create_jwt_token(data: dict[str, Any], expires_delta: timedelta) -> str:
 
 @log_func(logger.debug)
 def create_access_token(
-    user_id: uuid.UUID, expires_delta: timedelta = timedelta(minutes=15)
+    user_id: uuid.UUID,
+    expires_delta: timedelta = timedelta(minutes=15),
+    *,
+    confirmed: bool | None = None,
+    epoch: int | None = None,
 ) -> str:
     """Create access token.
 
+    Tokens with claims trusted by stateless mode expire within
+    stateless_token_expire_minutes, as their revocation is not shared by workers.
+
     Args:
         user_id: user id to be encoded
         expires_delta: expire period of token
+        confirmed: user confirmed flag to be encoded, used by stateless mode
+        epoch: user token epoch to be encoded, used by stateless mode
 
     Returns: encoded JWT token
     """
-    return _create_jwt_token({"type": "access", "sub": str(user_id)}, expires_delta)
+    data: dict[str, Any] = {"type": "access", "sub": str(user_id)}
+
+    if confirmed is not None and epoch is not None:
+        data |= {"confirmed": confirmed, "epoch": epoch}
+        jwt_settings = get_jwt_settings()
+
+        if jwt_settings.stateless:
+            expires_delta = min(
+                expires_delta,
+                timedelta(minutes=jwt_settings.stateless_token_expire_minutes),
+            )
+
+    return _create_jwt_token(data, expires_delta)
 
 
 @log_func(logger.debug)
@@ -95,15 +158,31 @@ def create_confirmation_token(
     )
 
 
-def get_sub(token: str, typ: Literal["access", "confirmation"]) -> str:
-    """Get subject from JWT token.
+@lru_cache
+def get_tokens_cache() -> TTLCache[bytes, dict[str, Any]]:
+    """Lazy init cache of verified token payloads keyed by token digest."""
+    jwt_settings = get_jwt_settings()
+    return TTLCache(jwt_settings.cache_maxsize, ttl=0)
+
+
+def _decode_jwt_token(token: str) -> dict[str, Any]:
+    """Decode and verify JWT token, cache the payload until the token expires.
 
     Args:
         token: encoded JWT token
-        typ: token type, either access or confirmation
 
-    Returns: decoded user id
+    Returns: decoded token payload, must not be mutated
+
+    Raises:
+        HTTPException: if token is invalid or expired.
     """
+    tokens_cache = get_tokens_cache()
+    key = hashlib.sha256(token.encode()).digest()
+    payload = tokens_cache.get(key)
+
+    if payload is not None:
+        return payload
+
     jwt_settings = get_jwt_settings()
     try:
         payload = jwt.decode(
@@ -113,32 +192,59 @@ def get_sub(token: str, typ: Literal["access", "confirmation"]) -> str:
     except InvalidTokenError as e:
         raise token_exception from e
 
-    user_id = payload.get("sub")
+    if isinstance(payload.get("exp"), int):
+        tokens_cache.set(key, payload, ttl=payload["exp"] - time.time())
+
+    return payload
+
+
+def get_payload(token: str, typ: Literal["access", "confirmation"]) -> dict[str, Any]:
+    """Get verified payload from JWT token.
+
+    Args:
+        token: encoded JWT token
+        typ: token type, either access or confirmation
+
+    Returns: decoded token payload
 
-    if user_id is None or payload.get("type") != typ:
+    Raises:
+        HTTPException: if token is invalid, expired, of other type or without sub.
+    """
+    payload = _decode_jwt_token(token)
+
+    if payload.get("sub") is None or payload.get("type") != typ:
         raise token_exception
 
-    return user_id
+    return payload
 
 
-@log_async_func(logger.debug)
-async def get_current_user(
-    db_conn: Annotated[AsyncConnection, Depends(connect_to_db)],
-    token: Annotated[str, Depends(oauth2_scheme)],
-) -> UserRow:
-    """Get current user from token.
+def get_sub(token: str, typ: Literal["access", "confirmation"]) -> str:
+    """Get subject from JWT token.
+
+    Args:
+        token: encoded JWT token
+        typ: token type, either access or confirmation
+
+    Returns: decoded user id
+    """
+    return get_payload(token, typ)["sub"]
+
+
+async def _select_current_user(
+    db_conn: DbConnection, user_id: str
+) -> UserRow | UserAuthRow:
+    """Select current user from the database and record its token epoch.
 
     Args:
         db_conn: database connection
-        token: JWT token with encoded email
+        user_id: decoded user id
 
-    Returns: user row
+    Returns: user row or user auth row
 
     Raises:
         HTTPException: if user is not found in the database.
     """
-    user_id = get_sub(token, typ="access")
-    user = await user_service.select_by_id(db_conn, user_id)
+    user = await user_service.select_auth_by_id(db_conn, user_id)
 
     if user is None:
         raise HTTPException(
@@ -146,28 +252,112 @@ async def get_current_user(
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    get_token_epochs().set(user.id, user.token_epoch)
     return user
 
 
+@log_async_func(logger.debug)
+async def get_current_user(
+    db_conn: Annotated[DbConnection, Depends(connect_to_db)],
+    token: Annotated[str, Depends(oauth2_scheme)],
+) -> UserRow | UserAuthRow:
+    """Get current user from token.
+
+    Args:
+        db_conn: database connection
+        token: JWT token with encoded email
+
+    Returns: user row or user auth row
+
+    Raises:
+        HTTPException: if user is not found in the database.
+    """
+    user_id = get_sub(token, typ="access")
+    return await _select_current_user(db_conn, user_id)
+
+
+@log_async_func(logger.debug)
+async def get_current_token_user(
+    db_conn: Annotated[DbConnection, Depends(connect_to_db)],
+    token: Annotated[str, Depends(oauth2_scheme)],
+) -> CurrentUser:
+    """Get current user from token claims, if stateless mode is on.
+
+    Confirmed users with a fresh token epoch and a short-lived token are trusted
+    without database lookup, otherwise the user is selected from the database.
+
+    Args:
+        db_conn: database connection
+        token: JWT token with encoded user id
+
+    Returns: token user or user row
+
+    Raises:
+        HTTPException: if token is invalid or user is not found in the database.
+    """
+    payload = get_payload(token, typ="access")
+    user_id = payload["sub"]
+    epoch = payload.get("epoch")
+    jwt_settings = get_jwt_settings()
+
+    if (
+        jwt_settings.stateless
+        and payload.get("confirmed") is True
+        and isinstance(epoch, int)
+        and not get_token_epochs().is_stale(user_id, epoch)
+        # long-lived tokens could outlive revocation, which is per worker only
+        and payload["exp"] - time.time()
+        <= jwt_settings.stateless_token_expire_minutes * 60
+    ):
+        try:
+            return TokenUser(id=uuid.UUID(user_id), confirmed=True)
+
+        except ValueError as e:
+            raise token_exception from e
+
+    return await _select_current_user(db_conn, user_id)
+
+
 @log_async_func(logger.debug)
 async def get_current_confirmed_user(
-    current_user: Annotated[UserRow, Depends(get_current_user)],
-) -> UserRow:
+    current_user: Annotated[CurrentUser, Depends(get_current_token_user)],
+) -> CurrentUser:
     """Get current user from token.
 
     Args:
         current_user: current authorized user
 
-    Returns: user row
+    Returns: token user or user row
 
     Raises:
         HTTPException: if user is not confirmed.
     """
     if current_user.confirmed is not True:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not confirmed",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise user_not_confirmed_exception
 
     return current_user
+
+
+@log_async_func(logger.debug)
+async def get_current_user_id(
+    token: Annotated[str, Depends(oauth2_scheme)],
+) -> uuid.UUID:
+    """Get current user id from token without database lookup.
+
+    The user is not checked, queries using it have to check the user is confirmed,
+    see the *_if_confirmed location repository methods.
+
+    Args:
+        token: JWT token with encoded user id
+
+    Returns: user id
+
+    Raises:
+        HTTPException: if token is invalid.
+    """
+    try:
+        return uuid.UUID(get_sub(token, typ="access"))
+
+    except ValueError as e:
+        raise token_exception from e
@@ -1,16 +1,23 @@
+import asyncio
+import json
 import logging
 from functools import lru_cache
-from typing import Any, Callable
+from typing import Any
 
+import httpx
 from boto3 import Session
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
 from botocore.client import BaseClient
-from botocore.exceptions import ClientError
+from botocore.credentials import Credentials
 
 from .config import get_aws_settings
-from .utils import log_func
+from .utils import log_async_func
 
 logger = logging.getLogger(__name__)
 
+SES_SOURCE = "lukin.kratas@seznam.cz"  # must be verified
+
 
 @lru_cache
 def get_session() -> BaseClient:
@@ -23,13 +30,6 @@ def get_session() -> BaseClient:
     )
 
 
-@lru_cache
-def get_ses_client() -> BaseClient:
-    """Lazy init ses client."""
-    session = get_session()
-    return session.client("ses")
-
-
 @lru_cache
 def get_logs_client() -> BaseClient:
     """Lazy init cloudwatch logs client."""
@@ -37,25 +37,106 @@ def get_logs_client() -> BaseClient:
     return session.client("logs")
 
 
-def _request(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
-    """Wrap boto function in try-except block."""
-    try:
-        response = func(*args, **kwargs)
+class SesClient:
+    """Async SES v2 client with reused connections and bounded concurrency."""
+
+    def __init__(
+        self,
+        access_key_id: str,
+        secret_access_key: str,
+        region_name: str,
+        endpoint_url: str | None = None,
+        max_concurrency: int = 10,
+        timeout: float = 10.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        endpoint_url = endpoint_url or f"https://email.{region_name}.amazonaws.com"
+        self.url = f"{endpoint_url.rstrip('/')}/v2/email/outbound-emails"
+        self.signer = SigV4Auth(
+            Credentials(access_key_id, secret_access_key), "ses", region_name
+        )
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+            transport=transport,
+        )
+
+    def _sign(self, body: bytes) -> dict[str, str]:
+        """Get SigV4 signed headers for the send email request."""
+        aws_request = AWSRequest(
+            method="POST",
+            url=self.url,
+            data=body,
+            headers={"Content-Type": "application/json"},
+        )
+        self.signer.add_auth(aws_request)
+        return dict(aws_request.headers.items())
+
+    async def send_email(
+        self, source: str, to_addresses: list[str], message: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Send email, waiting for a free slot if max concurrency is reached.
+
+        Args:
+            source: verified sender email address
+            to_addresses: recipient email addresses
+            message: simple message content with Subject and Body
+
+        Returns: SES response with MessageId
 
-    except ClientError as e:
-        logging.error(e)
-        raise e
+        Raises:
+            httpx.HTTPError: if SES is unreachable or rejects the email.
+        """
+        body = json.dumps(
+            {
+                "FromEmailAddress": source,
+                "Destination": {"ToAddresses": to_addresses},
+                "Content": {"Simple": message},
+            }
+        ).encode()
 
-    return response
+        async with self.semaphore:
+            response = await self.client.post(
+                self.url, content=body, headers=self._sign(body)
+            )
 
+        if response.is_error:
+            logger.error(f"SES error: {response.status_code} {response.text}")
+            response.raise_for_status()
 
-@log_func(logger.debug)
-def ses_send_email(email: str, message: dict[str, Any]) -> str:
-    """Send email via SES service."""
-    ses_client = get_ses_client()
-    return _request(
-        ses_client.send_email,
-        Source="lukin.kratas@seznam.cz",  # must be verified
-        Destination={"ToAddresses": [email]},
-        Message=message,
+        return response.json()
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        await self.client.aclose()
+
+
+@lru_cache
+def get_ses_client() -> SesClient:
+    """Lazy init async ses client."""
+    aws_settings = get_aws_settings()
+    return SesClient(
+        access_key_id=aws_settings.access_key_id,
+        secret_access_key=aws_settings.secret_access_key,
+        region_name=aws_settings.region_name,
+        endpoint_url=aws_settings.ses_endpoint_url,
+        max_concurrency=aws_settings.ses_max_concurrency,
+        timeout=aws_settings.ses_timeout,
     )
+
+
+async def close_ses_client() -> None:
+    """Close async ses client, if it was initialized."""
+    if get_ses_client.cache_info().currsize:
+        await get_ses_client().close()
+        get_ses_client.cache_clear()
+
+
+@log_async_func(logger.debug)
+async def ses_send_email(email: str, message: dict[str, Any]) -> dict[str, Any]:
+    """Send email via SES service without blocking the event loop."""
+    return await get_ses_client().send_email(SES_SOURCE, [email], message)
@@ -0,0 +1,79 @@
+"""In-process caches with bounded size and time to live eviction."""
+
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Bounded LRU cache, which evicts entries after time to live."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: K) -> V | None:
+        """Get cached value.
+
+        Args:
+            key: cache key
+
+        Returns: cached value, None if missing or expired
+        """
+        entry = self.entries.get(key)
+
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self.entries[key]
+
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """Cache value, evicting the least recently used entry if full.
+
+        Args:
+            key: cache key
+            value: value to be cached
+            ttl: time to live of this entry in seconds, defaults to cache ttl
+        """
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self.entries[key] = (expires_at, value)
+        self.entries.move_to_end(key)
+
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        """Invalidate cached value.
+
+        Args:
+            key: cache key
+        """
+        self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Invalidate all cached values."""
+        self.entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return cache size and hit/miss counters."""
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,98 @@
+"""Calibrate argon2 cost parameters to the target password verification time.
+
+Benchmarks argon2 on this host, increasing time cost until the target is met,
+and prints the settings to be put into .env. Stored password hashes with old
+parameters are rehashed on the next successful login.
+
+Usage: uv run python -m api.calibrate --target-ms 250
+"""
+
+import argparse
+import time
+from typing import NamedTuple
+
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from .config import get_hashing_settings
+
+PASSWORD = "calibration-password"
+
+
+class Calibration(NamedTuple):
+    """Calibrated argon2 cost parameters."""
+
+    time_cost: int
+    memory_cost: int
+    parallelism: int
+    verify_ms: float
+
+
+def measure_verify_ms(hasher: Argon2Hasher, rounds: int) -> float:
+    """Measure mean password verification time.
+
+    Args:
+        hasher: argon2 hasher with cost parameters being measured
+        rounds: number of verifications to average
+
+    Returns: mean verification time in milliseconds
+    """
+    password_hash = hasher.hash(PASSWORD)
+    start = time.perf_counter()
+
+    for _ in range(rounds):
+        hasher.verify(PASSWORD, password_hash)
+
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def calibrate(
+    target_ms: float,
+    memory_cost: int,
+    parallelism: int,
+    rounds: int = 5,
+    max_time_cost: int = 100,
+) -> Calibration:
+    """Find the lowest time cost, which meets the target verification time.
+
+    Args:
+        target_ms: target verification time in milliseconds
+        memory_cost: fixed argon2 memory cost in KiB
+        parallelism: fixed argon2 parallelism
+        rounds: number of verifications to average per time cost
+        max_time_cost: upper bound of time cost
+
+    Returns: calibrated cost parameters
+    """
+    for time_cost in range(1, max_time_cost + 1):
+        hasher = Argon2Hasher(
+            time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+        )
+        verify_ms = measure_verify_ms(hasher, rounds)
+
+        if verify_ms >= target_ms:
+            break
+
+    return Calibration(time_cost, memory_cost, parallelism, verify_ms)
+
+
+def main() -> None:
+    """Run calibration and print resulting settings."""
+    hashing_settings = get_hashing_settings()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--memory-cost", type=int, default=hashing_settings.memory_cost)
+    parser.add_argument("--parallelism", type=int, default=hashing_settings.parallelism)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    calibration = calibrate(
+        args.target_ms, args.memory_cost, args.parallelism, args.rounds
+    )
+    print(f"# argon2 verify takes {calibration.verify_ms:.1f} ms on this host")
+    print(f"HASHING_TIME_COST={calibration.time_cost}")
+    print(f"HASHING_MEMORY_COST={calibration.memory_cost}")
+    print(f"HASHING_PARALLELISM={calibration.parallelism}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -19,6 +20,35 @@ class DbSettings(BaseSettings):
     password: str
     host: str = "postgres"
     port: int = 5432
+    # server-side prepared statements, disable for transaction-mode poolers
+    # without prepared statements support (e.g. pgbouncer < 1.21)
+    prepared_statements: bool = True
+    # executions of a query on a connection before it gets prepared
+    prepare_threshold: int = 5
+    # run single-statement writes in autocommit, saving BEGIN/COMMIT round trips
+    autocommit_single_statements: bool = True
+    # transfer query results in binary format, skipping text parsing of
+    # UUID and timestamptz columns on every row
+    binary_results: bool = False
+    # connection pool, max_size defaults to min_size
+    pool_min_size: int = 4
+    pool_max_size: int | None = None
+    pool_max_lifetime: float = 3600.0
+    pool_max_idle: float = 600.0
+    pool_timeout: float = 30.0  # max wait for a connection from the pool
+    pool_max_waiting: int = 0  # max requests waiting for a connection, 0 unlimited
+    # max wait for min_size connections at startup, 0 skips the warm-up
+    pool_warmup_timeout: float = 30.0
+    # optional read replica for read-only queries, same credentials as primary
+    replica_host: str | None = None
+    replica_port: int | None = None  # defaults to port
+    # keep a user's reads on primary for a window after their write, per worker
+    read_your_writes: bool = False
+    read_your_writes_window: float = 5.0
+    # session parameters, set once per new connection
+    application_name: str = "zapis-stavy-api"
+    statement_timeout: int = 30_000  # ms, 0 disables
+    jit: bool = False
 
     model_config = SettingsConfigDict(env_file=".env", env_prefix="DB_", extra="ignore")
 
@@ -28,6 +58,13 @@ class JwtSettings(BaseSettings):
 
     secret_key: str
     algorithm: str = "HS256"
+    stateless: bool = False
+    # revocation of stateless tokens is per worker, keep them short-lived,
+    # longer-lived tokens are checked against the database
+    stateless_token_expire_minutes: int = 5
+    epochs_maxsize: int = 10_000
+    cache_maxsize: int = 1024
+    refresh_token_expire_days: int = 30
 
     model_config = SettingsConfigDict(
         env_file=".env", env_prefix="JWT_", extra="ignore"
@@ -40,12 +77,126 @@ class AwsSettings(BaseSettings):
     access_key_id: str
     secret_access_key: str
     region_name: str
+    # e.g. http://localhost:4579 for local stand-in: uvicorn api.ses_local:app
+    ses_endpoint_url: str | None = None
+    ses_max_concurrency: int = 10
+    ses_timeout: float = 10.0
 
     model_config = SettingsConfigDict(
         env_file=".env", env_prefix="AWS_", extra="ignore"
     )
 
 
+class HashingSettings(BaseSettings):
+    """Password hashing settings."""
+
+    workers: int = 2
+    max_pending: int = 32
+    # workers are not forked from the multithreaded app process
+    start_method: Literal["forkserver", "spawn"] = "forkserver"
+    # argon2 cost parameters, calibrate via: python -m api.calibrate
+    time_cost: int = 3
+    memory_cost: int = 65536  # KiB
+    parallelism: int = 4
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_prefix="HASHING_", extra="ignore"
+    )
+
+
+class CacheSettings(BaseSettings):
+    """In-process cache settings."""
+
+    users_maxsize: int = 1024
+    users_ttl: float = 30.0
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_prefix="CACHE_", extra="ignore"
+    )
+
+
+class ThrottleSettings(BaseSettings):
+    """Login throttling settings."""
+
+    maxsize: int = 100_000
+    threshold: int = 5
+    # whole seconds, limits storage passes expiry to redis EXPIRE
+    base_delay: int = 1
+    max_delay: int = 900
+    window: int = 3600
+    # limits async storage shared across workers, e.g. async+redis://redis:6379
+    storage_uri: str | None = None
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_prefix="LOGIN_THROTTLE_", extra="ignore"
+    )
+
+
+class OutboxSettings(BaseSettings):
+    """Email outbox worker settings."""
+
+    enabled: bool = True
+    batch_size: int = 50
+    # SES max send rate per second, split it among processes running the worker
+    send_rate: float = 14.0
+    max_attempts: int = 8
+    base_delay: float = 30.0
+    max_delay: float = 3600.0
+    lease: float = 300.0
+    poll_interval: float = 1.0
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_prefix="OUTBOX_", extra="ignore"
+    )
+
+
+class MaintenanceSettings(BaseSettings):
+    """Maintenance worker settings."""
+
+    enabled: bool = True
+    # seconds between purges of expired rows
+    interval: float = 3600.0
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_prefix="MAINTENANCE_", extra="ignore"
+    )
+
+
+class MetricsSettings(BaseSettings):
+    """Internal metrics endpoint settings."""
+
+    enabled: bool = False
+    # bearer token required by the endpoint, it stays disabled without one
+    token: str | None = None
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_prefix="METRICS_", extra="ignore"
+    )
+
+
+class PaginationSettings(BaseSettings):
+    """Pagination settings."""
+
+    page_size: int = 50
+    max_page_size: int = 500
+    # rows fetched per round trip from server-side cursor when streaming
+    stream_chunk_size: int = 1000
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_prefix="PAGINATION_", extra="ignore"
+    )
+
+
+class BulkSettings(BaseSettings):
+    """Bulk endpoints settings."""
+
+    max_items: int = 1000
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_prefix="BULK_", extra="ignore"
+    )
+
+
 @lru_cache
 def get_settings() -> Settings:
     """Lazy init app settings."""
@@ -68,3 +219,51 @@ def get_jwt_settings() -> JwtSettings:
 def get_aws_settings() -> AwsSettings:
     """Lazy init aws settings."""
     return AwsSettings()
+
+
+@lru_cache
+def get_hashing_settings() -> HashingSettings:
+    """Lazy init password hashing settings."""
+    return HashingSettings()
+
+
+@lru_cache
+def get_cache_settings() -> CacheSettings:
+    """Lazy init cache settings."""
+    return CacheSettings()
+
+
+@lru_cache
+def get_throttle_settings() -> ThrottleSettings:
+    """Lazy init login throttling settings."""
+    return ThrottleSettings()
+
+
+@lru_cache
+def get_outbox_settings() -> OutboxSettings:
+    """Lazy init email outbox worker settings."""
+    return OutboxSettings()
+
+
+@lru_cache
+def get_maintenance_settings() -> MaintenanceSettings:
+    """Lazy init maintenance settings."""
+    return MaintenanceSettings()
+
+
+@lru_cache
+def get_metrics_settings() -> MetricsSettings:
+    """Lazy init internal metrics endpoint settings."""
+    return MetricsSettings()
+
+
+@lru_cache
+def get_pagination_settings() -> PaginationSettings:
+    """Lazy init pagination settings."""
+    return PaginationSettings()
+
+
+@lru_cache
+def get_bulk_settings() -> BulkSettings:
+    """Lazy init bulk endpoints settings."""
+    return BulkSettings()
@@ -1,41 +1,308 @@
 import logging
+import time
+import uuid
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from functools import lru_cache
+from typing import Any, AsyncGenerator
 
 from fastapi import Request
-from psycopg import AsyncConnection
+from psycopg import AsyncConnection, AsyncCursor, AsyncTransaction, pq
 from psycopg.conninfo import make_conninfo
 from psycopg_pool import AsyncConnectionPool
 
+from .cache import TTLCache
 from .config import get_db_settings
+from .metrics import get_metrics
 
 logger = logging.getLogger(__name__)
 
 
-def get_conn_info() -> str:
-    """Return connection info as string for psycopg database connection."""
+def get_conn_info(replica: bool = False) -> str:
+    """Return connection info as string for psycopg database connection.
+
+    Args:
+        replica: whether to connect to the read replica instead of primary
+
+    Returns: connection info
+    """
     db_settings = get_db_settings()
     return make_conninfo(
         dbname=db_settings.name,
         user=db_settings.username,
         password=db_settings.password,
-        host=db_settings.host,
-        port=db_settings.port,
+        host=db_settings.replica_host if replica else db_settings.host,
+        port=(db_settings.replica_port or db_settings.port)
+        if replica
+        else db_settings.port,
+    )
+
+
+def get_conn_kwargs() -> dict[str, Any]:
+    """Return keyword arguments for psycopg database connection."""
+    db_settings = get_db_settings()
+    return dict(
+        prepare_threshold=db_settings.prepare_threshold
+        if db_settings.prepared_statements
+        else None
+    )
+
+
+def get_prepare() -> bool:
+    """Return prepare argument for execution of hot path queries.
+
+    Returns: True to prepare the query on its first execution,
+        False if prepared statements are disabled
+    """
+    return get_db_settings().prepared_statements
+
+
+def get_binary() -> bool:
+    """Return binary argument for repository cursors.
+
+    Returns: True to transfer results in binary format, parsed without text
+        conversion (notably UUID and timestamptz columns), False for text
+    """
+    return get_db_settings().binary_results
+
+
+async def configure_connection(conn: AsyncConnection) -> None:
+    """Set session parameters once per new pooled connection, not per query.
+
+    Args:
+        conn: new database connection
+    """
+    db_settings = get_db_settings()
+    await conn.execute(
+        """
+        SELECT
+            set_config('application_name', %(application_name)s, false),
+            set_config('statement_timeout', %(statement_timeout)s, false),
+            set_config('jit', %(jit)s, false);
+        """,
+        dict(
+            application_name=db_settings.application_name,
+            statement_timeout=str(db_settings.statement_timeout),
+            jit="on" if db_settings.jit else "off",
+        ),
+    )
+    # pool requires the configured connection to be idle
+    await conn.commit()
+
+
+def get_pool_kwargs() -> dict[str, Any]:
+    """Return keyword arguments for the connection pool."""
+    db_settings = get_db_settings()
+    return dict(
+        min_size=db_settings.pool_min_size,
+        max_size=db_settings.pool_max_size,
+        max_lifetime=db_settings.pool_max_lifetime,
+        max_idle=db_settings.pool_max_idle,
+        timeout=db_settings.pool_timeout,
+        max_waiting=db_settings.pool_max_waiting,
+        configure=configure_connection,
     )
 
 
 @asynccontextmanager
-async def create_connection_pool() -> AsyncGenerator[AsyncConnectionPool, None]:
-    """Create connection pool."""
-    async with AsyncConnectionPool(conninfo=get_conn_info()) as pool:
-        logger.info("New connection pool created.")
+async def create_connection_pool(
+    replica: bool = False,
+) -> AsyncGenerator[AsyncConnectionPool, None]:
+    """Create connection pool and wait for min_size connections to be ready.
+
+    Args:
+        replica: whether to connect to the read replica instead of primary
+
+    Raises:
+        PoolTimeout: if min_size connections are not ready in warm-up timeout.
+    """
+    async with AsyncConnectionPool(
+        conninfo=get_conn_info(replica),
+        kwargs=get_conn_kwargs(),
+        name="replica" if replica else "primary",
+        **get_pool_kwargs(),
+    ) as pool:
+        warmup_timeout = get_db_settings().pool_warmup_timeout
+
+        if warmup_timeout > 0:
+            await pool.wait(timeout=warmup_timeout)
+
+        logger.info(f"New connection pool created: {pool.get_stats()}.")
         yield pool
         logger.info("Connection pool closed.")
 
 
-async def connect_to_db(request: Request) -> AsyncGenerator[AsyncConnection, None]:
-    """Create connection in connection pool."""
-    async with request.app.state.pool.connection() as conn:
-        logger.info("New DB connection established.")
-        yield conn
-        logger.info("DB connection closed.")
+@asynccontextmanager
+async def create_replica_pool() -> AsyncGenerator[AsyncConnectionPool | None, None]:
+    """Create read replica connection pool, None if replica is not configured."""
+    if get_db_settings().replica_host is None:
+        yield None
+        return
+
+    async with create_connection_pool(replica=True) as pool:
+        yield pool
+
+
+class LazyConnection:
+    """Database connection handle, which checks out pooled connection on first use.
+
+    The pooled connection is held only for the outermost cursor or transaction
+    scope and returned to the pool right after it, so a request does not hold
+    a connection while decoding tokens, validating or serializing.
+    """
+
+    def __init__(
+        self,
+        pool: AsyncConnectionPool,
+        replica_pool: AsyncConnectionPool | None = None,
+    ) -> None:
+        self.pool = pool
+        self.replica_pool = replica_pool
+        self.conn: AsyncConnection | None = None
+        self._replica: LazyConnection | None = None
+
+    def replica(self) -> "LazyConnection":
+        """Get handle for read-only queries, on the read replica if configured.
+
+        Reads inside a scope already holding primary connection stay on it.
+        """
+        if self.replica_pool is None or self.conn is not None:
+            return self
+
+        if self._replica is None:
+            self._replica = LazyConnection(self.replica_pool)
+
+        return self._replica
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncGenerator[AsyncConnection, None]:
+        """Hold pooled connection for the scope, reusing it in nested scopes.
+
+        On the outermost scope exit, the transaction is committed (rolled back
+        on error) and the connection is returned to the pool.
+        """
+        if self.conn is not None:
+            yield self.conn
+            return
+
+        start = time.perf_counter()
+
+        async with self.pool.connection() as conn:
+            get_metrics().pool_wait.observe((time.perf_counter() - start) * 1000)
+            logger.debug("DB connection checked out.")
+            self.conn = conn
+
+            try:
+                yield conn
+
+            finally:
+                self.conn = None
+                logger.debug("DB connection returned.")
+
+    @asynccontextmanager
+    async def autocommit(self) -> AsyncGenerator[AsyncConnection, None]:
+        """Hold pooled connection in autocommit mode for the scope.
+
+        Inside a scope already holding the connection, its transaction is kept.
+        """
+        if self.conn is not None:
+            yield self.conn
+            return
+
+        async with self.connection() as conn:
+            await conn.set_autocommit(True)
+
+            try:
+                yield conn
+
+            finally:
+                # broken or cancelled mid-statement connection can not be reset,
+                # the pool discards it on return
+                if conn.info.transaction_status == pq.TransactionStatus.IDLE:
+                    await conn.set_autocommit(False)
+
+    @asynccontextmanager
+    async def transaction(
+        self, *args: Any, **kwargs: Any
+    ) -> AsyncGenerator[AsyncTransaction, None]:
+        """Open transaction on the pooled connection, see AsyncConnection."""
+        async with self.connection() as conn, conn.transaction(*args, **kwargs) as tx:
+            yield tx
+
+    @asynccontextmanager
+    async def cursor(
+        self, *args: Any, **kwargs: Any
+    ) -> AsyncGenerator[AsyncCursor[Any], None]:
+        """Open cursor on the pooled connection, see AsyncConnection."""
+        async with self.connection() as conn, conn.cursor(*args, **kwargs) as cur:
+            yield cur
+
+
+DbConnection = AsyncConnection | LazyConnection
+
+
+@asynccontextmanager
+async def single_statement(db_conn: DbConnection) -> AsyncGenerator[None, None]:
+    """Scope of a single write statement.
+
+    The statement is atomic on its own, so it runs in autocommit without
+    BEGIN and COMMIT round trips, if enabled. Otherwise, or on a plain
+    connection, it runs in a transaction (savepoint, if nested) as before.
+    Multi-statement flows have to use db_conn.transaction() instead.
+
+    Args:
+        db_conn: database connection
+    """
+    if isinstance(db_conn, LazyConnection) and (
+        get_db_settings().autocommit_single_statements
+    ):
+        async with db_conn.autocommit():
+            yield
+
+    else:
+        async with db_conn.transaction():
+            yield
+
+
+@lru_cache
+def get_recent_writes() -> TTLCache[str, bool]:
+    """Lazy init registry of users, who wrote within read-your-writes window."""
+    db_settings = get_db_settings()
+    return TTLCache(
+        maxsize=100_000 if db_settings.read_your_writes else 0,
+        ttl=db_settings.read_your_writes_window,
+    )
+
+
+def record_write(user_id: uuid.UUID | str) -> None:
+    """Record write of a user, so their reads stay on primary for a while.
+
+    Args:
+        user_id: id of the user, who wrote
+    """
+    get_recent_writes().set(str(user_id), True)
+
+
+def read_only(
+    db_conn: DbConnection, user_id: uuid.UUID | str | None = None
+) -> DbConnection:
+    """Route read-only queries of a user to the read replica.
+
+    Args:
+        db_conn: database connection
+        user_id: id of the user, whose data are read, None skips read-your-writes
+
+    Returns: replica handle, or db_conn itself if replica is not configured,
+        or the user wrote within read-your-writes window
+    """
+    if not isinstance(db_conn, LazyConnection):
+        return db_conn
+
+    if user_id is not None and get_recent_writes().get(str(user_id)):
+        return db_conn
+
+    return db_conn.replica()
+
+
+async def connect_to_db(request: Request) -> LazyConnection:
+    """Hand out lazy handle, checking out pooled connection only when used."""
+    return LazyConnection(request.app.state.pool, request.app.state.replica_pool)
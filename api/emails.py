@@ -0,0 +1,97 @@
+"""Email messages in SES format, rendered from templates by kind and params.
+
+Templates are loaded and compiled once, each kind of email consists of
+templates/emails/<kind>.subject.txt and templates/emails/<kind>.html with
+$param placeholders. Parts without placeholders are prebuilt, so rendering
+costs only the substitution of the dynamic parts.
+"""
+
+import html
+from functools import lru_cache
+from pathlib import Path
+from string import Template
+from typing import Any, Callable
+
+TEMPLATES_DIR = Path(__file__).parent / "templates" / "emails"
+CHARSET = "UTF-8"
+
+
+def _compile_part(
+    text: str, escape: bool = False
+) -> Callable[[dict[str, Any]], dict[str, str]]:
+    """Compile template text into a function rendering SES message part.
+
+    Args:
+        text: template text with $param placeholders
+        escape: whether to html escape the params
+
+    Returns: function rendering the message part from params
+    """
+    template = Template(text)
+    has_placeholders = any(
+        match.group("named") or match.group("braced")
+        for match in template.pattern.finditer(text)
+    )
+
+    if not has_placeholders:
+        static_part = {"Data": template.substitute(), "Charset": CHARSET}
+        return lambda params: static_part
+
+    def render(params: dict[str, Any]) -> dict[str, str]:
+        if escape:
+            params = {key: html.escape(str(value)) for key, value in params.items()}
+
+        return {"Data": template.substitute(params), "Charset": CHARSET}
+
+    return render
+
+
+class EmailTemplate:
+    """Compiled email template."""
+
+    def __init__(self, subject: str, html_body: str) -> None:
+        self.render_subject = _compile_part(subject.strip())
+        self.render_html = _compile_part(html_body, escape=True)
+
+    def render(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Render SES message.
+
+        Args:
+            params: parameters substituted into the templates
+
+        Returns: SES message with subject and html body
+
+        Raises:
+            KeyError: if a param required by the templates is missing.
+        """
+        return {
+            "Subject": self.render_subject(params),
+            "Body": {"Html": self.render_html(params)},
+        }
+
+
+@lru_cache
+def get_email_templates() -> dict[str, EmailTemplate]:
+    """Lazy load and compile email templates keyed by kind of email."""
+    return {
+        html_path.stem: EmailTemplate(
+            subject=html_path.with_suffix(".subject.txt").read_text(),
+            html_body=html_path.read_text(),
+        )
+        for html_path in TEMPLATES_DIR.glob("*.html")
+    }
+
+
+def build_message(kind: str, params: dict[str, Any]) -> dict[str, Any]:
+    """Build email message of given kind.
+
+    Args:
+        kind: kind of email, e.g. confirmation
+        params: parameters rendered into the email
+
+    Returns: SES message with subject and body
+
+    Raises:
+        KeyError: if the kind of email is unknown or a param is missing.
+    """
+    return get_email_templates()[kind].render(params)
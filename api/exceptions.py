@@ -16,10 +16,20 @@ user_exists_exception = HTTPException(
     status_code=status.HTTP_409_CONFLICT, detail="User already exists"
 )
 
+user_not_confirmed_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="User not confirmed",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
 user_not_found_exception = HTTPException(
     status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
 )
 
+not_found_exception = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND, detail="Not Found"
+)
+
 location_exists_exception = HTTPException(
     status_code=status.HTTP_409_CONFLICT, detail="Location already exists"
 )
@@ -27,3 +37,13 @@ location_exists_exception = HTTPException(
 location_not_found_exception = HTTPException(
     status_code=status.HTTP_404_NOT_FOUND, detail="Location not found"
 )
+
+invalid_cursor_exception = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+)
+
+hashing_unavailable_exception = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Server busy, try again later",
+    headers={"Retry-After": "1"},
+)
@@ -11,13 +11,19 @@ from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi.util import get_remote_address
 
+from .aws import close_ses_client
 from .config import get_settings
-from .db import create_connection_pool
+from .db import create_connection_pool, create_replica_pool
+from .emails import get_email_templates
 from .logging_config import configure_logging
+from .maintenance import run_maintenance_worker
+from .outbox import run_email_outbox_worker
 from .routers.auth import router as auth_router
 from .routers.locations import router as locations_router
+from .routers.metrics import router as metrics_router
 from .routers.users import router as users_router
 from .schemas import BaseResponse
+from .security import get_hashing_pool, shutdown_hashing_pool
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -29,14 +35,24 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     configure_logging()
     logger.info("API setup")
 
+    # fail fast on broken templates, instead of in the outbox worker
+    get_email_templates()
+    # hashing workers are started by forkserver, not forked from this process
+    get_hashing_pool()
+
     app.state.limiter = Limiter(
         key_func=get_remote_address, default_limits=["5/second"]
     )
 
-    async with create_connection_pool() as pool:
+    async with create_connection_pool() as pool, create_replica_pool() as replica_pool:
         app.state.pool = pool
-        yield
+        app.state.replica_pool = replica_pool
+
+        async with run_email_outbox_worker(pool), run_maintenance_worker(pool):
+            yield
 
+    shutdown_hashing_pool()
+    await close_ses_client()
     logger.info("API teardown")
 
 
@@ -69,6 +85,7 @@ app.add_middleware(
 app.include_router(locations_router)
 app.include_router(users_router)
 app.include_router(auth_router)
+app.include_router(metrics_router)
 
 
 @app.exception_handler(HTTPException)
@@ -0,0 +1,71 @@
+"""Background worker purging expired rows, which nothing else deletes.
+
+Used refresh tokens are deleted on rotation, but expired ones stay in the table
+until purged here.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
+
+from psycopg_pool import AsyncConnectionPool
+
+from .config import get_maintenance_settings
+from .repositories.refresh_tokens import refresh_tokens_table
+
+logger = logging.getLogger(__name__)
+
+
+class MaintenanceWorker:
+    """Purges expired rows periodically."""
+
+    def __init__(self, pool: AsyncConnectionPool, interval: float) -> None:
+        self.pool = pool
+        self.interval = interval
+
+    async def purge_once(self) -> int:
+        """Purge expired refresh tokens.
+
+        Returns: number of purged refresh tokens
+        """
+        async with self.pool.connection() as conn, conn.transaction():
+            purged = await refresh_tokens_table.delete_expired(conn)
+
+        logger.info(f"Maintenance: {purged} expired refresh tokens purged.")
+        return purged
+
+    async def run(self) -> None:
+        """Purge expired rows every interval until cancelled."""
+        while True:
+            try:
+                await self.purge_once()
+
+            except Exception:
+                logger.exception("Maintenance worker failed.")
+
+            await asyncio.sleep(self.interval)
+
+
+@asynccontextmanager
+async def run_maintenance_worker(
+    pool: AsyncConnectionPool,
+) -> AsyncGenerator[asyncio.Task[None] | None, None]:
+    """Run maintenance worker in background task, if enabled."""
+    maintenance_settings = get_maintenance_settings()
+
+    if not maintenance_settings.enabled:
+        yield None
+        return
+
+    worker = MaintenanceWorker(pool, interval=maintenance_settings.interval)
+    task = asyncio.create_task(worker.run())
+    logger.info("Maintenance worker started.")
+
+    try:
+        yield task
+
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        logger.info("Maintenance worker stopped.")
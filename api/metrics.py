@@ -0,0 +1,140 @@
+"""In-process pool and query metrics, per worker.
+
+Collects pool connection wait times and per repository method query counts
+and latencies, reported together with the pool and in-process cache statistics.
+"""
+
+import bisect
+import inspect
+import time
+from functools import lru_cache, wraps
+from typing import Any, Callable
+
+from psycopg_pool import AsyncConnectionPool
+
+from .cache import TTLCache
+
+BUCKETS_MS = (1.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 5000.0)
+
+
+class Histogram:
+    """Histogram of durations in milliseconds."""
+
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS_MS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, duration_ms: float) -> None:
+        """Record duration.
+
+        Args:
+            duration_ms: duration in milliseconds
+        """
+        self.counts[bisect.bisect_left(self.buckets, duration_ms)] += 1
+        self.count += 1
+        self.total += duration_ms
+        self.max = max(self.max, duration_ms)
+
+    def stats(self) -> dict[str, Any]:
+        """Return count, mean, max and counts per bucket upper bound."""
+        bounds = [f"{bucket:g}" for bucket in self.buckets] + ["inf"]
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "max_ms": self.max,
+            "buckets": dict(zip(bounds, self.counts)),
+        }
+
+
+class Metrics:
+    """Pool wait and query latency metrics."""
+
+    def __init__(self) -> None:
+        self.pool_wait = Histogram()
+        self.queries: dict[str, Histogram] = {}
+
+    def observe_query(self, name: str, duration_ms: float) -> None:
+        """Record query duration.
+
+        Args:
+            name: repository method name, e.g. UsersTable.select_by_id
+            duration_ms: duration in milliseconds
+        """
+        histogram = self.queries.get(name)
+
+        if histogram is None:
+            histogram = self.queries[name] = Histogram()
+
+        histogram.observe(duration_ms)
+
+    def report(
+        self,
+        pool: AsyncConnectionPool,
+        replica_pool: AsyncConnectionPool | None = None,
+        caches: dict[str, TTLCache[Any, Any]] | None = None,
+    ) -> dict[str, Any]:
+        """Return pool and cache statistics and collected metrics.
+
+        Args:
+            pool: primary connection pool
+            replica_pool: read replica connection pool, if configured
+            caches: in-process caches by name, to be sized by their hit/miss counters
+
+        Returns: dict with pool stats, pool wait, per query histograms and cache stats
+        """
+        return {
+            "pool": pool.get_stats(),
+            "replica_pool": replica_pool.get_stats() if replica_pool else None,
+            "pool_wait": self.pool_wait.stats(),
+            "queries": {
+                name: histogram.stats()
+                for name, histogram in sorted(self.queries.items())
+            },
+            "caches": {
+                name: cache.stats() for name, cache in sorted((caches or {}).items())
+            },
+        }
+
+
+@lru_cache
+def get_metrics() -> Metrics:
+    """Lazy init metrics."""
+    return Metrics()
+
+
+def record_query(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Decorator recording count and latency of repository method.
+
+    Latency of async generator methods spans until the generator is exhausted.
+    """
+    name = func.__qualname__
+
+    if inspect.isasyncgenfunction(func):
+
+        @wraps(func)
+        async def gen_wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                async for item in func(*args, **kwargs):
+                    yield item
+
+            finally:
+                duration_ms = (time.perf_counter() - start) * 1000
+                get_metrics().observe_query(name, duration_ms)
+
+        return gen_wrapper
+
+    @wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            get_metrics().observe_query(name, duration_ms)
+
+    return wrapper
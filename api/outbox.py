@@ -0,0 +1,163 @@
+"""Background worker sending emails from the durable email outbox table.
+
+Emails are written into the outbox in the same transaction as the data they
+relate to, the worker drains them in batches. Batches are claimed with
+FOR UPDATE SKIP LOCKED, so multiple workers can drain the outbox in parallel.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
+
+from psycopg_pool import AsyncConnectionPool
+
+from .aws import ses_send_email
+from .config import get_outbox_settings
+from .emails import build_message
+from .repositories.email_outbox import EmailOutboxRow, email_outbox_table
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Spaces out acquisitions to at most rate per second."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1 / rate
+        self.next_slot = 0.0
+
+    async def acquire(self) -> None:
+        """Wait for the next free slot."""
+        now = time.monotonic()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class EmailOutboxWorker:
+    """Drains email outbox in batches, retrying failed emails with backoff."""
+
+    def __init__(
+        self,
+        pool: AsyncConnectionPool,
+        batch_size: int,
+        send_rate: float,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        lease: float,
+        poll_interval: float,
+    ) -> None:
+        self.pool = pool
+        self.batch_size = batch_size
+        self.rate_limiter = RateLimiter(send_rate)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease = lease
+        self.poll_interval = poll_interval
+
+    def _get_delay(self, attempts: int) -> float:
+        """Get delay in seconds of the next attempt after given number of attempts."""
+        exponent = min(attempts - 1, 32)
+        return min(self.base_delay * 2**exponent, self.max_delay)
+
+    async def _send(self, email: EmailOutboxRow) -> None:
+        """Send email, respecting the send rate."""
+        message = build_message(email.kind, email.params)
+        await self.rate_limiter.acquire()
+        await ses_send_email(email.recipient, message)
+
+    async def drain_once(self) -> int:
+        """Claim and send one batch of due emails.
+
+        Returns: number of claimed emails
+        """
+        async with self.pool.connection() as conn:
+            async with conn.transaction():
+                emails = await email_outbox_table.claim(
+                    conn, self.batch_size, self.max_attempts, self.lease
+                )
+
+        if not emails:
+            return 0
+
+        results = await asyncio.gather(
+            *(self._send(email) for email in emails), return_exceptions=True
+        )
+        sent_ids = [
+            email.id
+            for email, result in zip(emails, results)
+            if not isinstance(result, BaseException)
+        ]
+
+        async with self.pool.connection() as conn:
+            async with conn.transaction():
+                if sent_ids:
+                    await email_outbox_table.delete_many(conn, sent_ids)
+
+                for email, result in zip(emails, results):
+                    if isinstance(result, BaseException):
+                        logger.error(
+                            f"Email {email.id} attempt {email.attempts} failed: "
+                            f"{result!r}"
+                        )
+                        await email_outbox_table.reschedule(
+                            conn,
+                            email.id,
+                            self._get_delay(email.attempts),
+                            repr(result),
+                        )
+
+        logger.info(f"Email outbox: {len(sent_ids)}/{len(emails)} emails sent.")
+        return len(emails)
+
+    async def run(self) -> None:
+        """Drain the outbox until cancelled, polling when it is empty."""
+        while True:
+            try:
+                claimed = await self.drain_once()
+
+            except Exception:
+                logger.exception("Email outbox worker failed.")
+                claimed = 0
+
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+
+@asynccontextmanager
+async def run_email_outbox_worker(
+    pool: AsyncConnectionPool,
+) -> AsyncGenerator[asyncio.Task[None] | None, None]:
+    """Run email outbox worker in background task, if enabled."""
+    outbox_settings = get_outbox_settings()
+
+    if not outbox_settings.enabled:
+        yield None
+        return
+
+    worker = EmailOutboxWorker(
+        pool,
+        batch_size=outbox_settings.batch_size,
+        send_rate=outbox_settings.send_rate,
+        max_attempts=outbox_settings.max_attempts,
+        base_delay=outbox_settings.base_delay,
+        max_delay=outbox_settings.max_delay,
+        lease=outbox_settings.lease,
+        poll_interval=outbox_settings.poll_interval,
+    )
+    task = asyncio.create_task(worker.run())
+    logger.info("Email outbox worker started.")
+
+    try:
+        yield task
+
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        logger.info("Email outbox worker stopped.")
@@ -0,0 +1,184 @@
+"""Database tables layer for handling email outbox - insert, claim and complete."""
+
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from psycopg import sql
+from psycopg.rows import class_row
+from psycopg.types.json import Jsonb
+
+from ..db import DbConnection
+from ..metrics import record_query
+from ..utils import build_column_list, compile_query, log_async_func
+
+logger = logging.getLogger(__name__)
+
+
+class EmailOutboxRow(NamedTuple):
+    """Email outbox row database model."""
+
+    id: uuid.UUID
+    created_at: datetime
+    recipient: str
+    kind: str
+    params: dict[str, Any]
+    attempts: int
+    next_attempt_at: datetime
+    last_error: str | None
+
+
+class EmailOutboxIdRow(NamedTuple):
+    """Email outbox row projected to its id."""
+
+    id: uuid.UUID
+
+
+class EmailOutboxTable:
+    """Email outbox database table."""
+
+    def __init__(self) -> None:
+        self.table_name = "email_outbox"
+        table = sql.Identifier(self.table_name)
+        self.insert_query = compile_query(
+            sql.SQL("""
+                INSERT INTO {table} (recipient, kind, params)
+                VALUES (%(recipient)s, %(kind)s, %(params)s)
+                RETURNING {id_columns};
+            """).format(
+                table=table, id_columns=build_column_list(EmailOutboxIdRow._fields)
+            )
+        )
+        self.claim_query = compile_query(
+            sql.SQL("""
+                UPDATE {table}
+                SET
+                    attempts = attempts + 1,
+                    next_attempt_at = now() + make_interval(secs => %(lease)s)
+                WHERE id IN (
+                    SELECT id FROM {table}
+                    WHERE next_attempt_at <= now() AND attempts < %(max_attempts)s
+                    ORDER BY next_attempt_at
+                    LIMIT %(batch_size)s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING {columns};
+            """).format(table=table, columns=build_column_list(EmailOutboxRow._fields))
+        )
+        self.delete_many_query = compile_query(
+            sql.SQL("""
+                DELETE FROM {table}
+                WHERE id = ANY(%(email_ids)s);
+            """).format(table=table)
+        )
+        self.reschedule_query = compile_query(
+            sql.SQL("""
+                UPDATE {table}
+                SET
+                    next_attempt_at = now() + make_interval(secs => %(delay)s),
+                    last_error = %(error)s
+                WHERE id = %(email_id)s;
+            """).format(table=table)
+        )
+
+    @log_async_func(logger.debug)
+    @record_query
+    async def insert(
+        self,
+        db_conn: DbConnection,
+        recipient: str,
+        kind: str,
+        params: dict[str, Any],
+    ) -> EmailOutboxIdRow | None:
+        """Insert new email record into db, to be sent by the outbox worker.
+
+        Args:
+            db_conn: database connection
+            recipient: recipient email address
+            kind: kind of email, e.g. confirmation
+            params: parameters rendered into the email
+
+        Returns: inserted email id row
+        """
+        query = self.insert_query
+        logger.debug(f"SQL query: {query.log}")
+
+        async with db_conn.cursor(row_factory=class_row(EmailOutboxIdRow)) as cur:
+            await cur.execute(
+                query.sql, dict(recipient=recipient, kind=kind, params=Jsonb(params))
+            )
+            return await cur.fetchone()
+
+    @log_async_func(logger.debug)
+    @record_query
+    async def claim(
+        self,
+        db_conn: DbConnection,
+        batch_size: int,
+        max_attempts: int,
+        lease: float,
+    ) -> list[EmailOutboxRow]:
+        """Claim batch of due email records, skipping ones claimed by other workers.
+
+        Claimed records are leased - hidden from other workers for the lease period,
+        so a record claimed by a worker, which died, is sent again after the lease.
+
+        Args:
+            db_conn: database connection
+            batch_size: max number of claimed records
+            max_attempts: records with this many attempts are not claimed anymore
+            lease: lease period in seconds
+
+        Returns: list of claimed email outbox rows
+        """
+        query = self.claim_query
+        logger.debug(f"SQL query: {query.log}")
+
+        async with db_conn.cursor(row_factory=class_row(EmailOutboxRow)) as cur:
+            await cur.execute(
+                query.sql,
+                dict(batch_size=batch_size, max_attempts=max_attempts, lease=lease),
+            )
+            return await cur.fetchall()
+
+    @log_async_func(logger.debug)
+    @record_query
+    async def delete_many(
+        self, db_conn: DbConnection, email_ids: list[uuid.UUID]
+    ) -> None:
+        """Delete sent email records from db.
+
+        Args:
+            db_conn: database connection
+            email_ids: ids of sent emails
+        """
+        query = self.delete_many_query
+        logger.debug(f"SQL query: {query.log}")
+
+        async with db_conn.cursor() as cur:
+            await cur.execute(query.sql, dict(email_ids=email_ids))
+
+    @log_async_func(logger.debug)
+    @record_query
+    async def reschedule(
+        self, db_conn: DbConnection, email_id: uuid.UUID, delay: float, error: str
+    ) -> None:
+        """Schedule next attempt of failed email.
+
+        Args:
+            db_conn: database connection
+            email_id: id of failed email
+            delay: delay of next attempt in seconds
+            error: error of the failed attempt
+        """
+        query = self.reschedule_query
+        logger.debug(f"SQL query: {query.log}")
+
+        async with db_conn.cursor() as cur:
+            await cur.execute(
+                query.sql, dict(email_id=email_id, delay=delay, error=error)
+            )
+
+
+email_outbox_table = EmailOutboxTable()
@@ -0,0 +1,169 @@
+"""Database tables layer for handling refresh tokens - insert, rotate and delete."""
+
+import logging
+import uuid
+from datetime import datetime
+from typing import NamedTuple
+
+from psycopg import sql
+from psycopg.rows import class_row
+
+from ..db import DbConnection, get_binary
+from ..metrics import record_query
+from ..utils import build_column_list, compile_query, log_async_func
+from .users import UserAuthRow
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshTokenRow(NamedTuple):
+    """Refresh token row database model."""
+
+    id: uuid.UUID
+    created_at: datetime
+    user_id: uuid.UUID
+    token_hash: str
+    expires_at: datetime
+
+
+class RefreshTokensTable:
+    """Refresh token database table."""
+
+    def __init__(self) -> None:
+        self.table_name = "refresh_tokens"
+        table = sql.Identifier(self.table_name)
+        self.insert_query = compile_query(
+            sql.SQL("""
+                INSERT INTO {table} (user_id, token_hash, expires_at)
+                VALUES (%(user_id)s, %(token_hash)s, %(expires_at)s);
+            """).format(table=table)
+        )
+        self.delete_by_user_id_query = compile_query(
+            sql.SQL("""
+                DELETE FROM {table}
+                WHERE user_id = %(user_id)s;
+            """).format(table=table)
+        )
+        self.delete_expired_query = compile_query(
+            sql.SQL("""
+                DELETE FROM {table}
+                WHERE expires_at <= now();
+            """).format(table=table)
+        )
+        self.rotate_query = compile_query(
+            sql.SQL("""
+                WITH used AS (
+                    DELETE FROM {table}
+                    WHERE token_hash = %(token_hash)s AND expires_at > now()
+                    RETURNING user_id
+                ), issued AS (
+                    INSERT INTO {table} (user_id, token_hash, expires_at)
+                    SELECT user_id, %(new_token_hash)s, %(expires_at)s FROM used
+                    RETURNING user_id
+                )
+                SELECT {auth_columns} FROM issued
+                JOIN {users_table} ON {users_table}.id = issued.user_id;
+            """).format(
+                table=table,
+                users_table=sql.Identifier("users"),
+                auth_columns=build_column_list(UserAuthRow._fields, "users"),
+            )
+        )
+
+    @log_async_func(logger.debug)
+    @record_query
+    async def insert(
+        self,
+        db_conn: DbConnection,
+        user_id: uuid.UUID,
+        token_hash: str,
+        expires_at: datetime,
+    ) -> None:
+        """Insert new refresh token record into db.
+
+        Args:
+            db_conn: database connection
+            user_id: refresh token owner's user id
+            token_hash: hashed refresh token
+            expires_at: expiration of the refresh token
+        """
+        query = self.insert_query
+        logger.debug(f"SQL query: {query.log}")
+
+        async with db_conn.cursor() as cur:
+            await cur.execute(
+                query.sql,
+                dict(user_id=user_id, token_hash=token_hash, expires_at=expires_at),
+            )
+
+    @log_async_func(logger.debug)
+    @record_query
+    async def rotate(
+        self,
+        db_conn: DbConnection,
+        token_hash: str,
+        new_token_hash: str,
+        expires_at: datetime,
+    ) -> UserAuthRow | None:
+        """Replace valid refresh token record by a new one in a single statement.
+
+        Args:
+            db_conn: database connection
+            token_hash: hashed refresh token being used
+            new_token_hash: hashed refresh token replacing the used one
+            expires_at: expiration of the new refresh token
+
+        Returns: refresh token owner's user auth row
+        """
+        query = self.rotate_query
+        logger.debug(f"SQL query: {query.log}")
+
+        async with db_conn.cursor(
+            row_factory=class_row(UserAuthRow), binary=get_binary()
+        ) as cur:
+            await cur.execute(
+                query.sql,
+                dict(
+                    token_hash=token_hash,
+                    new_token_hash=new_token_hash,
+                    expires_at=expires_at,
+                ),
+            )
+            return await cur.fetchone()
+
+    @log_async_func(logger.debug)
+    @record_query
+    async def delete_by_user_id(
+        self, db_conn: DbConnection, user_id: uuid.UUID
+    ) -> None:
+        """Delete all refresh token records of a user, signing out all sessions.
+
+        Args:
+            db_conn: database connection
+            user_id: refresh tokens owner's user id
+        """
+        query = self.delete_by_user_id_query
+        logger.debug(f"SQL query: {query.log}")
+
+        async with db_conn.cursor() as cur:
+            await cur.execute(query.sql, dict(user_id=user_id))
+
+    @log_async_func(logger.debug)
+    @record_query
+    async def delete_expired(self, db_conn: DbConnection) -> int:
+        """Delete expired refresh token records from db.
+
+        Args:
+            db_conn: database connection
+
+        Returns: number of deleted records
+        """
+        query = self.delete_expired_query
+        logger.debug(f"SQL query: {query.log}")
+
+        async with db_conn.cursor() as cur:
+            await cur.execute(query.sql)
+            return cur.rowcount
+
+
+refresh_tokens_table = RefreshTokensTable()
@@ -3,12 +3,21 @@
 import logging
 import uuid
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, NamedTuple
 
-from psycopg import AsyncConnection, sql
+from psycopg import sql
 from psycopg.rows import class_row
 
-from ..utils import build_set_clause, format_sql_query, log_async_func
+from ..db import DbConnection, get_binary, get_prepare
+from ..metrics import record_query
+from ..utils import (
+    Query,
+    build_column_list,
+    build_set_clause,
+    compile_query,
+    log_async_func,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +30,21 @@ class UserRow(NamedTuple):
     email: str
     password_hash: str
     confirmed: bool
+    token_epoch: int = 0
+
+
+class UserIdRow(NamedTuple):
+    """User row projected to its id."""
+
+    id: uuid.UUID
+
+
+class UserAuthRow(NamedTuple):
+    """User row projected to the columns needed to authorize a request."""
+
+    id: uuid.UUID
+    confirmed: bool
+    token_epoch: int
 
 
 class UsersTable:
@@ -28,10 +52,64 @@ class UsersTable:
 
     def __init__(self) -> None:
         self.table_name = "users"
+        table = sql.Identifier(self.table_name)
+        columns = build_column_list(UserRow._fields)
+        self.insert_query = compile_query(
+            sql.SQL("""
+                INSERT INTO {table} (email, password_hash)
+                VALUES (%(email)s, %(password_hash)s)
+                RETURNING {columns};
+            """).format(table=table, columns=columns)
+        )
+        self.delete_query = compile_query(
+            sql.SQL("""
+                DELETE FROM {table}
+                WHERE id = %(user_id)s
+                RETURNING {id_columns};
+            """).format(table=table, id_columns=build_column_list(UserIdRow._fields))
+        )
+        self.select_by_id_query = compile_query(
+            sql.SQL("""
+                SELECT {columns} FROM {table}
+                WHERE id = %(user_id)s;
+            """).format(table=table, columns=columns)
+        )
+        self.select_auth_by_id_query = compile_query(
+            sql.SQL("""
+                SELECT {auth_columns} FROM {table}
+                WHERE id = %(user_id)s;
+            """).format(
+                table=table, auth_columns=build_column_list(UserAuthRow._fields)
+            )
+        )
+        self.select_by_email_query = compile_query(
+            sql.SQL("""
+                SELECT {columns} FROM {table}
+                WHERE email = %(email)s;
+            """).format(table=table, columns=columns)
+        )
+        # UPDATE queries are compiled once per set of updated columns
+        self.get_update_query = lru_cache(maxsize=64)(self._build_update_query)
+
+    def _build_update_query(self, columns: frozenset[str]) -> Query:
+        """Compile UPDATE query setting given columns."""
+        return compile_query(
+            sql.SQL("""
+                UPDATE {table}
+                SET {set_clause}, token_epoch = token_epoch + 1
+                WHERE id = %(user_id)s
+                RETURNING {columns};
+            """).format(
+                table=sql.Identifier(self.table_name),
+                set_clause=build_set_clause(columns),
+                columns=build_column_list(UserRow._fields),
+            )
+        )
 
     @log_async_func(logger.debug)
+    @record_query
     async def insert(
-        self, db_conn: AsyncConnection, email: str, password_hash: str
+        self, db_conn: DbConnection, email: str, password_hash: str
     ) -> UserRow | None:
         """Insert new user record into db.
 
@@ -42,22 +120,21 @@ class UsersTable:
 
         Returns: user row
         """
-        query = sql.SQL("""
-            INSERT INTO {table} (email, password_hash)
-            VALUES (%(email)s, %(password_hash)s)
-            RETURNING *;
-        """).format(table=sql.Identifier(self.table_name))
-        logger.debug(f"SQL query: {format_sql_query(query)}")
-
-        async with db_conn.cursor(row_factory=class_row(UserRow)) as cur:
-            await cur.execute(query, dict(email=email, password_hash=password_hash))
+        query = self.insert_query
+        logger.debug(f"SQL query: {query.log}")
+
+        async with db_conn.cursor(
+            row_factory=class_row(UserRow), binary=get_binary()
+        ) as cur:
+            await cur.execute(query.sql, dict(email=email, password_hash=password_hash))
             return await cur.fetchone()
 
     @log_async_func(logger.debug)
+    @record_query
     async def update(
-        self, db_conn: AsyncConnection, user_id: uuid.UUID, data: dict[str, Any]
+        self, db_conn: DbConnection, user_id: uuid.UUID, data: dict[str, Any]
     ) -> UserRow | None:
-        """Update user record in db.
+        """Update user record in db, bumping its token epoch.
 
         Args:
             db_conn: database connection
@@ -66,47 +143,41 @@ class UsersTable:
 
         Returns: user row
         """
-        query = sql.SQL("""
-            UPDATE {table}
-            SET {set_clause}
-            WHERE id = %(user_id)s
-            RETURNING *;
-        """).format(
-            table=sql.Identifier(self.table_name),
-            set_clause=build_set_clause(data.keys()),
-        )
-        logger.debug(f"SQL query: {format_sql_query(query)}")
+        query = self.get_update_query(frozenset(data))
+        logger.debug(f"SQL query: {query.log}")
 
-        async with db_conn.cursor(row_factory=class_row(UserRow)) as cur:
-            await cur.execute(query, data | dict(user_id=user_id))
+        async with db_conn.cursor(
+            row_factory=class_row(UserRow), binary=get_binary()
+        ) as cur:
+            await cur.execute(query.sql, data | dict(user_id=user_id))
             return await cur.fetchone()
 
     @log_async_func(logger.debug)
+    @record_query
     async def delete(
-        self, db_conn: AsyncConnection, user_id: uuid.UUID
-    ) -> UserRow | None:
+        self, db_conn: DbConnection, user_id: uuid.UUID
+    ) -> UserIdRow | None:
         """Delete user record from db.
 
         Args:
             db_conn: database connection
             user_id: user id to be deleted
 
-        Returns: user row
+        Returns: deleted user id row
         """
-        query = sql.SQL("""
-            DELETE FROM {table}
-            WHERE id = %(user_id)s
-            RETURNING *;
-        """).format(table=sql.Identifier(self.table_name))
-        logger.debug(f"SQL query: {format_sql_query(query)}")
-
-        async with db_conn.cursor(row_factory=class_row(UserRow)) as cur:
-            await cur.execute(query, dict(user_id=user_id))
+        query = self.delete_query
+        logger.debug(f"SQL query: {query.log}")
+
+        async with db_conn.cursor(
+            row_factory=class_row(UserIdRow), binary=get_binary()
+        ) as cur:
+            await cur.execute(query.sql, dict(user_id=user_id))
             return await cur.fetchone()
 
     @log_async_func(logger.debug)
+    @record_query
     async def select_by_id(
-        self, db_conn: AsyncConnection, user_id: uuid.UUID
+        self, db_conn: DbConnection, user_id: uuid.UUID
     ) -> UserRow | None:
         """Select user record from db filtered by id.
 
@@ -116,19 +187,41 @@ class UsersTable:
 
         Returns: user row
         """
-        query = sql.SQL("""
-            SELECT * FROM {table}
-            WHERE id = %(user_id)s;
-        """).format(table=sql.Identifier(self.table_name))
-        logger.debug(f"SQL query: {format_sql_query(query)}")
-
-        async with db_conn.cursor(row_factory=class_row(UserRow)) as cur:
-            await cur.execute(query, dict(user_id=user_id))
+        query = self.select_by_id_query
+        logger.debug(f"SQL query: {query.log}")
+
+        async with db_conn.cursor(
+            row_factory=class_row(UserRow), binary=get_binary()
+        ) as cur:
+            await cur.execute(query.sql, dict(user_id=user_id), prepare=get_prepare())
+            return await cur.fetchone()
+
+    @log_async_func(logger.debug)
+    @record_query
+    async def select_auth_by_id(
+        self, db_conn: DbConnection, user_id: uuid.UUID
+    ) -> UserAuthRow | None:
+        """Select columns needed to authorize a request of user from db by id.
+
+        Args:
+            db_conn: database connection
+            user_id: user id to be selected
+
+        Returns: user auth row
+        """
+        query = self.select_auth_by_id_query
+        logger.debug(f"SQL query: {query.log}")
+
+        async with db_conn.cursor(
+            row_factory=class_row(UserAuthRow), binary=get_binary()
+        ) as cur:
+            await cur.execute(query.sql, dict(user_id=user_id), prepare=get_prepare())
             return await cur.fetchone()
 
     @log_async_func(logger.debug)
+    @record_query
     async def select_by_email(
-        self, db_conn: AsyncConnection, email: str
+        self, db_conn: DbConnection, email: str
     ) -> UserRow | None:
         """Select user record from db filtered by email.
 
@@ -138,14 +231,13 @@ class UsersTable:
 
         Returns: user row
         """
-        query = sql.SQL("""
-            SELECT * FROM {table}
-            WHERE email = %(email)s;
-        """).format(table=sql.Identifier(self.table_name))
-        logger.debug(f"SQL query: {format_sql_query(query)}")
-
-        async with db_conn.cursor(row_factory=class_row(UserRow)) as cur:
-            await cur.execute(query, dict(email=email))
+        query = self.select_by_email_query
+        logger.debug(f"SQL query: {query.log}")
+
+        async with db_conn.cursor(
+            row_factory=class_row(UserRow), binary=get_binary()
+        ) as cur:
+            await cur.execute(query.sql, dict(email=email), prepare=get_prepare())
             return await cur.fetchone()
 
 
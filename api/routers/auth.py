@@ -1,11 +1,11 @@
 """Routers layer for handling authentication."""
 
 import logging
+import uuid
 from typing import Annotated
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Request
+from fastapi import APIRouter, Depends, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from psycopg import AsyncConnection
 from psycopg.errors import UniqueViolation
 
 from ..auth import (
@@ -14,11 +14,11 @@ from ..auth import (
     create_confirmation_token,
     get_sub,
 )
-from ..aws import ses_send_email
-from ..db import connect_to_db
+from ..db import DbConnection, connect_to_db
 from ..exceptions import token_exception, user_exists_exception
 from ..schemas import (
     BaseResponse,
+    RefreshTokenRequest,
     RegisterUserCredentials,
     ResponseWithId,
     TokenResponse,
@@ -29,39 +29,10 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
 
 
-def _send_confirmation_email(email: str, confirmation_url: str) -> None:
-    """Send email via AWS SES."""
-    message = {
-        "Subject": {
-            "Data": "[Zapis Stavy] Successfully registered - Please confirm your email",
-            "Charset": "UTF-8",
-        },
-        "Body": {
-            "Html": {
-                "Data": (
-                    "<html>"
-                    "<body>"
-                    "<p>You were successfully registered into Zapis Stavy app.</p>"
-                    "<p></p>"
-                    "<p>"
-                    "Please "
-                    f"<a href='{confirmation_url}'>confirm your email here</a>"
-                    "."
-                    "</p>"
-                    "</body>"
-                    "</html>"
-                ),
-                "Charset": "UTF-8",
-            }
-        },
-    }
-    ses_send_email(email, message)
-
-
 @router.post("/token")
 async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db_conn: Annotated[AsyncConnection, Depends(connect_to_db)],
+    db_conn: Annotated[DbConnection, Depends(connect_to_db)],
 ) -> TokenResponse:
     """Authenticate user.
 
@@ -69,21 +40,56 @@ async def login(
         form_data: form data with credentials from client
         db_conn: database connection
 
-    Returns: access token
+    Returns: access token and refresh token
 
     Raises:
         HTTPException: if user not found in the database or password mismatch.
     """
     user = await authenticate_user(db_conn, form_data.username, form_data.password)
-    return TokenResponse(access_token=create_access_token(user.id), token_type="bearer")
+    access_token = create_access_token(
+        user.id, confirmed=user.confirmed, epoch=user.token_epoch
+    )
+    refresh_token = await auth_service.create_refresh_token(db_conn, user.id)
+    return TokenResponse(
+        access_token=access_token, refresh_token=refresh_token, token_type="bearer"
+    )
+
+
+@router.post("/refresh")
+async def refresh(
+    body: RefreshTokenRequest,
+    db_conn: Annotated[DbConnection, Depends(connect_to_db)],
+) -> TokenResponse:
+    """Exchange refresh token for new access token and new refresh token.
+
+    Args:
+        body: refresh token request payload from client
+        db_conn: database connection
+
+    Returns: access token and refresh token
+
+    Raises:
+        HTTPException: if refresh token is unknown, expired or already used.
+    """
+    rotated = await auth_service.rotate_refresh_token(db_conn, body.refresh_token)
+
+    if rotated is None:
+        raise token_exception
+
+    user, refresh_token = rotated
+    access_token = create_access_token(
+        user.id, confirmed=user.confirmed, epoch=user.token_epoch
+    )
+    return TokenResponse(
+        access_token=access_token, refresh_token=refresh_token, token_type="bearer"
+    )
 
 
 @router.post("/register", status_code=201)
 async def register_user(
     request: Request,
     creds: RegisterUserCredentials,
-    db_conn: Annotated[AsyncConnection, Depends(connect_to_db)],
-    bg_tasks: BackgroundTasks,
+    db_conn: Annotated[DbConnection, Depends(connect_to_db)],
 ) -> ResponseWithId:
     """Register new user.
 
@@ -91,27 +97,26 @@ async def register_user(
         request: FastAPI request object (used for accessing headers, client info, etc.).
         creds: register credentials payload from client
         db_conn: database connection
-        bg_tasks: FastAPI's background que for tasks
 
     Returns: response with detail and user_id
 
     Raises:
         HTTPException: if user already exists
     """
+
+    def confirmation_url_for(user_id: uuid.UUID) -> str:
+        confirmation_token = create_confirmation_token(user_id)
+        logger.debug(f"{confirmation_token=}")
+        return str(request.url_for("confirm_user", token=confirmation_token))
+
     try:
-        user = await auth_service.register_user(db_conn, creds)
+        user = await auth_service.register_user(
+            db_conn, creds, confirmation_url_for=confirmation_url_for
+        )
 
     except UniqueViolation:
         raise user_exists_exception
 
-    confirmation_token = create_confirmation_token(user.id)
-    logger.debug(f"{confirmation_token=}")
-    bg_tasks.add_task(
-        _send_confirmation_email,
-        user.email,
-        confirmation_url=str(request.url_for("confirm_user", token=confirmation_token)),
-    )
-
     return ResponseWithId(
         detail="User registered. Please confirm your email.", id=user.id
     )
@@ -120,7 +125,7 @@ async def register_user(
 @router.get("/confirm/{token}")
 async def confirm_user(
     token: str,
-    db_conn: Annotated[AsyncConnection, Depends(connect_to_db)],
+    db_conn: Annotated[DbConnection, Depends(connect_to_db)],
 ) -> BaseResponse:
     """Update user to confirmed = True based on email from token.
 
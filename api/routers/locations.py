@@ -6,24 +6,37 @@ Database connection is passed to downstream user service.
 
 import logging
 import uuid
-from typing import Annotated
+from typing import Annotated, AsyncGenerator
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from psycopg import AsyncConnection
-from psycopg.errors import UniqueViolation
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from psycopg.errors import ForeignKeyViolation, UniqueViolation
 
-from ..auth import get_current_confirmed_user
-from ..db import connect_to_db
-from ..exceptions import location_exists_exception, location_not_found_exception
-from ..repositories.users import UserRow
+from ..auth import CurrentUser, get_current_confirmed_user, get_current_user_id
+from ..config import get_pagination_settings
+from ..db import DbConnection, connect_to_db
+from ..exceptions import (
+    invalid_cursor_exception,
+    location_exists_exception,
+    location_not_found_exception,
+    token_exception,
+    user_not_confirmed_exception,
+)
 from ..schemas import (
     BaseResponse,
+    BulkCreateLocationProperties,
+    BulkDeleteLocationProperties,
+    BulkItemResponse,
+    BulkResponse,
+    BulkUpdateLocationProperties,
     CreateLocationProperties,
     LocationsResponse,
     ResponseWithId,
     UpdateLocationProperties,
 )
+from ..serializers import dump_locations_ndjson, dump_locations_response
 from ..services import locations as location_service
+from ..utils import decode_cursor, encode_cursor
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/locations", tags=["locations"])
@@ -32,38 +45,156 @@ router = APIRouter(prefix="/api/v1/locations", tags=["locations"])
 @router.post("", status_code=201)
 async def create(
     props: CreateLocationProperties,
-    db_conn: Annotated[AsyncConnection, Depends(connect_to_db)],
-    current_confirmed_user: Annotated[UserRow, Depends(get_current_confirmed_user)],
+    db_conn: Annotated[DbConnection, Depends(connect_to_db)],
+    current_user_id: Annotated[uuid.UUID, Depends(get_current_user_id)],
 ) -> ResponseWithId:
     """Create new location.
 
     Args:
         props: create location properties request payload from client
         db_conn: database connection
-        current_confirmed_user: current authorized and confirmed user
+        current_user_id: current authorized user id, checked to be confirmed
+            by the query itself
 
     Returns: response with detail and location_id
 
     Raises:
-        HTTPException: if location already exists
+        HTTPException: if user is not confirmed or location already exists
     """
     try:
-        location = await location_service.create(
-            db_conn, current_confirmed_user.id, props
+        result = await location_service.create_if_confirmed(
+            db_conn, current_user_id, props
         )
 
     except UniqueViolation:
         raise location_exists_exception
 
-    return ResponseWithId(detail="Location created", id=location.id)
+    if not result.user_confirmed:
+        raise user_not_confirmed_exception
+
+    return ResponseWithId(detail="Location created", id=result.locations[0].id)
+
+
+@router.post("/bulk")
+async def create_many(
+    props: BulkCreateLocationProperties,
+    db_conn: Annotated[DbConnection, Depends(connect_to_db)],
+    current_confirmed_user: Annotated[CurrentUser, Depends(get_current_confirmed_user)],
+) -> BulkResponse:
+    """Create new locations in one transaction.
+
+    Args:
+        props: bulk create locations request payload from client
+        db_conn: database connection
+        current_confirmed_user: current authorized and confirmed user
+
+    Returns: response with detail and per item results in the request order,
+        conflicting items are reported without aborting the rest
+
+    Raises:
+        HTTPException: if the user does not exist
+    """
+    try:
+        locations = await location_service.create_many(
+            db_conn, current_confirmed_user.id, props.locations
+        )
+
+    except ForeignKeyViolation:
+        # stateless token of a user deleted, while revoked in another worker only
+        raise token_exception
+    results = [
+        BulkItemResponse(status_code=201, detail="Location created", id=location.id)
+        if location is not None
+        else BulkItemResponse(
+            status_code=location_exists_exception.status_code,
+            detail=location_exists_exception.detail,
+        )
+        for location in locations
+    ]
+    created = sum(location is not None for location in locations)
+    return BulkResponse(detail=f"{created} locations created", results=results)
+
+
+@router.put("/bulk")
+async def update_many(
+    props: BulkUpdateLocationProperties,
+    db_conn: Annotated[DbConnection, Depends(connect_to_db)],
+    current_confirmed_user: Annotated[CurrentUser, Depends(get_current_confirmed_user)],
+) -> BulkResponse:
+    """Update locations in one transaction.
+
+    Args:
+        props: bulk update locations request payload from client
+        db_conn: database connection
+        current_confirmed_user: current authorized and confirmed user
+
+    Returns: response with detail and per location id results
+
+    Raises:
+        HTTPException: if any name already exists.
+    """
+    try:
+        locations = await location_service.update_many(
+            db_conn, current_confirmed_user.id, props.locations
+        )
+
+    except UniqueViolation:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Location name already in use"
+        )
+
+    results = [
+        BulkItemResponse(status_code=200, detail="Location updated", id=id)
+        if location is not None
+        else BulkItemResponse(
+            status_code=location_not_found_exception.status_code,
+            detail=location_not_found_exception.detail,
+            id=id,
+        )
+        for id, location in locations.items()
+    ]
+    updated = sum(location is not None for location in locations.values())
+    return BulkResponse(detail=f"{updated} locations updated", results=results)
+
+
+@router.post("/bulk/delete")
+async def delete_many(
+    props: BulkDeleteLocationProperties,
+    db_conn: Annotated[DbConnection, Depends(connect_to_db)],
+    current_confirmed_user: Annotated[CurrentUser, Depends(get_current_confirmed_user)],
+) -> BulkResponse:
+    """Delete locations in one transaction.
+
+    Args:
+        props: bulk delete locations request payload from client
+        db_conn: database connection
+        current_confirmed_user: current authorized and confirmed user
+
+    Returns: response with detail and per location id results
+    """
+    deleted_ids = await location_service.delete_many(
+        db_conn, current_confirmed_user.id, props.ids
+    )
+    results = [
+        BulkItemResponse(status_code=200, detail="Location deleted", id=id)
+        if found
+        else BulkItemResponse(
+            status_code=location_not_found_exception.status_code,
+            detail=location_not_found_exception.detail,
+            id=id,
+        )
+        for id, found in deleted_ids.items()
+    ]
+    deleted = sum(deleted_ids.values())
+    return BulkResponse(detail=f"{deleted} locations deleted", results=results)
 
 
 @router.put("/{id}")
 async def update(
     id: uuid.UUID,
     props: UpdateLocationProperties,
-    db_conn: Annotated[AsyncConnection, Depends(connect_to_db)],
-    current_confirmed_user: Annotated[UserRow, Depends(get_current_confirmed_user)],
+    db_conn: Annotated[DbConnection, Depends(connect_to_db)],
+    current_user_id: Annotated[uuid.UUID, Depends(get_current_user_id)],
 ) -> BaseResponse:
     """Update a location.
 
@@ -71,19 +202,24 @@ async def update(
         id: uuid of location
         props: update location properties request payload from client
         db_conn: database connection
-        current_confirmed_user: current authorized and confirmed user
+        current_user_id: current authorized user id, checked to be confirmed
+            by the query itself
 
     Returns: response with detail
 
     Raises:
-        HTTPException: if location was not found or name already exists.
+        HTTPException: if user is not confirmed, location was not found
+            or name already exists.
     """
     try:
-        location = await location_service.update(
-            db_conn, id, current_confirmed_user.id, props
+        result = await location_service.update_if_confirmed(
+            db_conn, id, current_user_id, props
         )
 
-        if not location:
+        if not result.user_confirmed:
+            raise user_not_confirmed_exception
+
+        if not result.locations:
             raise location_not_found_exception
 
     except UniqueViolation:
@@ -97,41 +233,105 @@ async def update(
 @router.delete("/{id}")
 async def delete(
     id: uuid.UUID,
-    db_conn: Annotated[AsyncConnection, Depends(connect_to_db)],
-    current_confirmed_user: Annotated[UserRow, Depends(get_current_confirmed_user)],
+    db_conn: Annotated[DbConnection, Depends(connect_to_db)],
+    current_user_id: Annotated[uuid.UUID, Depends(get_current_user_id)],
 ) -> BaseResponse:
     """Delete a location.
 
     Args:
         id: uuid of location
         db_conn: database connection
-        current_confirmed_user: current authorized and confirmed user
+        current_user_id: current authorized user id, checked to be confirmed
+            by the query itself
 
     Returns: response with detail
 
     Raises:
-        HTTPException: if location was not found
+        HTTPException: if user is not confirmed or location was not found
     """
-    location = await location_service.delete(db_conn, id, current_confirmed_user.id)
+    result = await location_service.delete_if_confirmed(db_conn, id, current_user_id)
+
+    if not result.user_confirmed:
+        raise user_not_confirmed_exception
 
-    if not location:
+    if not result.ids:
         raise location_not_found_exception
 
     return BaseResponse(detail="Location deleted")
 
 
-@router.get("")
+@router.get("", response_model=LocationsResponse)
 async def select(
-    db_conn: Annotated[AsyncConnection, Depends(connect_to_db)],
-    current_confirmed_user: Annotated[UserRow, Depends(get_current_confirmed_user)],
-) -> LocationsResponse:
-    """Select locations.
+    db_conn: Annotated[DbConnection, Depends(connect_to_db)],
+    current_user_id: Annotated[uuid.UUID, Depends(get_current_user_id)],
+    cursor: str | None = None,
+    limit: Annotated[int | None, Query(ge=1)] = None,
+) -> Response:
+    """Select page of locations ordered by id.
+
+    Rows are serialized straight to JSON bytes, see serializers module.
+
+    Args:
+        db_conn: database connection
+        current_user_id: current authorized user id, checked to be confirmed
+            by the query itself
+        cursor: next_cursor from the previous page, None for first page
+        limit: page size, defaults to and is capped by configured page sizes
+
+    Returns: response with locations and cursor of the next page
+
+    Raises:
+        HTTPException: if the cursor is malformed or user is not confirmed.
+    """
+    pagination_settings = get_pagination_settings()
+    limit = min(
+        limit or pagination_settings.page_size, pagination_settings.max_page_size
+    )
+
+    try:
+        after_id = decode_cursor(cursor) if cursor is not None else None
+
+    except ValueError:
+        raise invalid_cursor_exception
+
+    result, last_id = await location_service.select_page_if_confirmed(
+        db_conn, current_user_id, limit, after_id
+    )
+
+    if not result.user_confirmed:
+        raise user_not_confirmed_exception
+
+    return Response(
+        content=dump_locations_response(
+            result.locations,
+            next_cursor=encode_cursor(last_id) if last_id is not None else None,
+        ),
+        media_type="application/json",
+    )
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream(
+    db_conn: Annotated[DbConnection, Depends(connect_to_db)],
+    current_confirmed_user: Annotated[CurrentUser, Depends(get_current_confirmed_user)],
+) -> StreamingResponse:
+    """Stream all locations ordered by id as newline delimited JSON.
+
+    Locations are fetched from server-side cursor in chunks and encoded as they
+    arrive, so memory stays flat regardless of the number of locations.
 
     Args:
         db_conn: database connection
         current_confirmed_user: current authorized and confirmed user
 
-    Returns: response with locations
+    Returns: streaming response with one location JSON per line
     """
-    locations = await location_service.select(db_conn, current_confirmed_user.id)
-    return LocationsResponse(locations=[loc._asdict() for loc in locations])
+    chunk_size = get_pagination_settings().stream_chunk_size
+
+    async def encode() -> AsyncGenerator[bytes, None]:
+        async for locations in location_service.select_chunks(
+            db_conn, current_confirmed_user.id, chunk_size
+        ):
+            yield dump_locations_ndjson(locations)
+
+    return StreamingResponse(encode(), media_type="application/x-ndjson")
@@ -0,0 +1,74 @@
+"""Routers layer for internal metrics of this worker process."""
+
+import logging
+import secrets
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from ..auth import get_tokens_cache
+from ..cache import TTLCache
+from ..config import get_metrics_settings
+from ..exceptions import not_found_exception, token_exception
+from ..metrics import get_metrics
+from ..schemas import MetricsResponse
+from ..services.users import get_user_auths_cache, get_users_cache
+
+logger = logging.getLogger(__name__)
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def verify_metrics_token(
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(bearer_scheme)],
+) -> None:
+    """Allow access to internal endpoints only with the configured token.
+
+    Args:
+        credentials: bearer token from Authorization header
+
+    Raises:
+        HTTPException: if endpoint is disabled or token is missing or invalid.
+    """
+    metrics_settings = get_metrics_settings()
+
+    if not metrics_settings.enabled or metrics_settings.token is None:
+        raise not_found_exception
+
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials.encode(), metrics_settings.token.encode()
+    ):
+        raise token_exception
+
+
+router = APIRouter(
+    prefix="/api/v1/internal",
+    tags=["internal"],
+    include_in_schema=False,
+    dependencies=[Depends(verify_metrics_token)],
+)
+
+
+@router.get("/metrics")
+async def metrics(request: Request) -> MetricsResponse:
+    """Report pool statistics, pool wait, query latencies and cache hit rates.
+
+    Metrics are per worker process, so they can be used to size the pool and
+    the caches per worker. Served only if enabled, with the configured bearer token.
+
+    Args:
+        request: FastAPI request object (used for accessing the pools)
+
+    Returns: response with pool stats, pool wait, per query histograms and
+        cache stats
+    """
+    caches: dict[str, TTLCache[Any, Any]] = {
+        "users": get_users_cache(),
+        "user_auths": get_user_auths_cache(),
+        "tokens": get_tokens_cache(),
+    }
+    return MetricsResponse.model_validate(
+        get_metrics().report(
+            request.app.state.pool, request.app.state.replica_pool, caches
+        )
+    )
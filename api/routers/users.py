@@ -8,13 +8,12 @@ import logging
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from psycopg import AsyncConnection
 from psycopg.errors import UniqueViolation
 
 from ..auth import get_current_user
-from ..db import connect_to_db
+from ..db import DbConnection, connect_to_db
 from ..exceptions import user_not_found_exception
-from ..repositories.users import UserRow
+from ..repositories.users import UserAuthRow, UserRow
 from ..schemas import BaseResponse, UpdateUserCredentials
 from ..services import users as user_service
 
@@ -25,8 +24,8 @@ router = APIRouter(prefix="/api/v1/users", tags=["users"])
 @router.put("/me")
 async def update(
     creds: UpdateUserCredentials,
-    db_conn: Annotated[AsyncConnection, Depends(connect_to_db)],
-    current_user: Annotated[UserRow, Depends(get_current_user)],
+    db_conn: Annotated[DbConnection, Depends(connect_to_db)],
+    current_user: Annotated[UserRow | UserAuthRow, Depends(get_current_user)],
 ) -> BaseResponse:
     """Update a user.
 
@@ -56,8 +55,8 @@ async def update(
 
 @router.delete("/me")
 async def delete(
-    db_conn: Annotated[AsyncConnection, Depends(connect_to_db)],
-    current_user: Annotated[UserRow, Depends(get_current_user)],
+    db_conn: Annotated[DbConnection, Depends(connect_to_db)],
+    current_user: Annotated[UserRow | UserAuthRow, Depends(get_current_user)],
 ) -> BaseResponse:
     """Delete a user.
 
@@ -1,6 +1,12 @@
 import uuid
+from typing import Any
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+
+from .config import get_bulk_settings
+
+# checked while validating items, so oversized request fails before all are parsed
+bulk_max_items = get_bulk_settings().max_items
 
 
 class BaseResponse(BaseModel):
@@ -15,11 +21,33 @@ class ResponseWithId(BaseResponse):
     id: uuid.UUID
 
 
+class BulkItemResponse(BaseModel):
+    """Result of one item of bulk request, in the order of request items."""
+
+    status_code: int
+    detail: str
+    id: uuid.UUID | None = None
+
+
+class BulkResponse(BaseResponse):
+    """Bulk response json model for validation."""
+
+    results: list[BulkItemResponse]
+
+
 class TokenResponse(BaseModel):
     """Response token model for validation."""
 
     access_token: str
     token_type: str
+    refresh_token: str | None = None
+
+
+class RefreshTokenRequest(BaseModel):
+    """Refresh token request model for validation."""
+
+    model_config = ConfigDict(extra="forbid")
+    refresh_token: str
 
 
 class Location(BaseModel):
@@ -33,6 +61,7 @@ class LocationsResponse(BaseModel):
     """Response token model for validation."""
 
     locations: list[Location]
+    next_cursor: str | None = None
 
 
 class RegisterUserCredentials(BaseModel):
@@ -58,8 +87,61 @@ class CreateLocationProperties(BaseModel):
     location_name: str
 
 
+class BulkCreateLocationProperties(BaseModel):
+    """Bulk create locations request model for validation."""
+
+    model_config = ConfigDict(extra="forbid")
+    locations: list[CreateLocationProperties] = Field(
+        min_length=1, max_length=bulk_max_items
+    )
+
+
 class UpdateLocationProperties(BaseModel):
     """Update location properties request model for validation."""
 
     model_config = ConfigDict(extra="forbid")
     location_name: str | None = None
+
+
+class BulkUpdateLocationProperties(BaseModel):
+    """Bulk update locations request model for validation."""
+
+    model_config = ConfigDict(extra="forbid")
+    locations: dict[uuid.UUID, UpdateLocationProperties] = Field(
+        min_length=1, max_length=bulk_max_items
+    )
+
+
+class BulkDeleteLocationProperties(BaseModel):
+    """Bulk delete locations request model for validation."""
+
+    model_config = ConfigDict(extra="forbid")
+    ids: list[uuid.UUID] = Field(min_length=1, max_length=bulk_max_items)
+
+
+class HistogramResponse(BaseModel):
+    """Histogram of durations response model."""
+
+    count: int
+    mean_ms: float
+    max_ms: float
+    buckets: dict[str, int]
+
+
+class CacheStatsResponse(BaseModel):
+    """In-process cache size and hit/miss counters response model."""
+
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+
+
+class MetricsResponse(BaseModel):
+    """Pool, query and cache metrics response model."""
+
+    pool: dict[str, Any]
+    replica_pool: dict[str, Any] | None = None
+    pool_wait: HistogramResponse
+    queries: dict[str, HistogramResponse]
+    caches: dict[str, CacheStatsResponse]
@@ -1,6 +1,35 @@
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Any, Callable
+
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from .config import get_hashing_settings
+from .exceptions import hashing_unavailable_exception
+
+logger = logging.getLogger(__name__)
 
-password_hash = PasswordHash.recommended()
+
+@lru_cache
+def get_password_hasher() -> PasswordHash:
+    """Lazy init argon2 password hasher with configured cost parameters."""
+    hashing_settings = get_hashing_settings()
+    return PasswordHash(
+        (
+            Argon2Hasher(
+                time_cost=hashing_settings.time_cost,
+                memory_cost=hashing_settings.memory_cost,
+                parallelism=hashing_settings.parallelism,
+            ),
+        )
+    )
 
 
 def get_password_hash(password: str) -> str:
@@ -11,7 +40,7 @@ def get_password_hash(password: str) -> str:
 
     Returns: hashed password
     """
-    return password_hash.hash(password)
+    return get_password_hasher().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -23,4 +52,168 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
     Returns: True if passwords match, otherwise False
     """
-    return password_hash.verify(plain_password, hashed_password)
+    return get_password_hasher().verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Compare password and password hash, rehash if cost parameters changed.
+
+    Args:
+        plain_password: textual form of password
+        hashed_password: password hash
+
+    Returns: True if passwords match, otherwise False
+        and new password hash, if the old one uses outdated parameters
+    """
+    return get_password_hasher().verify_and_update(plain_password, hashed_password)
+
+
+def generate_refresh_token() -> str:
+    """Generate random opaque refresh token."""
+    return secrets.token_urlsafe(32)
+
+
+def get_refresh_token_hash(refresh_token: str) -> str:
+    """Get hashed refresh token.
+
+    Refresh tokens are random with high entropy, so fast hash is sufficient.
+
+    Args:
+        refresh_token: textual form of refresh token
+
+    Returns: hashed refresh token
+    """
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+
+class HashingPool:
+    """Process pool for CPU bound password hashing with bounded queue.
+
+    Pool broken by a dead worker, e.g. killed on out of memory, is rebuilt.
+    """
+
+    def __init__(
+        self, workers: int, max_pending: int, start_method: str = "forkserver"
+    ) -> None:
+        self.workers = workers
+        self.mp_context = multiprocessing.get_context(start_method)
+        self.executor = self._create_executor()
+        self.max_pending = max_pending
+        self.pending = 0
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        """Create process pool executor."""
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=self.mp_context)
+
+    def _rebuild(self, broken_executor: ProcessPoolExecutor) -> None:
+        """Replace broken executor, unless another job has replaced it already.
+
+        Args:
+            broken_executor: executor which raised BrokenProcessPool
+        """
+        if self.executor is broken_executor:
+            logger.error("Hashing pool broken, rebuilding.")
+            self.executor = self._create_executor()
+            broken_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run function in the process pool without blocking the event loop.
+
+        Job failed on a broken pool is retried once in the rebuilt pool.
+
+        Args:
+            func: picklable module level function
+            args: arguments to the function
+
+        Returns: result of the function
+
+        Raises:
+            HTTPException: if there are too many pending jobs already
+                or the rebuilt pool breaks too.
+        """
+        if self.pending >= self.max_pending:
+            logger.warning(f"Hashing pool full: {self.pending} pending jobs.")
+            raise hashing_unavailable_exception
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+
+            for _ in range(2):
+                executor = self.executor
+                try:
+                    return await loop.run_in_executor(executor, func, *args)
+
+                except BrokenProcessPool:
+                    self._rebuild(executor)
+
+            raise hashing_unavailable_exception
+
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        """Shutdown the process pool."""
+        self.executor.shutdown()
+
+
+@lru_cache
+def get_hashing_pool() -> HashingPool:
+    """Lazy init password hashing process pool, app lifespan inits it on startup."""
+    hashing_settings = get_hashing_settings()
+    return HashingPool(
+        hashing_settings.workers,
+        hashing_settings.max_pending,
+        hashing_settings.start_method,
+    )
+
+
+def shutdown_hashing_pool() -> None:
+    """Shutdown password hashing process pool, if it was initialized."""
+    if get_hashing_pool.cache_info().currsize:
+        get_hashing_pool().shutdown()
+        get_hashing_pool.cache_clear()
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Get hashed password in the hashing process pool.
+
+    Args:
+        password: textual form of password
+
+    Returns: hashed password
+    """
+    return await get_hashing_pool().run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Compare password and password hash in the hashing process pool.
+
+    Args:
+        plain_password: textual form of password
+        hashed_password: password hash
+
+    Returns: True if passwords match, otherwise False
+    """
+    return await get_hashing_pool().run(
+        verify_password, plain_password, hashed_password
+    )
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Compare password and password hash and rehash in the hashing process pool.
+
+    Args:
+        plain_password: textual form of password
+        hashed_password: password hash
+
+    Returns: True if passwords match, otherwise False
+        and new password hash, if the old one uses outdated parameters
+    """
+    return await get_hashing_pool().run(
+        verify_and_update_password, plain_password, hashed_password
+    )
@@ -0,0 +1,87 @@
+"""Precompiled JSON serializers for hot read responses.
+
+Rows are encoded to JSON bytes by pydantic-core in one pass, skipping the
+response model validation and FastAPI's second serialization pass. Each row is
+passed as a small dict of the response fields, as pydantic-core serializes
+named tuples as arrays. Serializers are compiled from the response models' own
+fields, so the output stays the same.
+"""
+
+from typing import Sequence
+
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import SchemaSerializer, core_schema
+
+from .repositories.locations import LocationRow
+from .schemas import Location
+
+
+def build_fields_schema(model: type[BaseModel]) -> core_schema.TypedDictSchema:
+    """Build typed dict schema serializing the same fields as the model.
+
+    Args:
+        model: response model
+
+    Returns: typed dict schema with the field schemas of the model
+    """
+    return core_schema.typed_dict_schema(
+        {
+            name: core_schema.typed_dict_field(
+                TypeAdapter(field.rebuild_annotation()).core_schema,
+                serialization_alias=field.serialization_alias,
+            )
+            for name, field in model.model_fields.items()
+        }
+    )
+
+
+_location_schema = build_fields_schema(Location)
+_location_serializer = SchemaSerializer(_location_schema)
+_locations_response_serializer = SchemaSerializer(
+    core_schema.typed_dict_schema(
+        {
+            "locations": core_schema.typed_dict_field(
+                core_schema.list_schema(_location_schema)
+            ),
+            "next_cursor": core_schema.typed_dict_field(
+                core_schema.nullable_schema(core_schema.str_schema())
+            ),
+        }
+    )
+)
+
+
+def dump_locations_response(
+    locations: Sequence[LocationRow], next_cursor: str | None = None
+) -> bytes:
+    """Serialize location rows into LocationsResponse JSON.
+
+    Args:
+        locations: location rows
+        next_cursor: cursor of the next page, None on the last page
+
+    Returns: JSON encoded response body
+    """
+    return _locations_response_serializer.to_json(
+        {
+            "locations": [
+                {"id": loc.id, "location_name": loc.location_name} for loc in locations
+            ],
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+def dump_locations_ndjson(locations: Sequence[LocationRow]) -> bytes:
+    """Serialize location rows into newline delimited Location JSON.
+
+    Args:
+        locations: location rows
+
+    Returns: one JSON encoded location per line
+    """
+    return b"".join(
+        _location_serializer.to_json({"id": loc.id, "location_name": loc.location_name})
+        + b"\n"
+        for loc in locations
+    )
@@ -1,43 +1,71 @@
 """Service layer for handling authentication.
 
 Database transaction is handled in this module.
+Single-statement writes run in autocommit, if enabled.
 """
 
 import logging
 import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable
 
-from psycopg import AsyncConnection
-
-from ..repositories.users import UserRow, users_table
+from ..config import get_jwt_settings
+from ..db import DbConnection, single_statement
+from ..repositories.email_outbox import email_outbox_table
+from ..repositories.refresh_tokens import refresh_tokens_table
+from ..repositories.users import UserAuthRow, UserRow, users_table
 from ..schemas import RegisterUserCredentials
-from ..security import get_password_hash
+from ..security import (
+    generate_refresh_token,
+    get_password_hash_async,
+    get_refresh_token_hash,
+)
+from ..token_epochs import get_token_epochs
 from ..utils import log_async_func
+from .users import invalidate_cached_user
 
 logger = logging.getLogger(__name__)
 
 
 @log_async_func(logger.debug)
 async def register_user(
-    db_conn: AsyncConnection, creds: RegisterUserCredentials
+    db_conn: DbConnection,
+    creds: RegisterUserCredentials,
+    confirmation_url_for: Callable[[uuid.UUID], str] | None = None,
 ) -> UserRow | None:
     """Add new user into the database.
 
+    Confirmation email is written into the email outbox in the same transaction,
+    so it is sent by the outbox worker even if the process dies afterwards.
+
     Args:
         db_conn: database connection
         creds: register credentials payload from router
+        confirmation_url_for: builds confirmation url for user id,
+            no confirmation email is queued if not provided
 
     Returns: user row
     """
     data = creds.model_dump(exclude_unset=True)
     password = data.pop("password")
-    data["password_hash"] = get_password_hash(password)
+    data["password_hash"] = await get_password_hash_async(password)
 
     async with db_conn.transaction():
-        return await users_table.insert(db_conn, **data)
+        user = await users_table.insert(db_conn, **data)
+
+        if user is not None and confirmation_url_for is not None:
+            await email_outbox_table.insert(
+                db_conn,
+                user.email,
+                "confirmation",
+                {"confirmation_url": confirmation_url_for(user.id)},
+            )
+
+    return user
 
 
 @log_async_func(logger.debug)
-async def confirm_user(db_conn: AsyncConnection, user_id: uuid.UUID) -> UserRow | None:
+async def confirm_user(db_conn: DbConnection, user_id: uuid.UUID) -> UserRow | None:
     """Confirm a user in the database.
 
     Args:
@@ -46,5 +74,72 @@ async def confirm_user(db_conn: AsyncConnection, user_id: uuid.UUID) -> UserRow
 
     Returns: user row
     """
-    async with db_conn.transaction():
-        return await users_table.update(db_conn, user_id, {"confirmed": True})
+    async with single_statement(db_conn):
+        user = await users_table.update(db_conn, user_id, {"confirmed": True})
+
+    invalidate_cached_user(user_id)
+
+    if user is not None:
+        get_token_epochs().set(user.id, user.token_epoch)
+
+    return user
+
+
+def _get_refresh_token_expiration() -> datetime:
+    """Get expiration of newly issued refresh token."""
+    jwt_settings = get_jwt_settings()
+    return datetime.now(timezone.utc) + timedelta(
+        days=jwt_settings.refresh_token_expire_days
+    )
+
+
+@log_async_func(logger.debug)
+async def create_refresh_token(db_conn: DbConnection, user_id: uuid.UUID) -> str:
+    """Issue new refresh token and store its hash in the database.
+
+    Args:
+        db_conn: database connection
+        user_id: refresh token owner's user id
+
+    Returns: refresh token
+    """
+    refresh_token = generate_refresh_token()
+
+    async with single_statement(db_conn):
+        await refresh_tokens_table.insert(
+            db_conn,
+            user_id,
+            get_refresh_token_hash(refresh_token),
+            _get_refresh_token_expiration(),
+        )
+
+    return refresh_token
+
+
+@log_async_func(logger.debug)
+async def rotate_refresh_token(
+    db_conn: DbConnection, refresh_token: str
+) -> tuple[UserAuthRow, str] | None:
+    """Exchange valid refresh token for a new one, the used one is revoked.
+
+    Args:
+        db_conn: database connection
+        refresh_token: refresh token from client
+
+    Returns: refresh token owner's user auth row and new refresh token,
+        None if the refresh token is unknown, expired or already used.
+    """
+    new_refresh_token = generate_refresh_token()
+
+    async with single_statement(db_conn):
+        user = await refresh_tokens_table.rotate(
+            db_conn,
+            get_refresh_token_hash(refresh_token),
+            get_refresh_token_hash(new_refresh_token),
+            _get_refresh_token_expiration(),
+        )
+
+    if user is None:
+        return None
+
+    return user, new_refresh_token
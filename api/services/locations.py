@@ -1,14 +1,21 @@
 """Service layer for handling location lifecycle - create, update and delete.
 
 Database transaction is handled in this module.
+Single-statement writes run in autocommit, if enabled.
+Reads are routed to the read replica, if configured.
 """
 
 import logging
 import uuid
+from typing import AsyncGenerator
 
-from psycopg import AsyncConnection
-
-from ..repositories.locations import LocationRow, locations_table
+from ..db import DbConnection, read_only, record_write, single_statement
+from ..repositories.locations import (
+    LocationRow,
+    UserLocationIds,
+    UserLocations,
+    locations_table,
+)
 from ..schemas import CreateLocationProperties, UpdateLocationProperties
 from ..utils import log_async_func
 
@@ -16,32 +23,67 @@ logger = logging.getLogger(__name__)
 
 
 @log_async_func(logger.debug)
-async def create(
-    db_conn: AsyncConnection, user_id: uuid.UUID, props: CreateLocationProperties
-) -> LocationRow | None:
-    """Add new location into the database.
+async def create_if_confirmed(
+    db_conn: DbConnection, user_id: uuid.UUID, props: CreateLocationProperties
+) -> UserLocations:
+    """Add new location into the database, if the user is confirmed.
+
+    The user is checked within the same statement.
 
     Args:
         db_conn: database connection
         user_id: location owner's user id
         props: create location properties request payload from client
 
-    Returns: location row
+    Returns: user's confirmation flag and created location row
     """
-    async with db_conn.transaction():
-        return await locations_table.insert(
+    async with single_statement(db_conn):
+        result = await locations_table.insert_if_confirmed(
             db_conn, user_id, **props.model_dump(exclude_unset=True)
         )
 
+    record_write(user_id)
+    return result
+
 
 @log_async_func(logger.debug)
-async def update(
-    db_conn: AsyncConnection,
+async def create_many(
+    db_conn: DbConnection,
+    user_id: uuid.UUID,
+    props_list: list[CreateLocationProperties],
+) -> list[LocationRow | None]:
+    """Add new locations into the database in one transaction.
+
+    Args:
+        db_conn: database connection
+        user_id: location owner's user id
+        props_list: create location properties request payloads from client
+
+    Returns: location row per item in the same order,
+        None for items conflicting with existing location or earlier item
+    """
+    async with single_statement(db_conn):
+        locations = await locations_table.insert_many(
+            db_conn, user_id, [props.location_name for props in props_list]
+        )
+
+    if locations:
+        record_write(user_id)
+
+    inserted = {location.location_name: location for location in locations}
+    return [inserted.pop(props.location_name, None) for props in props_list]
+
+
+@log_async_func(logger.debug)
+async def update_if_confirmed(
+    db_conn: DbConnection,
     location_id: uuid.UUID,
     user_id: uuid.UUID,
     props: UpdateLocationProperties,
-) -> LocationRow | None:
-    """Update a location in the database.
+) -> UserLocations:
+    """Update a location in the database, if the user is confirmed.
+
+    The user is checked within the same statement.
 
     Args:
         db_conn: database connection
@@ -49,34 +91,92 @@ async def update(
         user_id: location owner's user id
         props: update location properties request payload from client
 
-    Returns: location row
+    Returns: user's confirmation flag and updated location row
     """
-    async with db_conn.transaction():
-        return await locations_table.update(
+    async with single_statement(db_conn):
+        result = await locations_table.update_if_confirmed(
             db_conn, location_id, user_id, props.model_dump(exclude_unset=True)
         )
 
+    record_write(user_id)
+    return result
+
 
 @log_async_func(logger.debug)
-async def delete(
-    db_conn: AsyncConnection, location_id: uuid.UUID, user_id: uuid.UUID
-) -> LocationRow | None:
-    """Delete a location from the database.
+async def delete_if_confirmed(
+    db_conn: DbConnection, location_id: uuid.UUID, user_id: uuid.UUID
+) -> UserLocationIds:
+    """Delete a location from the database, if the user is confirmed.
+
+    The user is checked within the same statement.
 
     Args:
         db_conn: database connection
-        location_id: location id to be updated
+        location_id: location id to be deleted
         user_id: location owner's user id
 
-    Returns: location row
+    Returns: user's confirmation flag and deleted location id
     """
-    async with db_conn.transaction():
-        return await locations_table.delete(db_conn, location_id, user_id)
+    async with single_statement(db_conn):
+        result = await locations_table.delete_if_confirmed(
+            db_conn, location_id, user_id
+        )
+
+    record_write(user_id)
+    return result
+
+
+@log_async_func(logger.debug)
+async def update_many(
+    db_conn: DbConnection,
+    user_id: uuid.UUID,
+    props_by_id: dict[uuid.UUID, UpdateLocationProperties],
+) -> dict[uuid.UUID, LocationRow | None]:
+    """Update locations in the database in one transaction.
+
+    Args:
+        db_conn: database connection
+        user_id: location owner's user id
+        props_by_id: update location properties request payload per location id
+
+    Returns: location row per location id, None if not found
+    """
+    async with single_statement(db_conn):
+        locations = await locations_table.update_many(
+            db_conn,
+            user_id,
+            {id: props.location_name for id, props in props_by_id.items()},
+        )
+
+    record_write(user_id)
+    updated = {location.id: location for location in locations}
+    return {id: updated.get(id) for id in props_by_id}
+
+
+@log_async_func(logger.debug)
+async def delete_many(
+    db_conn: DbConnection, user_id: uuid.UUID, location_ids: list[uuid.UUID]
+) -> dict[uuid.UUID, bool]:
+    """Delete locations from the database in one transaction.
+
+    Args:
+        db_conn: database connection
+        user_id: location owner's user id
+        location_ids: ids of the locations to be deleted
+
+    Returns: per location id True if deleted, False if not found
+    """
+    async with single_statement(db_conn):
+        locations = await locations_table.delete_many(db_conn, user_id, location_ids)
+
+    record_write(user_id)
+    deleted = {location.id for location in locations}
+    return {id: id in deleted for id in location_ids}
 
 
 @log_async_func(logger.debug)
 async def select_by_id(
-    db_conn: AsyncConnection, location_id: uuid.UUID
+    db_conn: DbConnection, location_id: uuid.UUID
 ) -> LocationRow | None:
     """Select location from the database by id.
 
@@ -86,12 +186,12 @@ async def select_by_id(
 
     Returns: location row
     """
-    return await locations_table.select_by_id(db_conn, location_id)
+    return await locations_table.select_by_id(read_only(db_conn), location_id)
 
 
 @log_async_func(logger.debug)
 async def select(
-    db_conn: AsyncConnection,
+    db_conn: DbConnection,
     user_id: uuid.UUID,
 ) -> list[LocationRow] | None:
     """Select locations from the database.
@@ -102,4 +202,56 @@ async def select(
 
     Returns: list of location rows
     """
-    return await locations_table.select(db_conn, user_id)
+    return await locations_table.select(read_only(db_conn, user_id), user_id)
+
+
+@log_async_func(logger.debug)
+async def select_page_if_confirmed(
+    db_conn: DbConnection,
+    user_id: uuid.UUID,
+    limit: int,
+    after_id: uuid.UUID | None = None,
+) -> tuple[UserLocations, uuid.UUID | None]:
+    """Select page of locations from the database, if the user is confirmed.
+
+    The user is checked within the same statement.
+
+    Args:
+        db_conn: database connection
+        user_id: location owner's user id
+        limit: page size
+        after_id: id of the last location of the previous page, None for first page
+
+    Returns: user's confirmation flag with list of location rows
+        and id to continue after, None on the last page
+    """
+    # one extra row tells, whether there is a next page
+    result = await locations_table.select_page_if_confirmed(
+        read_only(db_conn, user_id), user_id, limit + 1, after_id
+    )
+
+    locations = result.locations
+
+    if len(locations) > limit:
+        return result._replace(locations=locations[:limit]), locations[limit - 1].id
+
+    return result, None
+
+
+@log_async_func(logger.debug)
+async def select_chunks(
+    db_conn: DbConnection, user_id: uuid.UUID, chunk_size: int
+) -> AsyncGenerator[list[LocationRow], None]:
+    """Stream all user's locations from the database in chunks ordered by id.
+
+    Args:
+        db_conn: database connection
+        user_id: location owner's user id
+        chunk_size: number of locations fetched per round trip
+
+    Yields: chunks of location rows
+    """
+    async for locations in locations_table.select_chunks(
+        read_only(db_conn, user_id), user_id, chunk_size
+    ):
+        yield locations
@@ -1,24 +1,61 @@
 """Service layer for handling users lifecycle - register, update and delete.
 
 Database transaction is handled in this module.
+Single-statement writes run in autocommit, if enabled.
+User rows are cached in-process, every user write has to invalidate the cache.
+Requests are authorized by the user's auth columns only, cached separately.
+Cache misses are read from primary, stale replica rows must not be cached.
+Login rows are always read from the database, as the cache is per worker and
+other workers' writes are not invalidated in it.
 """
 
 import logging
 import uuid
+from functools import lru_cache
 
-from psycopg import AsyncConnection
-
-from ..repositories.users import UserRow, users_table
+from ..cache import TTLCache
+from ..config import get_cache_settings
+from ..db import DbConnection, record_write, single_statement
+from ..repositories.refresh_tokens import refresh_tokens_table
+from ..repositories.users import UserAuthRow, UserIdRow, UserRow, users_table
 from ..schemas import UpdateUserCredentials
-from ..security import get_password_hash
+from ..security import get_password_hash_async
+from ..token_epochs import get_token_epochs
 from ..utils import log_async_func
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache
+def get_users_cache() -> TTLCache[str, UserRow]:
+    """Lazy init cache of user rows keyed by user id."""
+    cache_settings = get_cache_settings()
+    return TTLCache(cache_settings.users_maxsize, cache_settings.users_ttl)
+
+
+@lru_cache
+def get_user_auths_cache() -> TTLCache[str, UserAuthRow]:
+    """Lazy init cache of user auth rows keyed by user id."""
+    cache_settings = get_cache_settings()
+    return TTLCache(cache_settings.users_maxsize, cache_settings.users_ttl)
+
+
+def invalidate_cached_user(user_id: uuid.UUID | str) -> None:
+    """Invalidate cached user row after a write, stale emails are detected on read.
+
+    Reads of the user also stay on primary within the read-your-writes window.
+
+    Args:
+        user_id: id of the user being invalidated
+    """
+    get_users_cache().pop(str(user_id))
+    get_user_auths_cache().pop(str(user_id))
+    record_write(user_id)
+
+
 @log_async_func(logger.debug)
-async def select_by_id(db_conn: AsyncConnection, user_id: uuid.UUID) -> UserRow | None:
-    """Select user from the database by id.
+async def select_by_id(db_conn: DbConnection, user_id: uuid.UUID) -> UserRow | None:
+    """Select user from the cache or from the database by id.
 
     Args:
         db_conn: database connection
@@ -26,12 +63,50 @@ async def select_by_id(db_conn: AsyncConnection, user_id: uuid.UUID) -> UserRow
 
     Returns: user row
     """
-    return await users_table.select_by_id(db_conn, user_id)
+    user = get_users_cache().get(str(user_id))
+
+    if user is None:
+        user = await users_table.select_by_id(db_conn, user_id)
+
+        if user is not None:
+            get_users_cache().set(str(user.id), user)
+
+    return user
+
+
+@log_async_func(logger.debug)
+async def select_auth_by_id(
+    db_conn: DbConnection, user_id: uuid.UUID
+) -> UserRow | UserAuthRow | None:
+    """Select columns needed to authorize a request of user by id.
+
+    Cached full user row is used, if there is one, otherwise only the auth
+    columns are selected from the database and cached.
+
+    Args:
+        db_conn: database connection
+        user_id: id of the user being selected
+
+    Returns: user row or user auth row
+    """
+    key = str(user_id)
+    user = get_users_cache().get(key) or get_user_auths_cache().get(key)
+
+    if user is None:
+        user = await users_table.select_auth_by_id(db_conn, user_id)
+
+        if user is not None:
+            get_user_auths_cache().set(key, user)
+
+    return user
 
 
 @log_async_func(logger.debug)
-async def select_by_email(db_conn: AsyncConnection, email: str) -> UserRow | None:
-    """Select user from the database by email.
+async def select_by_email(db_conn: DbConnection, email: str) -> UserRow | None:
+    """Select user from the database by email, e.g. to verify password on login.
+
+    Cached rows may hold password hash changed on another worker, so the row is
+    always selected from the database and refreshes the cache by id.
 
     Args:
         db_conn: database connection
@@ -39,12 +114,17 @@ async def select_by_email(db_conn: AsyncConnection, email: str) -> UserRow | Non
 
     Returns: user row
     """
-    return await users_table.select_by_email(db_conn, email)
+    user = await users_table.select_by_email(db_conn, email)
+
+    if user is not None:
+        get_users_cache().set(str(user.id), user)
+
+    return user
 
 
 @log_async_func(logger.debug)
 async def update(
-    db_conn: AsyncConnection, user_id: uuid.UUID, creds: UpdateUserCredentials
+    db_conn: DbConnection, user_id: uuid.UUID, creds: UpdateUserCredentials
 ) -> UserRow | None:
     """Update a user in the database.
 
@@ -59,21 +139,64 @@ async def update(
 
     if "password" in data.keys():
         password = data.pop("password")
-        data["password_hash"] = get_password_hash(password)
+        data["password_hash"] = await get_password_hash_async(password)
+
+        # password change signs out all sessions, a stolen refresh token included
+        async with db_conn.transaction():
+            user = await users_table.update(db_conn, user_id, data)
+            await refresh_tokens_table.delete_by_user_id(db_conn, user_id)
+
+    else:
+        async with single_statement(db_conn):
+            user = await users_table.update(db_conn, user_id, data)
 
-    async with db_conn.transaction():
-        return await users_table.update(db_conn, user_id, data)
+    invalidate_cached_user(user_id)
+
+    if user is not None:
+        get_token_epochs().set(user.id, user.token_epoch)
+
+    return user
 
 
 @log_async_func(logger.debug)
-async def delete(db_conn: AsyncConnection, user_id: uuid.UUID) -> UserRow | None:
-    """Delete a user from the database.
+async def update_password_hash(
+    db_conn: DbConnection, user_id: uuid.UUID, password_hash: str
+) -> UserRow | None:
+    """Replace password hash of a user in the database, e.g. after rehash.
 
     Args:
         db_conn: database connection
         user_id: user id to be updated
+        password_hash: new password hash
 
     Returns: user row
     """
-    async with db_conn.transaction():
-        return await users_table.delete(db_conn, user_id)
+    async with single_statement(db_conn):
+        user = await users_table.update(
+            db_conn, user_id, {"password_hash": password_hash}
+        )
+
+    invalidate_cached_user(user_id)
+
+    if user is not None:
+        get_token_epochs().set(user.id, user.token_epoch)
+
+    return user
+
+
+@log_async_func(logger.debug)
+async def delete(db_conn: DbConnection, user_id: uuid.UUID) -> UserIdRow | None:
+    """Delete a user from the database.
+
+    Args:
+        db_conn: database connection
+        user_id: user id to be updated
+
+    Returns: deleted user id row
+    """
+    async with single_statement(db_conn):
+        user = await users_table.delete(db_conn, user_id)
+
+    invalidate_cached_user(user_id)
+    get_token_epochs().revoke(user_id)
+    return user
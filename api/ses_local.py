@@ -0,0 +1,37 @@
+"""Local stand-in of the SES v2 send email endpoint for tests and development.
+
+Accepts signed send email requests and keeps the emails in memory instead of
+sending them.
+
+Usage: uv run uvicorn api.ses_local:app --port 4579
+    and set AWS_SES_ENDPOINT_URL=http://localhost:4579
+"""
+
+import uuid
+from typing import Any
+
+from fastapi import FastAPI, HTTPException, Request, status
+
+app = FastAPI(title="SES stand-in")
+sent_emails: list[dict[str, Any]] = []
+
+
+@app.post("/v2/email/outbound-emails")
+async def send_email(request: Request) -> dict[str, str]:
+    """Record email and return SES-like response.
+
+    Args:
+        request: signed SES v2 SendEmail request
+
+    Returns: dict with generated MessageId
+
+    Raises:
+        HTTPException: if the request is not SigV4 signed.
+    """
+    if not request.headers.get("Authorization", "").startswith("AWS4-HMAC-SHA256"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Missing signature"
+        )
+
+    sent_emails.append(await request.json())
+    return {"MessageId": str(uuid.uuid4())}
@@ -0,0 +1,161 @@
+"""Login throttling keyed by email, applied before the expensive password hashing.
+
+Failed logins of an email are counted, after threshold is reached, the email is
+blocked for exponentially growing delay. Counters live in bounded in-process LRU,
+or in limits storage (e.g. async+redis://) shared across workers.
+"""
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+from fastapi import HTTPException, status
+from limits.aio.storage import Storage
+from limits.storage import storage_from_string
+
+from .config import get_throttle_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _throttled_exception(retry_after: float) -> HTTPException:
+    """Build too many requests exception with Retry-After header."""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many failed login attempts",
+        headers={"Retry-After": str(math.ceil(retry_after))},
+    )
+
+
+class LoginThrottle:
+    """Failed logins counter with exponential backoff per email."""
+
+    def __init__(
+        self,
+        maxsize: int,
+        threshold: int,
+        base_delay: int,
+        max_delay: int,
+        window: int,
+        storage_uri: str | None = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.window = window
+        # email -> (failures, last failure time, blocked until time)
+        self.entries: OrderedDict[str, tuple[int, float, float]] = OrderedDict()
+        self.storage: Any = None
+
+        if storage_uri is not None:
+            self.storage = storage_from_string(storage_uri)
+
+            if not isinstance(self.storage, Storage):
+                raise ValueError(
+                    "Login throttle storage must be async, e.g. async+redis://"
+                )
+
+    def _get_delay(self, failures: int) -> int:
+        """Get block delay in seconds after given number of failures."""
+        if failures < self.threshold:
+            return 0
+
+        exponent = min(failures - self.threshold, 32)
+        return min(self.base_delay * 2**exponent, self.max_delay)
+
+    async def check(self, email: str) -> None:
+        """Check email is not blocked.
+
+        Args:
+            email: email of the login attempt
+
+        Raises:
+            HTTPException: if email is blocked.
+        """
+        key = email.strip().lower()
+        now = time.time()
+
+        if self.storage is not None:
+            if await self.storage.get(f"login-block:{key}") > 0:
+                blocked_until = await self.storage.get_expiry(f"login-block:{key}")
+                raise _throttled_exception(blocked_until - now)
+
+            return
+
+        entry = self.entries.get(key)
+
+        if entry is not None and entry[2] > now:
+            raise _throttled_exception(entry[2] - now)
+
+    async def failure(self, email: str) -> None:
+        """Count failed login attempt and block the email if threshold is reached.
+
+        Args:
+            email: email of the login attempt
+        """
+        key = email.strip().lower()
+        now = time.time()
+
+        if self.storage is not None:
+            failures = await self.storage.incr(
+                f"login-failures:{key}", math.ceil(self.window)
+            )
+            delay = self._get_delay(failures)
+
+            if delay > 0:
+                await self.storage.clear(f"login-block:{key}")
+                await self.storage.incr(f"login-block:{key}", math.ceil(delay))
+
+        else:
+            failures, last_failure, _ = self.entries.get(key, (0, now, now))
+
+            if now - last_failure > self.window:
+                failures = 0
+
+            failures += 1
+            delay = self._get_delay(failures)
+            self.entries[key] = (failures, now, now + delay)
+            self.entries.move_to_end(key)
+
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+        if delay > 0:
+            logger.warning(f"Login blocked for {delay:.0f}s after {failures} failures.")
+
+    async def success(self, email: str) -> None:
+        """Reset failed login attempts after successful login.
+
+        Args:
+            email: email of the login attempt
+        """
+        key = email.strip().lower()
+
+        if self.storage is not None:
+            await self.storage.clear(f"login-failures:{key}")
+            await self.storage.clear(f"login-block:{key}")
+
+        else:
+            self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Reset all in-process counters."""
+        self.entries.clear()
+
+
+@lru_cache
+def get_login_throttle() -> LoginThrottle:
+    """Lazy init login throttle."""
+    throttle_settings = get_throttle_settings()
+    return LoginThrottle(
+        maxsize=throttle_settings.maxsize,
+        threshold=throttle_settings.threshold,
+        base_delay=throttle_settings.base_delay,
+        max_delay=throttle_settings.max_delay,
+        window=throttle_settings.window,
+        storage_uri=throttle_settings.storage_uri,
+    )
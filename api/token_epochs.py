@@ -0,0 +1,63 @@
+"""Registry of the latest known token epoch per user.
+
+Used by stateless access tokens - claims signed with an older epoch than the one
+known here are stale and the user has to be looked up in the database.
+"""
+
+import sys
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+
+from .config import get_jwt_settings
+
+REVOKED_EPOCH = sys.maxsize
+
+
+class TokenEpochs:
+    """Bounded LRU registry of token epochs keyed by user id."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.epochs: OrderedDict[str, int] = OrderedDict()
+
+    def set(self, user_id: uuid.UUID | str, epoch: int) -> None:
+        """Record token epoch of a user, epochs never go backwards.
+
+        Args:
+            user_id: user id
+            epoch: current token epoch of the user
+        """
+        key = str(user_id)
+        self.epochs[key] = max(epoch, self.epochs.get(key, epoch))
+        self.epochs.move_to_end(key)
+
+        if len(self.epochs) > self.maxsize:
+            self.epochs.popitem(last=False)
+
+    def revoke(self, user_id: uuid.UUID | str) -> None:
+        """Mark all tokens of a user as stale, e.g. when the user is deleted.
+
+        Args:
+            user_id: user id
+        """
+        self.set(user_id, REVOKED_EPOCH)
+
+    def is_stale(self, user_id: uuid.UUID | str, epoch: int) -> bool:
+        """Check whether token epoch is older than the latest known one.
+
+        Args:
+            user_id: user id
+            epoch: token epoch from the token claims
+
+        Returns: True if a newer epoch is known, otherwise False
+        """
+        known_epoch = self.epochs.get(str(user_id))
+        return known_epoch is not None and known_epoch > epoch
+
+
+@lru_cache
+def get_token_epochs() -> TokenEpochs:
+    """Lazy init token epochs registry."""
+    jwt_settings = get_jwt_settings()
+    return TokenEpochs(jwt_settings.epochs_maxsize)
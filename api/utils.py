@@ -1,6 +1,10 @@
+import base64
+import binascii
+import inspect
+import uuid
 from collections.abc import Callable
-from functools import wraps
-from typing import Any, Iterable
+from functools import lru_cache, wraps
+from typing import Any, NamedTuple
 
 from psycopg import sql
 
@@ -12,11 +16,32 @@ def format_sql_query(sql_query: sql.Composed) -> str:
     return " ".join([query_line.strip() for query_line in sql_query_lines])
 
 
-def build_set_clause(columns: Iterable[str]) -> sql.Composed:
+class Query(NamedTuple):
+    """SQL query rendered once, with its one line form for logs."""
+
+    sql: bytes
+    log: str
+
+
+def compile_query(sql_query: sql.Composed) -> Query:
+    """Render SQL query object once, so executing it skips the composition.
+
+    Args:
+        sql_query: SQL query object
+
+    Returns: rendered query
+    """
+    return Query(sql_query.as_bytes(None), format_sql_query(sql_query))
+
+
+@lru_cache(maxsize=256)
+def build_set_clause(columns: frozenset[str]) -> sql.Composed:
     """Build comma delimited SET clause: col = %(col)s from columns for UPDATE query.
 
+    Memoized, columns are sorted so the same set of columns gives the same query.
+
     Args:
-        columns: columns: iterable of column names
+        columns: frozenset of column names
 
     Returns: SET clause as SQL query object
     """
@@ -25,10 +50,62 @@ def build_set_clause(columns: Iterable[str]) -> sql.Composed:
             columns=sql.Identifier(col),
             value_placeholder=sql.Placeholder(col),
         )
+        for col in sorted(columns)
+    )
+
+
+@lru_cache(maxsize=64)
+def build_column_list(
+    columns: tuple[str, ...], table: str | None = None
+) -> sql.Composed:
+    """Build comma delimited column list for SELECT or RETURNING clause.
+
+    Pass fields of the row type the query is fetched into, so the query selects
+    only the columns the caller needs.
+
+    Args:
+        columns: tuple of column names, e.g. LocationRow._fields
+        table: table name or alias to qualify the columns with
+
+    Returns: column list as SQL query object
+    """
+    return sql.SQL(", ").join(
+        sql.Identifier(table, col) if table is not None else sql.Identifier(col)
         for col in columns
     )
 
 
+def encode_cursor(last_id: uuid.UUID) -> str:
+    """Encode id of the last row of a page into opaque pagination cursor.
+
+    Args:
+        last_id: id of the last row of the page
+
+    Returns: url safe cursor
+    """
+    return base64.urlsafe_b64encode(last_id.bytes).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> uuid.UUID:
+    """Decode opaque pagination cursor into id of the last row of a page.
+
+    Args:
+        cursor: url safe cursor
+
+    Returns: id of the last row of the previous page
+
+    Raises:
+        ValueError: if the cursor is malformed.
+    """
+    try:
+        return uuid.UUID(
+            bytes=base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        )
+
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
 def _get_func_name(func: Callable[..., Any], args: tuple[Any, ...]) -> str:
     """Helper function for function name logging.
 
@@ -46,10 +123,26 @@ def _get_func_name(func: Callable[..., Any], args: tuple[Any, ...]) -> str:
 
 
 def log_async_func(log_func: Callable[..., Any] = print) -> Callable[..., Any]:
-    """Decorator factory that accepts a logging function."""
+    """Decorator factory that accepts a logging function.
+
+    Async generator functions are logged as finished once exhausted.
+    """
 
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
         """Decorator, that wraps the function."""
+        if inspect.isasyncgenfunction(func):
+
+            @wraps(func)
+            async def gen_wrapper(*args: Any, **kwargs: Any) -> Any:
+                func_name = _get_func_name(func, args)
+
+                log_func(f"{func_name}() was called.")
+                async for item in func(*args, **kwargs):
+                    yield item
+
+                log_func(f"{func_name}() finished.")
+
+            return gen_wrapper
 
         @wraps(func)
         async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
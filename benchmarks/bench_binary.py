@@ -0,0 +1,137 @@
+"""Benchmark of binary result transfer against a running database.
+
+Fetches a large location list with text and with binary results, measuring
+time of the query round trip, time of parsing the rows into LocationRow and
+size of the transferred result values. Checks LocationRow and UserRow contents
+fetched through the repositories are the same in both formats. Uses the DB_*
+settings from .env, creates a throwaway user and removes it afterwards.
+
+Usage: uv run --dev python -m benchmarks.bench_binary --locations 10000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import NamedTuple
+
+from psycopg.rows import class_row
+from psycopg_pool import AsyncConnectionPool
+
+from api.config import get_db_settings
+from api.db import LazyConnection, create_connection_pool
+from api.repositories.locations import LocationRow, locations_table
+from api.repositories.users import users_table
+
+
+class Measurement(NamedTuple):
+    """Mean timings and result size of a location list fetch."""
+
+    query_ms: float
+    parse_ms: float
+    result_bytes: int
+
+
+async def measure_fetch(
+    pool: AsyncConnectionPool, user_id: uuid.UUID, binary: bool, rounds: int
+) -> Measurement:
+    """Measure fetch of all locations of the user.
+
+    Args:
+        pool: database connection pool
+        user_id: owner of the fetched locations
+        binary: fetch results in binary format
+        rounds: number of fetches to average
+
+    Returns: mean query and parse time in milliseconds and result size in bytes
+    """
+    query = locations_table.select_query
+    query_s = parse_s = 0.0
+    result_bytes = 0
+
+    async with pool.connection() as conn:
+        for _ in range(rounds):
+            async with conn.cursor(
+                row_factory=class_row(LocationRow), binary=binary
+            ) as cur:
+                start = time.perf_counter()
+                await cur.execute(query.sql, dict(user_id=user_id))
+                executed = time.perf_counter()
+                await cur.fetchall()  # rows are parsed on fetch
+                query_s += executed - start
+                parse_s += time.perf_counter() - executed
+
+                result = cur.pgresult
+                assert result is not None
+                result_bytes = sum(
+                    len(result.get_value(row, col) or b"")
+                    for row in range(result.ntuples)
+                    for col in range(result.nfields)
+                )
+
+    return Measurement(query_s / rounds * 1000, parse_s / rounds * 1000, result_bytes)
+
+
+async def main() -> None:
+    """Print text and binary fetch measurements and check rows are the same."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--locations", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    db_settings = get_db_settings()
+
+    async with create_connection_pool() as pool:
+        db_conn = LazyConnection(pool)
+
+        async with db_conn.transaction():
+            user = await users_table.insert(
+                db_conn, email=f"bench-{uuid.uuid4()}@test.net", password_hash="x"
+            )
+            assert user is not None
+
+            for start in range(0, args.locations, 1000):
+                await locations_table.insert_many(
+                    db_conn,
+                    user.id,
+                    [
+                        f"bench-{i}"
+                        for i in range(start, min(start + 1000, args.locations))
+                    ],
+                )
+
+        try:
+            results, users, locations = {}, {}, {}
+            for binary in (False, True):
+                await measure_fetch(pool, user.id, binary, 2)  # warm up
+                results[binary] = await measure_fetch(
+                    pool, user.id, binary, args.rounds
+                )
+
+                db_settings.binary_results = binary
+                users[binary] = await users_table.select_by_id(db_conn, user.id)
+                locations[binary] = await locations_table.select(db_conn, user.id)
+
+        finally:
+            async with db_conn.transaction():
+                await users_table.delete(db_conn, user.id)
+
+    assert users[False] == users[True], "UserRow differs in binary format."
+    assert locations[False] == locations[True], "LocationRow differs in binary format."
+
+    for binary, measurement in results.items():
+        print(
+            f"{'binary' if binary else 'text':>6}: "
+            f"query {measurement.query_ms:8.2f} ms, "
+            f"parse {measurement.parse_ms:8.2f} ms, "
+            f"result {measurement.result_bytes:10d} B"
+        )
+
+    before, after = results[False], results[True]
+    print(
+        f"parse: {before.parse_ms / after.parse_ms:4.2f}x faster, "
+        f"result: {1 - after.result_bytes / before.result_bytes:.0%} smaller"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,50 @@
+"""Micro-benchmark of api.auth.get_sub with and without verified token cache.
+
+Usage: uv run --dev python -m benchmarks.bench_get_sub
+"""
+
+import secrets
+import timeit
+import uuid
+from unittest.mock import patch
+
+from api.auth import create_access_token, get_sub, get_tokens_cache
+from api.config import JwtSettings
+
+NUMBER = 20_000
+REQUEST_RATES = (100, 1_000, 5_000)  # authenticated requests per second
+
+
+def bench(cache_maxsize: int) -> float:
+    """Return mean get_sub() duration in seconds."""
+    jwt_settings = JwtSettings(
+        secret_key=secrets.token_hex(32), cache_maxsize=cache_maxsize
+    )
+
+    with patch("api.auth.get_jwt_settings", return_value=jwt_settings):
+        get_tokens_cache.cache_clear()
+        token = create_access_token(uuid.uuid4())
+        get_sub(token, typ="access")  # warm up
+        duration = timeit.timeit(lambda: get_sub(token, typ="access"), number=NUMBER)
+
+    get_tokens_cache.cache_clear()
+    return duration / NUMBER
+
+
+def main() -> None:
+    """Print per call duration and CPU time spent per second of traffic."""
+    uncached = bench(cache_maxsize=0)
+    cached = bench(cache_maxsize=1024)
+    print(f"get_sub uncached: {uncached * 1e6:8.2f} us/call")
+    print(f"get_sub cached:   {cached * 1e6:8.2f} us/call")
+
+    for rate in REQUEST_RATES:
+        print(
+            f"{rate:>5} req/s: "
+            f"{uncached * rate * 1e3:7.2f} ms -> {cached * rate * 1e3:7.2f} ms "
+            "CPU per second"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Micro-benchmark of per-query Python overhead of the repository SQL.
+
+Compares composing the SQL object per call (as the repositories used to do,
+including the debug log formatting and the rendering done by cur.execute)
+with the queries compiled once per table.
+
+Usage: uv run --dev python -m benchmarks.bench_queries
+"""
+
+import timeit
+from typing import Any, Callable
+
+from psycopg import sql
+
+from api.repositories.users import users_table
+from api.utils import format_sql_query
+
+NUMBER = 20_000
+DATA = {"email": "update@test.net", "password_hash": "hash"}
+
+
+def per_call_select() -> bytes:
+    """Compose SELECT by id query per call."""
+    query = sql.SQL("""
+        SELECT * FROM {table}
+        WHERE id = %(user_id)s;
+    """).format(table=sql.Identifier("users"))
+    format_sql_query(query)
+    return query.as_bytes(None)
+
+
+def per_call_update() -> bytes:
+    """Compose UPDATE query with SET clause per call."""
+    set_clause = sql.SQL(", ").join(
+        sql.SQL("{columns} = {value_placeholder}").format(
+            columns=sql.Identifier(col),
+            value_placeholder=sql.Placeholder(col),
+        )
+        for col in DATA
+    )
+    query = sql.SQL("""
+        UPDATE {table}
+        SET {set_clause}, token_epoch = token_epoch + 1
+        WHERE id = %(user_id)s
+        RETURNING *;
+    """).format(table=sql.Identifier("users"), set_clause=set_clause)
+    format_sql_query(query)
+    return query.as_bytes(None)
+
+
+def compiled_select() -> bytes:
+    """Get precompiled SELECT by id query."""
+    query = users_table.select_by_id_query
+    f"{query.log}"
+    return query.sql
+
+
+def compiled_update() -> bytes:
+    """Get UPDATE query compiled for the set of updated columns."""
+    query = users_table.get_update_query(frozenset(DATA))
+    f"{query.log}"
+    return query.sql
+
+
+def bench(func: Callable[[], Any]) -> float:
+    """Return mean duration of func in seconds."""
+    func()  # warm up
+    return timeit.timeit(func, number=NUMBER) / NUMBER
+
+
+def main() -> None:
+    """Print per query overhead before and after compiling the queries once."""
+    for name, per_call, compiled in (
+        ("select_by_id", per_call_select, compiled_select),
+        ("update", per_call_update, compiled_update),
+    ):
+        before, after = bench(per_call), bench(compiled)
+        print(
+            f"{name:<13} per call: {before * 1e6:7.2f} us, "
+            f"compiled once: {after * 1e6:7.2f} us ({before / after:5.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
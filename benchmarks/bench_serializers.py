@@ -0,0 +1,72 @@
+"""Micro-benchmark of locations list serialization.
+
+Compares the precompiled serializer with the response model path, which
+validated rows into LocationsResponse in the router and then let FastAPI
+dump, validate and serialize the response model again.
+
+Usage: uv run --dev python -m benchmarks.bench_serializers
+"""
+
+import json
+import timeit
+import uuid
+from datetime import datetime, timezone
+
+from api.repositories.locations import LocationRow
+from api.schemas import LocationsResponse
+from api.serializers import dump_locations_response
+
+NUMBER = 200
+PAGE_SIZES = (50, 1_000)
+
+
+def response_model_path(locations: list[LocationRow], next_cursor: str) -> bytes:
+    """Serialize rows the way the router and FastAPI did via response model."""
+    response = LocationsResponse(
+        locations=[loc._asdict() for loc in locations],
+        next_cursor=next_cursor,
+    )
+    # FastAPI: dump returned model, validate it against response_model, serialize
+    content = LocationsResponse.model_validate(response.model_dump())
+    return json.dumps(
+        content.model_dump(mode="json"),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode()
+
+
+def main() -> None:
+    """Print per page duration of both paths."""
+    for page_size in PAGE_SIZES:
+        locations = [
+            LocationRow(
+                id=uuid.uuid4(),
+                created_at=datetime.now(timezone.utc),
+                user_id=uuid.uuid4(),
+                location_name=f"location {i}",
+            )
+            for i in range(page_size)
+        ]
+        next_cursor = "cursor"
+        assert json.loads(response_model_path(locations, next_cursor)) == json.loads(
+            dump_locations_response(locations, next_cursor)
+        ), "Serializers differ."
+
+        before = timeit.timeit(
+            lambda: response_model_path(locations, next_cursor), number=NUMBER
+        )
+        after = timeit.timeit(
+            lambda: dump_locations_response(locations, next_cursor), number=NUMBER
+        )
+        print(
+            f"{page_size:>5} rows: "
+            f"response model {before / NUMBER * 1e3:7.3f} ms, "
+            f"serializer {after / NUMBER * 1e3:7.3f} ms, "
+            f"{before / after:5.1f}x faster"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark of single-statement write throughput against a running database.
+
+Compares location create and delete writes wrapped in explicit transactions
+(BEGIN and COMMIT round trips around every statement) with the same writes
+run in autocommit. Uses the DB_* settings from .env, creates a throwaway user
+and removes it afterwards.
+
+Usage: uv run --dev python -m benchmarks.bench_writes --writes 2000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from psycopg_pool import AsyncConnectionPool
+
+from api.config import get_db_settings
+from api.db import LazyConnection, create_connection_pool
+from api.repositories.users import users_table
+from api.schemas import CreateLocationProperties
+from api.services import locations as location_service
+
+
+async def run_writes(
+    pool: AsyncConnectionPool, user_id: uuid.UUID, writes: int, concurrency: int
+) -> float:
+    """Run location create and delete writes concurrently.
+
+    Args:
+        pool: database connection pool
+        user_id: owner of the created locations
+        writes: total number of writes, half creates and half deletes
+        concurrency: number of concurrent writers
+
+    Returns: writes per second
+    """
+
+    async def writer(n: int) -> None:
+        for _ in range(n // 2):
+            # fresh handle per request, like connect_to_db
+            db_conn = LazyConnection(pool)
+            props = CreateLocationProperties(location_name=f"bench-{uuid.uuid4()}")
+            result = await location_service.create_if_confirmed(db_conn, user_id, props)
+            assert result.locations
+            await location_service.delete_if_confirmed(
+                db_conn, result.locations[0].id, user_id
+            )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(writer(writes // concurrency) for _ in range(concurrency)))
+    return writes / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    """Print write throughput with transactions and in autocommit."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    db_settings = get_db_settings()
+
+    async with create_connection_pool() as pool:
+        db_conn = LazyConnection(pool)
+
+        async with db_conn.transaction():
+            user = await users_table.insert(
+                db_conn, email=f"bench-{uuid.uuid4()}@test.net", password_hash="x"
+            )
+            assert user is not None
+            # location writes check the owner is confirmed
+            await users_table.update(db_conn, user.id, {"confirmed": True})
+
+        try:
+            results = {}
+            for autocommit in (False, True):
+                db_settings.autocommit_single_statements = autocommit
+                await run_writes(pool, user.id, 100, args.concurrency)  # warm up
+                results[autocommit] = await run_writes(
+                    pool, user.id, args.writes, args.concurrency
+                )
+
+        finally:
+            async with db_conn.transaction():
+                await users_table.delete(db_conn, user.id)
+
+    before, after = results[False], results[True]
+    print(
+        f"writes/s transaction: {before:8.0f}, "
+        f"autocommit: {after:8.0f} ({after / before:4.2f}x)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
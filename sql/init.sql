@@ -9,6 +9,7 @@ CREATE TABLE users (
     email TEXT NOT NULL UNIQUE,
     password_hash TEXT NOT NULL,
     confirmed BOOLEAN NOT NULL DEFAULT FALSE,
+    token_epoch INTEGER NOT NULL DEFAULT 0,
     created_at TIMESTAMPTZ NOT NULL DEFAULT now()
     -- role public.userrole NOT NULL DEFAULT 'STANDARD',
 );
@@ -20,3 +21,30 @@ CREATE TABLE locations (
     created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
     CONSTRAINT unique_location_name_per_user_id UNIQUE (user_id, location_name)
 );
+
+-- keyset pagination of user's locations ordered by id
+CREATE INDEX locations_user_id_id_idx ON locations (user_id, id);
+
+CREATE TABLE refresh_tokens (
+    id UUID PRIMARY KEY DEFAULT uuidv7(),
+    user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    token_hash TEXT NOT NULL UNIQUE,
+    expires_at TIMESTAMPTZ NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX refresh_tokens_user_id_idx ON refresh_tokens (user_id);
+CREATE INDEX refresh_tokens_expires_at_idx ON refresh_tokens (expires_at);
+
+CREATE TABLE email_outbox (
+    id UUID PRIMARY KEY DEFAULT uuidv7(),
+    recipient TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    params JSONB NOT NULL DEFAULT '{}',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX email_outbox_next_attempt_at_idx ON email_outbox (next_attempt_at);
@@ -10,9 +10,11 @@ from testcontainers.postgres import PostgresContainer
 
 from api.auth import create_access_token, create_confirmation_token
 from api.config import DbSettings
-from api.db import get_conn_info
+from api.db import get_conn_info, get_conn_kwargs
 from api.main import app
 from api.repositories.users import UserRow
+from api.services.users import get_user_auths_cache, get_users_cache
+from api.throttle import get_login_throttle
 
 ROOT = Path(__file__).parent.parent.resolve()
 
@@ -25,10 +27,25 @@ def mock_send_email() -> Generator[MagicMock, None, None]:
             "ResponseMetadata": {},
         },
     )
-    with patch("api.routers.auth.ses_send_email", return_value=msg) as mock:
+    with patch("api.outbox.ses_send_email", return_value=msg) as mock:
         yield mock
 
 
+@pytest.fixture(autouse=True)
+def clear_users_cache() -> Generator[None, None, None]:
+    """Users cache must not leak user rows between tests."""
+    yield
+    get_users_cache().clear()
+    get_user_auths_cache().clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_login_throttle() -> Generator[None, None, None]:
+    """Failed logins must not block the shared test email between tests."""
+    yield
+    get_login_throttle().clear()
+
+
 @pytest.fixture(scope="session")
 def test_db() -> Generator[PostgresContainer, None, None]:
     with PostgresContainer("postgres:18").with_volume_mapping(
@@ -64,7 +81,9 @@ async def test_client(mock_db_settings: MagicMock) -> AsyncGenerator[AsyncClient
 @pytest_asyncio.fixture
 async def db_conn(mock_db_settings: MagicMock) -> AsyncGenerator[AsyncConnection, None]:
     """Create connection."""
-    async with await AsyncConnection.connect(conninfo=get_conn_info()) as conn:
+    async with await AsyncConnection.connect(
+        conninfo=get_conn_info(), **get_conn_kwargs()
+    ) as conn:
         yield conn
 
 
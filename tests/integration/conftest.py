@@ -5,9 +5,12 @@ from unittest.mock import MagicMock
 
 import pytest
 import pytest_asyncio
+from httpx import AsyncClient
 from psycopg import AsyncConnection
 
 from api.auth import create_access_token, create_confirmation_token
+from api.main import app
+from api.outbox import EmailOutboxWorker
 from api.repositories.locations import LocationRow
 from api.repositories.users import UserRow
 from api.schemas import CreateLocationProperties, RegisterUserCredentials
@@ -49,11 +52,12 @@ async def created_location(
     confirmed_user: UserRow,
     props: dict[str, str],
 ) -> AsyncGenerator[LocationRow, None]:
-    location = await location_service.create(
+    result = await location_service.create_if_confirmed(
         db_conn, confirmed_user.id, CreateLocationProperties(**props)
     )
+    location = result.locations[0]
     yield location
-    await location_service.delete(db_conn, location.id, confirmed_user.id)
+    await location_service.delete_if_confirmed(db_conn, location.id, confirmed_user.id)
 
 
 @pytest.fixture
@@ -84,3 +88,22 @@ def random_user_access_token() -> str:
 @pytest.fixture
 def random_user_confirmation_token() -> str:
     return create_confirmation_token(uuid.uuid4())
+
+
+@pytest_asyncio.fixture
+async def outbox_worker(
+    test_client: AsyncClient, db_conn: AsyncConnection
+) -> AsyncGenerator[EmailOutboxWorker, None]:
+    """Outbox worker draining the outbox via the app's connection pool."""
+    yield EmailOutboxWorker(
+        app.state.pool,
+        batch_size=10,
+        send_rate=1000,
+        max_attempts=3,
+        base_delay=60,
+        max_delay=600,
+        lease=60,
+        poll_interval=0,
+    )
+    async with db_conn.transaction():
+        await db_conn.execute("DELETE FROM email_outbox;")
@@ -4,8 +4,14 @@ import pytest
 from httpx import AsyncClient
 from psycopg import AsyncConnection
 
+from api.outbox import EmailOutboxWorker
 from api.repositories.users import UserRow, users_table
-from api.schemas import BaseResponse, ResponseWithId, TokenResponse
+from api.schemas import (
+    BaseResponse,
+    ResponseWithId,
+    TokenResponse,
+    UpdateUserCredentials,
+)
 from api.services import users as user_service
 
 
@@ -91,6 +97,94 @@ class TestLogin:
         assert response.status_code == 401
 
 
+class TestRefresh:
+    """Integration tests for refresh endpoint."""
+
+    async def _login(self, test_client: AsyncClient, creds: dict[str, str]) -> str:
+        data = {
+            "username": creds["email"],
+            "password": creds["password"],  # plain password
+        }
+        response = await test_client.post(
+            "/api/v1/auth/token",
+            data=data,
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+        return response.json()["refresh_token"]
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_refresh(
+        self,
+        test_client: AsyncClient,
+        creds: dict[str, str],
+        confirmed_user: UserRow,
+    ) -> None:
+        """Testing expected case."""
+        refresh_token = await self._login(test_client, creds)
+        response = await test_client.post(
+            "/api/v1/auth/refresh", json={"refresh_token": refresh_token}
+        )
+        assert response.status_code == 200
+        token = TokenResponse.model_validate(response.json())
+        assert token.refresh_token != refresh_token, "Refresh token not rotated."
+
+        response = await test_client.get(
+            "/api/v1/locations",
+            headers={"Authorization": f"Bearer {token.access_token}"},
+        )
+        assert response.status_code == 200
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_refresh_with_used_refresh_token(
+        self,
+        test_client: AsyncClient,
+        creds: dict[str, str],
+        confirmed_user: UserRow,
+    ) -> None:
+        refresh_token = await self._login(test_client, creds)
+        response = await test_client.post(
+            "/api/v1/auth/refresh", json={"refresh_token": refresh_token}
+        )
+        assert response.status_code == 200
+
+        response = await test_client.post(
+            "/api/v1/auth/refresh", json={"refresh_token": refresh_token}
+        )
+        assert response.status_code == 401
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_refresh_after_password_change(
+        self,
+        test_client: AsyncClient,
+        db_conn: AsyncConnection,
+        creds: dict[str, str],
+        confirmed_user: UserRow,
+    ) -> None:
+        refresh_token = await self._login(test_client, creds)
+        await user_service.update(
+            db_conn, confirmed_user.id, UpdateUserCredentials(password="update")
+        )
+
+        response = await test_client.post(
+            "/api/v1/auth/refresh", json={"refresh_token": refresh_token}
+        )
+        assert response.status_code == 401, "Refresh token survived password change."
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_refresh_with_random_refresh_token(
+        self,
+        test_client: AsyncClient,
+    ) -> None:
+        response = await test_client.post(
+            "/api/v1/auth/refresh", json={"refresh_token": "random"}
+        )
+        assert response.status_code == 401
+
+
 class TestRegister:
     """Integration tests for create user endpoints."""
 
@@ -101,14 +195,20 @@ class TestRegister:
         test_client: AsyncClient,
         creds: dict[str, str],
         mock_send_email: MagicMock,
+        outbox_worker: EmailOutboxWorker,
         db_conn: AsyncConnection,
     ) -> None:
         """Testing expected case."""
         response = await test_client.post("/api/v1/auth/register", json=creds)
         assert response.status_code == 201
-        mock_send_email.assert_called_once()
         assert ResponseWithId.model_validate(response.json())
 
+        # confirmation email is sent by the outbox worker, not the request
+        mock_send_email.assert_not_called()
+        assert await outbox_worker.drain_once() == 1
+        mock_send_email.assert_called_once()
+        assert mock_send_email.call_args.args[0] == creds["email"]
+
         user_id = response.json()["id"]
         user = await user_service.select_by_id(db_conn, user_id)
         assert user is not None, "User does not exist in db."
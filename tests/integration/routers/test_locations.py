@@ -1,3 +1,4 @@
+import json
 import uuid
 
 import pytest
@@ -8,6 +9,7 @@ from api.repositories.locations import LocationRow
 from api.repositories.users import UserRow
 from api.schemas import (
     BaseResponse,
+    BulkResponse,
     CreateLocationProperties,
     Location,
     LocationsResponse,
@@ -43,7 +45,9 @@ class TestCreate:
         assert location_from_db is not None, "Location does not exist in db."
 
         # clean-up
-        await location_service.delete(db_conn, location_id, confirmed_user.id)
+        await location_service.delete_if_confirmed(
+            db_conn, location_id, confirmed_user.id
+        )
 
     @pytest.mark.integration
     @pytest.mark.asyncio
@@ -292,11 +296,12 @@ class TestUpdate:
         access_token: str,
         db_conn: AsyncConnection,
     ) -> None:
-        location = await location_service.create(
+        result = await location_service.create_if_confirmed(
             db_conn,
             confirmed_user.id,
             props=CreateLocationProperties(location_name="new"),
         )
+        location = result.locations[0]
         response = await test_client.put(
             f"/api/v1/locations/{location.id}",
             json={"location_name": created_location.location_name},
@@ -416,6 +421,118 @@ class TestUpdate:
         assert response.status_code == 401
 
 
+class TestBulkCreate:
+    """Integration tests for bulk create locations endpoint."""
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_create_locations_bulk(
+        self,
+        test_client: AsyncClient,
+        created_location: LocationRow,
+        confirmed_user: UserRow,
+        access_token: str,
+    ) -> None:
+        """Testing conflicts are reported per item."""
+        response = await test_client.post(
+            "/api/v1/locations/bulk",
+            json={
+                "locations": [
+                    {"location_name": "new-location"},
+                    {"location_name": created_location.location_name},
+                    {"location_name": "new-location"},
+                ]
+            },
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert BulkResponse.model_validate(data)
+        assert [result["status_code"] for result in data["results"]] == [
+            201,
+            409,
+            409,
+        ]
+
+        response = await test_client.get(
+            "/api/v1/locations",
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        assert {loc["id"] for loc in response.json()["locations"]} == {
+            str(created_location.id),
+            data["results"][0]["id"],
+        }
+
+
+class TestBulkUpdateDelete:
+    """Integration tests for bulk update and delete locations endpoints."""
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_update_locations_bulk(
+        self,
+        test_client: AsyncClient,
+        created_location: LocationRow,
+        confirmed_user: UserRow,
+        access_token: str,
+    ) -> None:
+        """Testing results are reported per location id."""
+        missing_id = str(uuid.uuid4())
+        response = await test_client.put(
+            "/api/v1/locations/bulk",
+            json={
+                "locations": {
+                    str(created_location.id): {"location_name": "renamed"},
+                    missing_id: {"location_name": "missing"},
+                }
+            },
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert BulkResponse.model_validate(data)
+        assert [(r["id"], r["status_code"]) for r in data["results"]] == [
+            (str(created_location.id), 200),
+            (missing_id, 404),
+        ]
+
+        response = await test_client.get(
+            "/api/v1/locations",
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        assert response.json()["locations"][0]["location_name"] == "renamed"
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_delete_locations_bulk(
+        self,
+        test_client: AsyncClient,
+        created_location: LocationRow,
+        confirmed_user: UserRow,
+        access_token: str,
+    ) -> None:
+        """Testing results are reported per location id."""
+        missing_id = str(uuid.uuid4())
+        response = await test_client.post(
+            "/api/v1/locations/bulk/delete",
+            json={"ids": [str(created_location.id), missing_id]},
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert BulkResponse.model_validate(data)
+        assert [(r["id"], r["status_code"]) for r in data["results"]] == [
+            (str(created_location.id), 200),
+            (missing_id, 404),
+        ]
+
+        response = await test_client.get(
+            "/api/v1/locations",
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        assert response.json()["locations"] == []
+
+
 class TestList:
     """Integration tests for list locations endpoint."""
 
@@ -440,6 +557,64 @@ class TestList:
             # serialize location into JSON (uuid and datetime becomes str)
             Location(**created_location._asdict()).model_dump(mode="json")
         ]
+        assert data["next_cursor"] is None
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_select_locations_pages(
+        self,
+        test_client: AsyncClient,
+        confirmed_user: UserRow,
+        access_token: str,
+    ) -> None:
+        """Testing expected case."""
+        for i in range(3):
+            response = await test_client.post(
+                "/api/v1/locations",
+                json={"location_name": f"location-{i}"},
+                headers={"Authorization": f"Bearer {access_token}"},
+            )
+            assert response.status_code == 201
+
+        location_names = []
+        params = {"limit": 2}
+
+        while True:
+            response = await test_client.get(
+                "/api/v1/locations",
+                params=params,
+                headers={"Authorization": f"Bearer {access_token}"},
+            )
+            assert response.status_code == 200
+            data = response.json()
+            location_names += [loc["location_name"] for loc in data["locations"]]
+
+            if data["next_cursor"] is None:
+                break
+
+            params = {"limit": 2, "cursor": data["next_cursor"]}
+
+        assert sorted(location_names) == ["location-0", "location-1", "location-2"]
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_stream_locations(
+        self,
+        test_client: AsyncClient,
+        created_location: LocationRow,
+        confirmed_user: UserRow,
+        access_token: str,
+    ) -> None:
+        """Testing expected case."""
+        response = await test_client.get(
+            "/api/v1/locations/stream",
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [json.loads(line) for line in response.text.splitlines()] == [
+            Location(**created_location._asdict()).model_dump(mode="json")
+        ]
 
     @pytest.mark.integration
     @pytest.mark.asyncio
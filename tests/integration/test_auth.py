@@ -1,9 +1,20 @@
+from unittest.mock import patch
+
 import pytest
 from fastapi import HTTPException
 from psycopg import AsyncConnection
 
-from api.auth import authenticate_user, get_current_confirmed_user, get_current_user
-from api.repositories.users import UserRow
+from api.auth import (
+    authenticate_user,
+    create_access_token,
+    get_current_confirmed_user,
+    get_current_token_user,
+    get_current_user,
+)
+from api.config import get_jwt_settings
+from api.repositories.users import UserAuthRow, UserRow
+from api.schemas import UpdateUserCredentials
+from api.services import users as user_service
 
 
 @pytest.mark.integration
@@ -99,3 +110,24 @@ async def test_get_current_confirmed_user_not_confirmed(
 ) -> None:
     with pytest.raises(HTTPException):
         await get_current_confirmed_user(registered_user)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_get_current_token_user_stale_after_update(
+    db_conn: AsyncConnection, confirmed_user: UserRow
+) -> None:
+    """Testing stateless access token issued before user update."""
+    access_token = create_access_token(
+        confirmed_user.id, confirmed=True, epoch=confirmed_user.token_epoch
+    )
+    await user_service.update(
+        db_conn, confirmed_user.id, UpdateUserCredentials(email="update@test.net")
+    )
+    jwt_settings = get_jwt_settings().model_copy(update={"stateless": True})
+
+    with patch("api.auth.get_jwt_settings", return_value=jwt_settings):
+        user = await get_current_token_user(db_conn, access_token)
+
+    assert isinstance(user, UserAuthRow), "Stale token claims were trusted."
+    assert user.token_epoch > confirmed_user.token_epoch
@@ -0,0 +1,78 @@
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from psycopg import AsyncConnection
+
+from api.db import LazyConnection
+from api.main import app
+from api.repositories.locations import locations_table
+from api.repositories.users import UserRow, users_table
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_hot_path_prepared(
+    db_conn: AsyncConnection, registered_user: UserRow
+) -> None:
+    async with db_conn.transaction():
+        await users_table.select_by_id(db_conn, registered_user.id)
+
+        async with db_conn.cursor() as cur:
+            await cur.execute(
+                "SELECT count(*) FROM pg_prepared_statements "
+                "WHERE statement LIKE '%FROM \"users\"%';"
+            )
+            row = await cur.fetchone()
+
+    assert row is not None
+    assert row[0] == 1
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_pool_session_parameters(test_client: AsyncClient) -> None:
+    pool = app.state.pool
+    assert pool.get_stats()["pool_size"] >= pool.min_size
+
+    async with pool.connection() as conn, conn.cursor() as cur:
+        await cur.execute(
+            "SELECT current_setting('application_name'), current_setting('jit');"
+        )
+        assert await cur.fetchone() == ("zapis-stavy-api", "off")
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_lazy_connection(
+    test_client: AsyncClient, registered_user: UserRow
+) -> None:
+    db_conn = LazyConnection(app.state.pool)
+
+    user = await users_table.select_by_id(db_conn, registered_user.id)
+
+    assert user is not None
+    assert user.id == registered_user.id
+    # returned to the pool right after the query
+    assert db_conn.conn is None
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_locations_page_uses_index(
+    db_conn: AsyncConnection, confirmed_user: UserRow
+) -> None:
+    query = locations_table.select_next_page_if_confirmed_query
+
+    async with db_conn.transaction(), db_conn.cursor() as cur:
+        await cur.execute("SET LOCAL enable_seqscan = off;")
+        await cur.execute(
+            b"EXPLAIN " + query.sql,
+            dict(user_id=confirmed_user.id, limit=10, after_id=uuid.uuid4()),
+        )
+        plan = "\n".join(row[0] for row in await cur.fetchall())
+
+    # the page is read in index order, not sorted after scanning all user's rows
+    assert "locations_user_id_id_idx" in plan
+    assert "Index Cond: ((user_id = " in plan
+    assert "Sort Key: locations.id" not in plan
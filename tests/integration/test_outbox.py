@@ -0,0 +1,103 @@
+import uuid
+from unittest.mock import MagicMock
+
+import pytest
+from psycopg import AsyncConnection
+
+from api.db import get_conn_info, get_conn_kwargs
+from api.outbox import EmailOutboxWorker
+from api.repositories.email_outbox import email_outbox_table
+from api.schemas import RegisterUserCredentials
+from api.services import auth as auth_service
+from api.services import users as user_service
+
+
+def _confirmation_url_for(user_id: uuid.UUID) -> str:
+    return f"http://test/api/v1/auth/confirm/{user_id}"
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_register_user_queues_email(
+    db_conn: AsyncConnection,
+    creds: dict[str, str],
+    mock_send_email: MagicMock,
+    outbox_worker: EmailOutboxWorker,
+) -> None:
+    user = await auth_service.register_user(
+        db_conn,
+        RegisterUserCredentials(**creds),
+        confirmation_url_for=_confirmation_url_for,
+    )
+    assert user is not None
+
+    assert await outbox_worker.drain_once() == 1
+    mock_send_email.assert_called_once()
+    email, message = mock_send_email.call_args.args
+    assert email == creds["email"]
+    assert _confirmation_url_for(user.id) in message["Body"]["Html"]["Data"]
+
+    # sent email is removed from the outbox
+    assert await outbox_worker.drain_once() == 0
+
+    # clean-up
+    await user_service.delete(db_conn, user.id)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_failed_email_rescheduled(
+    db_conn: AsyncConnection,
+    mock_send_email: MagicMock,
+    outbox_worker: EmailOutboxWorker,
+) -> None:
+    mock_send_email.side_effect = RuntimeError("SES unavailable")
+    async with db_conn.transaction():
+        email = await email_outbox_table.insert(
+            db_conn, "test@test.net", "confirmation", {"confirmation_url": "url"}
+        )
+    assert email is not None
+
+    assert await outbox_worker.drain_once() == 1
+
+    # rescheduled with backoff, so it is not due yet
+    assert await outbox_worker.drain_once() == 0
+    async with db_conn.transaction(), db_conn.cursor() as cur:
+        await cur.execute(
+            "SELECT attempts, last_error, next_attempt_at > now() "
+            "FROM email_outbox WHERE id = %s;",
+            (email.id,),
+        )
+        attempts, last_error, is_delayed = await cur.fetchone()
+
+    assert attempts == 1
+    assert "SES unavailable" in last_error
+    assert is_delayed
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_claim_skip_locked(
+    db_conn: AsyncConnection, outbox_worker: EmailOutboxWorker
+) -> None:
+    async with db_conn.transaction():
+        for _ in range(3):
+            await email_outbox_table.insert(
+                db_conn, "test@test.net", "confirmation", {"confirmation_url": "url"}
+            )
+
+    async with await AsyncConnection.connect(
+        conninfo=get_conn_info(), **get_conn_kwargs()
+    ) as other_conn:
+        async with db_conn.transaction(), other_conn.transaction():
+            claimed = await email_outbox_table.claim(
+                db_conn, batch_size=2, max_attempts=3, lease=60
+            )
+            # locked rows are skipped by the other worker instead of waiting
+            other_claimed = await email_outbox_table.claim(
+                other_conn, batch_size=2, max_attempts=3, lease=60
+            )
+
+    assert len(claimed) == 2
+    assert len(other_claimed) == 1
+    assert not {email.id for email in claimed} & {email.id for email in other_claimed}
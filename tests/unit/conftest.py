@@ -8,6 +8,7 @@ import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 from psycopg import AsyncConnection
 
+from api.config import DbSettings
 from api.db import connect_to_db
 from api.main import app
 from api.repositories.locations import LocationRow
@@ -27,13 +28,17 @@ async def test_client() -> AsyncGenerator[AsyncClient, None]:
     # Override the dependency in your app
     app.dependency_overrides[connect_to_db] = override_connect_to_db
 
-    async with app.router.lifespan_context(app):
-        app.state.limiter.enabled = False
+    # there is no database to warm up the pool with
+    db_settings = DbSettings(pool_warmup_timeout=0)
 
-        async with AsyncClient(
-            transport=ASGITransport(app=app), base_url="http://test"
-        ) as client:
-            yield client
+    with patch("api.db.get_db_settings", return_value=db_settings):
+        async with app.router.lifespan_context(app):
+            app.state.limiter.enabled = False
+
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                yield client
 
     # Clean up
     app.dependency_overrides.clear()
@@ -54,6 +59,7 @@ def registered_user_row(creds: dict[str, str]) -> UserRow:
 def registered_user(registered_user_row: UserRow) -> Generator[UserRow, None, None]:
     with (
         patch.object(UsersTable, "select_by_id", return_value=registered_user_row),
+        patch.object(UsersTable, "select_auth_by_id", return_value=registered_user_row),
         patch.object(UsersTable, "select_by_email", return_value=registered_user_row),
     ):
         yield registered_user_row
@@ -64,6 +70,7 @@ def confirmed_user(registered_user: UserRow) -> Generator[UserRow, None, None]:
     confirmed_user_row = registered_user._replace(confirmed=True)
     with (
         patch.object(UsersTable, "select_by_id", return_value=confirmed_user_row),
+        patch.object(UsersTable, "select_auth_by_id", return_value=confirmed_user_row),
         patch.object(UsersTable, "select_by_email", return_value=confirmed_user_row),
     ):
         yield confirmed_user_row
@@ -3,7 +3,9 @@ from unittest.mock import MagicMock, patch
 import pytest
 from httpx import AsyncClient
 
-from api.repositories.users import UserRow, UsersTable
+from api.repositories.email_outbox import EmailOutboxTable
+from api.repositories.refresh_tokens import RefreshTokensTable
+from api.repositories.users import UserAuthRow, UserRow, UsersTable
 from api.schemas import BaseResponse, ResponseWithId, TokenResponse
 
 
@@ -24,6 +26,41 @@ class TestLogin:
         response = await test_client.post("/api/v1/auth/token", data=data)
         assert response.status_code == 200
         assert TokenResponse.model_validate(response.json())
+        assert response.json()["refresh_token"] is not None
+
+
+class TestRefresh:
+    """Unit tests for refresh endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_refresh(
+        self,
+        test_client: AsyncClient,
+        confirmed_user: UserRow,
+    ) -> None:
+        user_auth_row = UserAuthRow(
+            confirmed_user.id, confirmed_user.confirmed, confirmed_user.token_epoch
+        )
+
+        # mock
+        with patch.object(RefreshTokensTable, "rotate", return_value=user_auth_row):
+            response = await test_client.post(
+                "/api/v1/auth/refresh", json={"refresh_token": "refresh"}
+            )
+
+        assert response.status_code == 200
+        token = TokenResponse.model_validate(response.json())
+        assert token.refresh_token not in (None, "refresh"), "Token not rotated."
+
+    @pytest.mark.asyncio
+    async def test_refresh_invalid_token(self, test_client: AsyncClient) -> None:
+        # mock
+        with patch.object(RefreshTokensTable, "rotate", return_value=None):
+            response = await test_client.post(
+                "/api/v1/auth/refresh", json={"refresh_token": "invalid"}
+            )
+
+        assert response.status_code == 401
 
 
 class TestRegister:
@@ -38,13 +75,20 @@ class TestRegister:
         mock_send_email: MagicMock,
     ) -> None:
         # mock
-        with patch.object(UsersTable, "insert", return_value=registered_user_row):
+        with (
+            patch.object(UsersTable, "insert", return_value=registered_user_row),
+            patch.object(EmailOutboxTable, "insert") as mock_outbox_insert,
+        ):
             # register user
             response = await test_client.post("/api/v1/auth/register", json=creds)
 
         assert response.status_code == 201
         assert ResponseWithId.model_validate(response.json())
-        mock_send_email.assert_called_once()
+        mock_outbox_insert.assert_called_once()
+        _, recipient, kind, params = mock_outbox_insert.call_args.args
+        assert (recipient, kind) == (creds["email"], "confirmation")
+        assert "/api/v1/auth/confirm/" in params["confirmation_url"]
+        mock_send_email.assert_not_called()
 
 
 class TestConfirm:
@@ -57,6 +101,13 @@ class TestConfirm:
         registered_user: UserRow,
         confirmation_token: str,
     ) -> None:
-        response = await test_client.get(f"/api/v1/auth/confirm/{confirmation_token}")
+        confirmed_user_row = registered_user._replace(confirmed=True, token_epoch=1)
+
+        # mock
+        with patch.object(UsersTable, "update", return_value=confirmed_user_row):
+            response = await test_client.get(
+                f"/api/v1/auth/confirm/{confirmation_token}"
+            )
+
         assert response.status_code == 200
         assert BaseResponse.model_validate(response.json())
@@ -1,11 +1,29 @@
+import json
+import uuid
+from typing import Any, AsyncGenerator
 from unittest.mock import patch
 
 import pytest
 from httpx import AsyncClient
+from psycopg.errors import ForeignKeyViolation
 
-from api.repositories.locations import LocationRow, LocationsTable
+from api.repositories.locations import (
+    LocationIdRow,
+    LocationRow,
+    LocationsTable,
+    UserLocationIds,
+    UserLocations,
+)
 from api.repositories.users import UserRow
-from api.schemas import BaseResponse, Location, LocationsResponse, ResponseWithId
+from api.schemas import (
+    BaseResponse,
+    BulkResponse,
+    Location,
+    LocationsResponse,
+    ResponseWithId,
+    bulk_max_items,
+)
+from api.utils import decode_cursor
 
 
 class TestUnitLocation:
@@ -21,7 +39,11 @@ class TestUnitLocation:
         access_token: str,
     ) -> None:
         # mock
-        with patch.object(LocationsTable, "insert", return_value=location_row):
+        with patch.object(
+            LocationsTable,
+            "insert_if_confirmed",
+            return_value=UserLocations(True, [location_row]),
+        ):
             # create location
             response = await test_client.post(
                 "/api/v1/locations",
@@ -31,6 +53,185 @@ class TestUnitLocation:
         assert response.status_code == 201
         assert ResponseWithId.model_validate(response.json())
 
+    @pytest.mark.asyncio
+    async def test_create_locations_bulk(
+        self,
+        test_client: AsyncClient,
+        props: dict[str, str],
+        location_row: LocationRow,
+        confirmed_user: UserRow,
+        access_token: str,
+    ) -> None:
+        # mock, the duplicate item is not inserted
+        with patch.object(
+            LocationsTable, "insert_many", return_value=[location_row]
+        ) as mock_insert_many:
+            # create locations
+            response = await test_client.post(
+                "/api/v1/locations/bulk",
+                json={"locations": [props, props]},
+                headers={"Authorization": f"Bearer {access_token}"},
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert BulkResponse.model_validate(data)
+        assert mock_insert_many.call_args.args[2] == [props["location_name"]] * 2
+        assert data["results"] == [
+            {
+                "status_code": 201,
+                "detail": "Location created",
+                "id": str(location_row.id),
+            },
+            {"status_code": 409, "detail": "Location already exists", "id": None},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_create_locations_bulk_too_many_items(
+        self,
+        test_client: AsyncClient,
+        props: dict[str, str],
+        confirmed_user: UserRow,
+        access_token: str,
+    ) -> None:
+        with patch.object(LocationsTable, "insert_many") as mock_insert_many:
+            response = await test_client.post(
+                "/api/v1/locations/bulk",
+                json={"locations": [props] * (bulk_max_items + 1)},
+                headers={"Authorization": f"Bearer {access_token}"},
+            )
+
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["type"] == "too_long"
+        mock_insert_many.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_create_locations_bulk_deleted_user(
+        self,
+        test_client: AsyncClient,
+        props: dict[str, str],
+        confirmed_user: UserRow,
+        access_token: str,
+    ) -> None:
+        # mock, user deleted after the token was trusted
+        with patch.object(
+            LocationsTable, "insert_many", side_effect=ForeignKeyViolation()
+        ):
+            response = await test_client.post(
+                "/api/v1/locations/bulk",
+                json={"locations": [props]},
+                headers={"Authorization": f"Bearer {access_token}"},
+            )
+
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_update_locations_bulk(
+        self,
+        test_client: AsyncClient,
+        location_row: LocationRow,
+        confirmed_user: UserRow,
+        access_token: str,
+    ) -> None:
+        missing_id = uuid.uuid4()
+
+        # mock
+        with patch.object(
+            LocationsTable, "update_many", return_value=[location_row]
+        ) as mock_update_many:
+            # update locations
+            response = await test_client.put(
+                "/api/v1/locations/bulk",
+                json={
+                    "locations": {
+                        str(location_row.id): {"location_name": "renamed"},
+                        str(missing_id): {},
+                    }
+                },
+                headers={"Authorization": f"Bearer {access_token}"},
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert BulkResponse.model_validate(data)
+        assert mock_update_many.call_args.args[2] == {
+            location_row.id: "renamed",
+            missing_id: None,
+        }
+        assert [(r["id"], r["status_code"]) for r in data["results"]] == [
+            (str(location_row.id), 200),
+            (str(missing_id), 404),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_delete_locations_bulk(
+        self,
+        test_client: AsyncClient,
+        location_row: LocationRow,
+        confirmed_user: UserRow,
+        access_token: str,
+    ) -> None:
+        missing_id = uuid.uuid4()
+
+        # mock
+        with patch.object(
+            LocationsTable,
+            "delete_many",
+            return_value=[LocationIdRow(location_row.id)],
+        ):
+            # delete locations
+            response = await test_client.post(
+                "/api/v1/locations/bulk/delete",
+                json={"ids": [str(location_row.id), str(missing_id)]},
+                headers={"Authorization": f"Bearer {access_token}"},
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert BulkResponse.model_validate(data)
+        assert [(r["id"], r["status_code"]) for r in data["results"]] == [
+            (str(location_row.id), 200),
+            (str(missing_id), 404),
+        ]
+
+    @pytest.mark.parametrize(
+        "method, url, body",
+        [
+            pytest.param(
+                "PUT",
+                "/api/v1/locations/bulk",
+                {
+                    "locations": {
+                        str(uuid.uuid4()): {} for _ in range(bulk_max_items + 1)
+                    }
+                },
+                id="update",
+            ),
+            pytest.param(
+                "POST",
+                "/api/v1/locations/bulk/delete",
+                {"ids": [str(uuid.uuid4()) for _ in range(bulk_max_items + 1)]},
+                id="delete",
+            ),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_locations_bulk_too_many_items(
+        self,
+        test_client: AsyncClient,
+        confirmed_user: UserRow,
+        access_token: str,
+        method: str,
+        url: str,
+        body: dict[str, Any],
+    ) -> None:
+        response = await test_client.request(
+            method, url, json=body, headers={"Authorization": f"Bearer {access_token}"}
+        )
+
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["type"] == "too_long"
+
     @pytest.mark.asyncio
     async def test_delete_location(
         self,
@@ -42,7 +243,11 @@ class TestUnitLocation:
         location_id = location_row.id
 
         # mock
-        with patch.object(LocationsTable, "delete", return_value=location_row):
+        with patch.object(
+            LocationsTable,
+            "delete_if_confirmed",
+            return_value=UserLocationIds(True, [location_row.id]),
+        ):
             # delete created location
             response = await test_client.delete(
                 f"/api/v1/locations/{location_id}",
@@ -65,7 +270,11 @@ class TestUnitLocation:
         updated_location_row = location_row._replace(**update_props)  # type: ignore [arg-type]
 
         # mock
-        with patch.object(LocationsTable, "update", return_value=updated_location_row):
+        with patch.object(
+            LocationsTable,
+            "update_if_confirmed",
+            return_value=UserLocations(True, [updated_location_row]),
+        ):
             # update location
             response = await test_client.put(
                 f"/api/v1/locations/{location_id}",
@@ -85,7 +294,11 @@ class TestUnitLocation:
         access_token: str,
     ) -> None:
         # mock
-        with patch.object(LocationsTable, "select", return_value=[location_row]):
+        with patch.object(
+            LocationsTable,
+            "select_page_if_confirmed",
+            return_value=UserLocations(True, [location_row]),
+        ):
             # select locations
             response = await test_client.get(
                 "/api/v1/locations",
@@ -99,3 +312,131 @@ class TestUnitLocation:
             # serialize location into JSON (uuid and datetime becomes str)
             Location(**location_row._asdict()).model_dump(mode="json")
         ]
+        assert data["next_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_select_locations_next_page(
+        self,
+        test_client: AsyncClient,
+        location_row: LocationRow,
+        confirmed_user: UserRow,
+        access_token: str,
+    ) -> None:
+        next_row = location_row._replace(id=uuid.uuid4())
+
+        # mock
+        with patch.object(
+            LocationsTable,
+            "select_page_if_confirmed",
+            return_value=UserLocations(True, [location_row, next_row]),
+        ) as mock_select_page:
+            # select first page
+            response = await test_client.get(
+                "/api/v1/locations",
+                params={"limit": 1},
+                headers={"Authorization": f"Bearer {access_token}"},
+            )
+
+            assert response.status_code == 200
+            data = response.json()
+            assert len(data["locations"]) == 1
+            assert decode_cursor(data["next_cursor"]) == location_row.id
+            # one extra row is fetched to detect the next page
+            assert mock_select_page.call_args.args[2:] == (2, None)
+
+            # select next page
+            response = await test_client.get(
+                "/api/v1/locations",
+                params={"limit": 1, "cursor": data["next_cursor"]},
+                headers={"Authorization": f"Bearer {access_token}"},
+            )
+
+        assert response.status_code == 200
+        assert mock_select_page.call_args.args[2:] == (2, location_row.id)
+
+    @pytest.mark.asyncio
+    async def test_select_locations_by_only_registered_user(
+        self,
+        test_client: AsyncClient,
+        registered_user: UserRow,
+        access_token: str,
+    ) -> None:
+        # mock, the user check is part of the location query
+        with patch.object(
+            LocationsTable,
+            "select_page_if_confirmed",
+            return_value=UserLocations(False, []),
+        ):
+            response = await test_client.get(
+                "/api/v1/locations",
+                headers={"Authorization": f"Bearer {access_token}"},
+            )
+
+        assert response.status_code == 401
+        assert response.json()["detail"] == "User not confirmed"
+
+    @pytest.mark.asyncio
+    async def test_delete_location_not_found(
+        self,
+        test_client: AsyncClient,
+        confirmed_user: UserRow,
+        access_token: str,
+    ) -> None:
+        # mock
+        with patch.object(
+            LocationsTable,
+            "delete_if_confirmed",
+            return_value=UserLocationIds(True, []),
+        ):
+            response = await test_client.delete(
+                f"/api/v1/locations/{uuid.uuid4()}",
+                headers={"Authorization": f"Bearer {access_token}"},
+            )
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_select_locations_invalid_cursor(
+        self,
+        test_client: AsyncClient,
+        confirmed_user: UserRow,
+        access_token: str,
+    ) -> None:
+        response = await test_client.get(
+            "/api/v1/locations",
+            params={"cursor": "not-a-cursor"},
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_stream_locations(
+        self,
+        test_client: AsyncClient,
+        location_row: LocationRow,
+        confirmed_user: UserRow,
+        access_token: str,
+    ) -> None:
+        next_row = location_row._replace(id=uuid.uuid4())
+
+        async def select_chunks(
+            *args: Any, **kwargs: Any
+        ) -> AsyncGenerator[list[LocationRow], None]:
+            yield [location_row]
+            yield [next_row]
+
+        # mock
+        with patch.object(LocationsTable, "select_chunks", side_effect=select_chunks):
+            # stream locations
+            response = await test_client.get(
+                "/api/v1/locations/stream",
+                headers={"Authorization": f"Bearer {access_token}"},
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [json.loads(line) for line in response.text.splitlines()] == [
+            Location(**row._asdict()).model_dump(mode="json")
+            for row in (location_row, next_row)
+        ]
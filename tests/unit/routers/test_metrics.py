@@ -0,0 +1,73 @@
+from typing import Generator
+from unittest.mock import MagicMock, patch
+
+import pytest
+from httpx import AsyncClient
+
+from api.config import MetricsSettings
+from api.main import app
+from api.schemas import MetricsResponse
+
+
+@pytest.fixture
+def metrics_enabled() -> Generator[None, None, None]:
+    metrics_settings = MetricsSettings(enabled=True, token="secret")
+    with patch(
+        "api.routers.metrics.get_metrics_settings", return_value=metrics_settings
+    ):
+        yield
+
+
+class TestMetrics:
+    """Unit tests for internal metrics endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_metrics(
+        self, test_client: AsyncClient, metrics_enabled: None
+    ) -> None:
+        response = await test_client.get(
+            "/api/v1/internal/metrics", headers={"Authorization": "Bearer secret"}
+        )
+
+        assert response.status_code == 200
+        metrics = MetricsResponse.model_validate(response.json())
+        assert {"pool_size", "pool_available", "requests_waiting"} <= set(metrics.pool)
+        assert metrics.replica_pool is None
+        assert set(metrics.caches) == {"users", "user_auths", "tokens"}
+
+    @pytest.mark.asyncio
+    async def test_metrics_replica_pool(
+        self, test_client: AsyncClient, metrics_enabled: None
+    ) -> None:
+        replica_pool = MagicMock()
+        replica_pool.get_stats.return_value = {"pool_size": 2}
+
+        with patch.object(app.state, "replica_pool", replica_pool):
+            response = await test_client.get(
+                "/api/v1/internal/metrics", headers={"Authorization": "Bearer secret"}
+            )
+
+        assert response.status_code == 200
+        metrics = MetricsResponse.model_validate(response.json())
+        assert metrics.replica_pool == {"pool_size": 2}
+
+    @pytest.mark.parametrize(
+        "headers",
+        [
+            pytest.param({}, id="missing token"),
+            pytest.param({"Authorization": "Bearer wrong"}, id="wrong token"),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_metrics_invalid_token(
+        self, test_client: AsyncClient, metrics_enabled: None, headers: dict[str, str]
+    ) -> None:
+        response = await test_client.get("/api/v1/internal/metrics", headers=headers)
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_metrics_disabled(self, test_client: AsyncClient) -> None:
+        response = await test_client.get(
+            "/api/v1/internal/metrics", headers={"Authorization": "Bearer secret"}
+        )
+        assert response.status_code == 404
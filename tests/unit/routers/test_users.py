@@ -1,10 +1,9 @@
-import uuid
-from datetime import datetime, timezone
 from unittest.mock import patch
 
 import pytest
 from httpx import AsyncClient
 
+from api.repositories.refresh_tokens import RefreshTokensTable
 from api.repositories.users import UserRow, UsersTable
 from api.schemas import BaseResponse
 from api.security import get_password_hash
@@ -42,17 +41,21 @@ class TestUpdate:
         registered_user_row: UserRow,
         access_token: str,
     ) -> None:
-        updated_user_from_db = {
-            "email": update_creds.get("email") or registered_user_row.email,
-            "password_hash": get_password_hash(update_creds["password"])
+        updated_user_from_db = registered_user_row._replace(
+            email=update_creds.get("email") or registered_user_row.email,
+            password_hash=get_password_hash(update_creds["password"])
             if update_creds.get("password") is not None
             else registered_user_row.password_hash,
-            "id": str(uuid.uuid4()),
-            "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
-        }
+            token_epoch=registered_user_row.token_epoch + 1,
+        )
 
         # mock
-        with patch.object(UsersTable, "update", return_value=updated_user_from_db):
+        with (
+            patch.object(UsersTable, "update", return_value=updated_user_from_db),
+            patch.object(
+                RefreshTokensTable, "delete_by_user_id"
+            ) as mock_delete_refresh_tokens,
+        ):
             # update user
             response = await test_client.put(
                 "/api/v1/users/me",
@@ -62,3 +65,6 @@ class TestUpdate:
 
         assert response.status_code == 200
         assert BaseResponse.model_validate(response.json())
+        assert mock_delete_refresh_tokens.called is ("password" in update_creds), (
+            "Refresh tokens must be revoked on password change only."
+        )
@@ -1,18 +1,29 @@
+import time
 import uuid
 from datetime import timedelta
-from typing import Callable, Literal
+from typing import Callable, Generator, Literal
+from unittest.mock import AsyncMock, patch
 
 import jwt
 import pytest
 from fastapi import HTTPException
+from psycopg import AsyncConnection
+from pwdlib.hashers.argon2 import Argon2Hasher
 
 from api.auth import (
+    TokenUser,
     _create_jwt_token,
+    authenticate_user,
     create_access_token,
     create_confirmation_token,
+    get_current_token_user,
+    get_current_user_id,
     get_sub,
 )
 from api.config import JwtSettings, get_jwt_settings
+from api.repositories.users import UserRow, UsersTable
+from api.security import verify_password
+from api.token_epochs import get_token_epochs
 
 
 @pytest.fixture
@@ -91,3 +102,167 @@ def test_get_sub_missing_sub() -> None:
     token = _create_jwt_token({"type": "access"}, timedelta(minutes=15))
     with pytest.raises(HTTPException):
         get_sub(token, typ="access")
+
+
+def test_create_access_token_with_claims(jwt_settings: JwtSettings) -> None:
+    user_id = uuid.uuid4()
+    token = create_access_token(user_id, confirmed=True, epoch=1)
+    decoded_token = jwt.decode(
+        token, key=jwt_settings.secret_key, algorithms=[jwt_settings.algorithm]
+    )
+    assert decoded_token["confirmed"] is True
+    assert decoded_token["epoch"] == 1
+
+
+@pytest.fixture
+def stateless_jwt_settings(jwt_settings: JwtSettings) -> Generator[None, None, None]:
+    settings = jwt_settings.model_copy(update={"stateless": True})
+    with patch("api.auth.get_jwt_settings", return_value=settings):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_get_current_token_user_stateless(
+    stateless_jwt_settings: None,
+) -> None:
+    user_id = uuid.uuid4()
+    token = create_access_token(user_id, confirmed=True, epoch=0)
+
+    with patch.object(UsersTable, "select_auth_by_id") as mock_select_auth_by_id:
+        user = await get_current_token_user(AsyncMock(), token)
+
+    mock_select_auth_by_id.assert_not_called()
+    assert user == TokenUser(id=user_id, confirmed=True)
+
+
+def test_create_access_token_stateless_short_lived(
+    stateless_jwt_settings: None,
+) -> None:
+    token = create_access_token(uuid.uuid4(), confirmed=True, epoch=0)
+    payload = jwt.decode(token, options={"verify_signature": False})
+    assert payload["exp"] <= time.time() + 5 * 60
+
+
+@pytest.mark.asyncio
+async def test_get_current_token_user_stateless_long_lived(
+    stateless_jwt_settings: None, confirmed_user: UserRow
+) -> None:
+    token = _create_jwt_token(
+        {
+            "type": "access",
+            "sub": str(confirmed_user.id),
+            "confirmed": True,
+            "epoch": 0,
+        },
+        timedelta(minutes=15),
+    )
+    assert await get_current_token_user(AsyncMock(), token) == confirmed_user
+
+
+@pytest.mark.asyncio
+async def test_get_current_token_user_stateless_stale_epoch(
+    stateless_jwt_settings: None, confirmed_user: UserRow
+) -> None:
+    token = create_access_token(confirmed_user.id, confirmed=True, epoch=0)
+    get_token_epochs().set(confirmed_user.id, 1)
+    assert await get_current_token_user(AsyncMock(), token) == confirmed_user
+
+
+@pytest.mark.asyncio
+async def test_get_current_token_user_stateless_not_confirmed(
+    stateless_jwt_settings: None, registered_user: UserRow
+) -> None:
+    token = create_access_token(registered_user.id, confirmed=False, epoch=0)
+    assert await get_current_token_user(AsyncMock(), token) == registered_user
+
+
+@pytest.mark.asyncio
+async def test_get_current_token_user_stateful(confirmed_user: UserRow) -> None:
+    token = create_access_token(confirmed_user.id, confirmed=True, epoch=0)
+    assert await get_current_token_user(AsyncMock(), token) == confirmed_user
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_id() -> None:
+    user_id = uuid.uuid4()
+    token = create_access_token(user_id)
+
+    with patch.object(UsersTable, "select_by_id") as mock_select_by_id:
+        assert await get_current_user_id(token) == user_id
+
+    mock_select_by_id.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_id_invalid_sub() -> None:
+    token = _create_jwt_token({"type": "access", "sub": "1"}, timedelta(minutes=15))
+    with pytest.raises(HTTPException):
+        await get_current_user_id(token)
+
+
+def test_get_sub_cached() -> None:
+    user_id = uuid.uuid4()
+    token = create_access_token(user_id)
+
+    with patch("api.auth.jwt.decode", wraps=jwt.decode) as mock_decode:
+        for _ in range(3):
+            assert get_sub(token, typ="access") == str(user_id)
+
+    mock_decode.assert_called_once()
+
+
+def test_get_sub_cached_wrong_type() -> None:
+    user_id = uuid.uuid4()
+    token = create_confirmation_token(user_id)
+    assert get_sub(token, typ="confirmation") == str(user_id)
+    with pytest.raises(HTTPException):
+        get_sub(token, typ="access")
+
+
+def test_get_sub_cache_expires_with_token() -> None:
+    user_id = uuid.uuid4()
+    token = create_access_token(user_id, expires_delta=timedelta(seconds=1))
+    get_sub(token, typ="access")
+    time.sleep(1.1)
+
+    with pytest.raises(HTTPException):
+        get_sub(token, typ="access")
+
+
+@pytest.mark.asyncio
+async def test_authenticate_user_rehash(
+    creds: dict[str, str], registered_user_row: UserRow
+) -> None:
+    outdated_hasher = Argon2Hasher(time_cost=1, memory_cost=1024, parallelism=1)
+    outdated_user_row = registered_user_row._replace(
+        password_hash=outdated_hasher.hash(creds["password"])
+    )
+    rehashed_user_row = registered_user_row._replace(token_epoch=1)
+
+    with (
+        patch.object(UsersTable, "select_by_email", return_value=outdated_user_row),
+        patch.object(
+            UsersTable, "update", return_value=rehashed_user_row
+        ) as mock_update,
+    ):
+        user = await authenticate_user(
+            AsyncMock(spec=AsyncConnection), creds["email"], creds["password"]
+        )
+
+    assert user == rehashed_user_row
+    password_hash = mock_update.call_args.args[-1]["password_hash"]
+    assert verify_password(creds["password"], password_hash)
+    assert password_hash != outdated_user_row.password_hash
+
+
+@pytest.mark.asyncio
+async def test_authenticate_user_no_rehash(
+    creds: dict[str, str], registered_user: UserRow
+) -> None:
+    with patch.object(UsersTable, "update") as mock_update:
+        user = await authenticate_user(
+            AsyncMock(spec=AsyncConnection), creds["email"], creds["password"]
+        )
+
+    assert user == registered_user
+    mock_update.assert_not_called()
@@ -0,0 +1,91 @@
+import asyncio
+from typing import Any, AsyncGenerator
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from api import ses_local
+from api.aws import SesClient
+
+
+@pytest_asyncio.fixture
+async def ses_client() -> AsyncGenerator[SesClient, None]:
+    ses_local.sent_emails.clear()
+    ses_client = SesClient(
+        "key",
+        "secret",
+        "eu-central-1",
+        endpoint_url="http://ses.local",
+        transport=httpx.ASGITransport(app=ses_local.app),
+    )
+    yield ses_client
+    await ses_client.close()
+
+
+@pytest.fixture
+def message() -> dict[str, Any]:
+    return {
+        "Subject": {"Data": "Subject", "Charset": "UTF-8"},
+        "Body": {"Html": {"Data": "<p>Body</p>", "Charset": "UTF-8"}},
+    }
+
+
+@pytest.mark.asyncio
+async def test_send_email(ses_client: SesClient, message: dict[str, Any]) -> None:
+    response = await ses_client.send_email("from@test.net", ["to@test.net"], message)
+
+    assert "MessageId" in response
+    assert ses_local.sent_emails == [
+        {
+            "FromEmailAddress": "from@test.net",
+            "Destination": {"ToAddresses": ["to@test.net"]},
+            "Content": {"Simple": message},
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_send_email_error(message: dict[str, Any]) -> None:
+    ses_client = SesClient(
+        "key",
+        "secret",
+        "eu-central-1",
+        transport=httpx.MockTransport(lambda request: httpx.Response(400)),
+    )
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await ses_client.send_email("from@test.net", ["to@test.net"], message)
+
+    await ses_client.close()
+
+
+@pytest.mark.asyncio
+async def test_send_email_max_concurrency(message: dict[str, Any]) -> None:
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={"MessageId": "id"})
+
+    ses_client = SesClient(
+        "key",
+        "secret",
+        "eu-central-1",
+        max_concurrency=2,
+        transport=httpx.MockTransport(handler),
+    )
+    await asyncio.gather(
+        *(
+            ses_client.send_email("from@test.net", ["to@test.net"], message)
+            for _ in range(6)
+        )
+    )
+    await ses_client.close()
+
+    assert max_in_flight == 2
@@ -0,0 +1,130 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from psycopg import AsyncConnection
+
+from api.cache import TTLCache
+from api.db import LazyConnection
+from api.repositories.users import UserRow, UsersTable
+from api.schemas import UpdateUserCredentials
+from api.services import users as user_service
+
+
+def test_ttl_cache_hit_and_miss() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60)
+    assert cache.get("key") is None
+
+    cache.set("key", 1)
+    assert cache.get("key") == 1
+    assert cache.stats() == {"size": 1, "maxsize": 10, "hits": 1, "misses": 1}
+
+
+def test_ttl_cache_expired() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=0)
+    cache.set("key", 1)
+    assert cache.get("key") is None
+    assert cache.stats()["size"] == 0, "Expired entry not evicted."
+
+
+def test_ttl_cache_maxsize() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" becomes least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_disabled() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=0, ttl=60)
+    cache.set("key", 1)
+    assert cache.get("key") is None
+
+
+def test_ttl_cache_pop() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60)
+    cache.set("key", 1)
+    cache.pop("key")
+    cache.pop("missing")
+    assert cache.get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_select_by_id_cached(registered_user_row: UserRow) -> None:
+    with patch.object(
+        UsersTable, "select_by_id", return_value=registered_user_row
+    ) as mock_select_by_id:
+        for _ in range(3):
+            user = await user_service.select_by_id(
+                AsyncMock(spec=AsyncConnection), registered_user_row.id
+            )
+            assert user == registered_user_row
+
+    mock_select_by_id.assert_called_once()
+
+
+@pytest.mark.parametrize("method", ["select_by_id", "select_auth_by_id"])
+@pytest.mark.asyncio
+async def test_select_cached_from_primary(
+    registered_user_row: UserRow, method: str
+) -> None:
+    db_conn = LazyConnection(MagicMock(), replica_pool=MagicMock())
+
+    with patch.object(
+        UsersTable, method, return_value=registered_user_row
+    ) as mock_select:
+        await getattr(user_service, method)(db_conn, registered_user_row.id)
+
+    assert mock_select.call_args.args[0] is db_conn, "Replica row cached."
+
+
+@pytest.mark.asyncio
+async def test_select_by_email_not_cached(registered_user_row: UserRow) -> None:
+    updated_user_row = registered_user_row._replace(password_hash="updated")
+    user_service.get_users_cache().set(str(registered_user_row.id), registered_user_row)
+
+    with patch.object(
+        UsersTable, "select_by_email", return_value=updated_user_row
+    ) as mock_select_by_email:
+        for _ in range(3):
+            user = await user_service.select_by_email(
+                AsyncMock(spec=AsyncConnection), registered_user_row.email
+            )
+            assert user == updated_user_row, "Stale password hash served from cache."
+
+    assert mock_select_by_email.call_count == 3
+    assert user_service.get_users_cache().get(str(registered_user_row.id)) == (
+        updated_user_row
+    )
+
+
+@pytest.mark.asyncio
+async def test_update_invalidates_cache(registered_user_row: UserRow) -> None:
+    updated_user_row = registered_user_row._replace(email="update@test.net")
+
+    with (
+        patch.object(UsersTable, "select_by_id", return_value=registered_user_row),
+        patch.object(UsersTable, "update", return_value=updated_user_row),
+    ):
+        await user_service.select_by_id(
+            AsyncMock(spec=AsyncConnection), registered_user_row.id
+        )
+        await user_service.update(
+            AsyncMock(spec=AsyncConnection),
+            registered_user_row.id,
+            UpdateUserCredentials(email=updated_user_row.email),
+        )
+
+    assert user_service.get_users_cache().get(str(registered_user_row.id)) is None
+
+    with patch.object(
+        UsersTable, "select_by_email", return_value=None
+    ) as mock_select_by_email:
+        user = await user_service.select_by_email(
+            AsyncMock(spec=AsyncConnection), registered_user_row.email
+        )
+
+    assert user is None, "Stale email served from cache."
+    mock_select_by_email.assert_called_once()
@@ -0,0 +1,19 @@
+from api.calibrate import calibrate
+
+
+def test_calibrate() -> None:
+    calibration = calibrate(target_ms=0, memory_cost=1024, parallelism=1, rounds=1)
+    assert calibration.time_cost == 1
+    assert calibration.memory_cost == 1024
+    assert calibration.parallelism == 1
+
+
+def test_calibrate_max_time_cost() -> None:
+    calibration = calibrate(
+        target_ms=float("inf"),
+        memory_cost=1024,
+        parallelism=1,
+        rounds=1,
+        max_time_cost=2,
+    )
+    assert calibration.time_cost == 2
@@ -0,0 +1,264 @@
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Generator
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from psycopg import AsyncConnection, OperationalError, pq
+
+from api.config import DbSettings
+from api.db import (
+    LazyConnection,
+    configure_connection,
+    get_binary,
+    get_conn_kwargs,
+    get_pool_kwargs,
+    get_prepare,
+    get_recent_writes,
+    read_only,
+    record_write,
+    single_statement,
+)
+from api.repositories.users import users_table
+
+
+@pytest.mark.parametrize(
+    "prepared_statements, prepare_threshold, prepare",
+    [
+        pytest.param(True, 5, True, id="enabled"),
+        pytest.param(False, None, False, id="transaction-mode pooler"),
+    ],
+)
+def test_prepared_statements(
+    prepared_statements: bool, prepare_threshold: int | None, prepare: bool
+) -> None:
+    db_settings = DbSettings(
+        name="db",
+        username="user",
+        password="password",
+        prepared_statements=prepared_statements,
+    )
+
+    with patch("api.db.get_db_settings", return_value=db_settings):
+        assert get_conn_kwargs() == {"prepare_threshold": prepare_threshold}
+        assert get_prepare() is prepare
+
+
+@pytest.mark.parametrize("binary_results", [True, False])
+@pytest.mark.asyncio
+async def test_binary_results(binary_results: bool) -> None:
+    db_settings = DbSettings(
+        name="db", username="user", password="password", binary_results=binary_results
+    )
+    mock_conn = MagicMock(spec=AsyncConnection)
+    mock_cur = mock_conn.cursor.return_value.__aenter__.return_value
+    mock_cur.execute = AsyncMock()
+    mock_cur.fetchone = AsyncMock(return_value=None)
+
+    with patch("api.db.get_db_settings", return_value=db_settings):
+        assert get_binary() is binary_results
+        await users_table.select_by_id(mock_conn, uuid.uuid4())
+
+    assert mock_conn.cursor.call_args.kwargs["binary"] is binary_results
+
+
+@pytest.mark.asyncio
+async def test_configure_connection() -> None:
+    db_settings = DbSettings(
+        name="db", username="user", password="password", statement_timeout=1000
+    )
+    mock_conn = AsyncMock(spec=AsyncConnection)
+
+    with patch("api.db.get_db_settings", return_value=db_settings):
+        await configure_connection(mock_conn)
+
+    params = mock_conn.execute.call_args.args[1]
+    assert params == {
+        "application_name": "zapis-stavy-api",
+        "statement_timeout": "1000",
+        "jit": "off",
+    }
+    mock_conn.commit.assert_awaited_once()
+
+
+def test_get_pool_kwargs() -> None:
+    db_settings = DbSettings(
+        name="db",
+        username="user",
+        password="password",
+        pool_min_size=2,
+        pool_max_size=8,
+    )
+
+    with patch("api.db.get_db_settings", return_value=db_settings):
+        pool_kwargs = get_pool_kwargs()
+
+    assert pool_kwargs["min_size"] == 2
+    assert pool_kwargs["max_size"] == 8
+    assert pool_kwargs["configure"] is configure_connection
+
+
+@pytest.fixture
+def mock_pool() -> MagicMock:
+    mock_pool = MagicMock()
+    mock_pool.checkouts = 0
+
+    @asynccontextmanager
+    async def connection() -> AsyncGenerator[AsyncMock, None]:
+        mock_pool.checkouts += 1
+        conn = AsyncMock(spec=AsyncConnection)
+        conn.info.transaction_status = pq.TransactionStatus.IDLE
+        yield conn
+
+    mock_pool.connection = connection
+    return mock_pool
+
+
+@pytest.mark.asyncio
+async def test_lazy_connection_unused(mock_pool: MagicMock) -> None:
+    LazyConnection(mock_pool)
+    assert mock_pool.checkouts == 0
+
+
+@pytest.mark.asyncio
+async def test_lazy_connection_nested_scopes(mock_pool: MagicMock) -> None:
+    db_conn = LazyConnection(mock_pool)
+
+    async with db_conn.transaction():
+        conn = db_conn.conn
+        async with db_conn.cursor():
+            assert db_conn.conn is conn
+
+    assert mock_pool.checkouts == 1
+    assert db_conn.conn is None
+
+
+@pytest.mark.asyncio
+async def test_lazy_connection_released_per_scope(mock_pool: MagicMock) -> None:
+    db_conn = LazyConnection(mock_pool)
+
+    async with db_conn.cursor():
+        pass
+
+    with pytest.raises(ValueError):
+        async with db_conn.transaction():
+            raise ValueError
+
+    assert mock_pool.checkouts == 2
+    assert db_conn.conn is None
+
+
+@pytest.mark.asyncio
+async def test_single_statement_autocommit(mock_pool: MagicMock) -> None:
+    db_conn = LazyConnection(mock_pool)
+
+    async with single_statement(db_conn):
+        conn = db_conn.conn
+        assert isinstance(conn, AsyncMock)
+        conn.set_autocommit.assert_awaited_once_with(True)
+
+    conn.set_autocommit.assert_awaited_with(False)
+    conn.transaction.assert_not_called()
+    assert db_conn.conn is None
+
+
+@pytest.mark.asyncio
+async def test_single_statement_autocommit_broken(mock_pool: MagicMock) -> None:
+    db_conn = LazyConnection(mock_pool)
+
+    with pytest.raises(OperationalError):
+        async with single_statement(db_conn):
+            conn = db_conn.conn
+            assert isinstance(conn, AsyncMock)
+            conn.info.transaction_status = pq.TransactionStatus.UNKNOWN
+            raise OperationalError("connection lost")
+
+    conn.set_autocommit.assert_awaited_once_with(True)
+
+
+@pytest.mark.asyncio
+async def test_single_statement_inside_transaction(mock_pool: MagicMock) -> None:
+    db_conn = LazyConnection(mock_pool)
+
+    async with db_conn.transaction():
+        conn = db_conn.conn
+        assert isinstance(conn, AsyncMock)
+
+        async with single_statement(db_conn):
+            assert db_conn.conn is conn
+
+    conn.set_autocommit.assert_not_called()
+    assert mock_pool.checkouts == 1
+
+
+@pytest.mark.asyncio
+async def test_single_statement_autocommit_disabled(mock_pool: MagicMock) -> None:
+    db_conn = LazyConnection(mock_pool)
+    db_settings = DbSettings(
+        name="db",
+        username="user",
+        password="password",
+        autocommit_single_statements=False,
+    )
+
+    with patch("api.db.get_db_settings", return_value=db_settings):
+        async with single_statement(db_conn):
+            conn = db_conn.conn
+            assert isinstance(conn, AsyncMock)
+
+    conn.set_autocommit.assert_not_called()
+    conn.transaction.assert_called_once()
+
+
+@pytest.fixture
+def read_your_writes() -> Generator[None, None, None]:
+    db_settings = DbSettings(
+        name="db", username="user", password="password", read_your_writes=True
+    )
+
+    with patch("api.db.get_db_settings", return_value=db_settings):
+        get_recent_writes.cache_clear()
+        yield
+
+    get_recent_writes.cache_clear()
+
+
+def test_read_only_without_replica(mock_pool: MagicMock) -> None:
+    db_conn = LazyConnection(mock_pool)
+    assert read_only(db_conn, uuid.uuid4()) is db_conn
+
+
+def test_read_only_replica(mock_pool: MagicMock) -> None:
+    db_conn = LazyConnection(mock_pool, replica_pool=MagicMock())
+    replica_conn = read_only(db_conn, uuid.uuid4())
+
+    assert isinstance(replica_conn, LazyConnection)
+    assert replica_conn.pool is db_conn.replica_pool
+    assert read_only(db_conn) is replica_conn
+
+
+@pytest.mark.asyncio
+async def test_read_only_inside_primary_scope(mock_pool: MagicMock) -> None:
+    db_conn = LazyConnection(mock_pool, replica_pool=MagicMock())
+
+    async with db_conn.transaction():
+        assert read_only(db_conn, uuid.uuid4()) is db_conn
+
+
+def test_read_your_writes(mock_pool: MagicMock, read_your_writes: None) -> None:
+    db_conn = LazyConnection(mock_pool, replica_pool=MagicMock())
+    user_id, other_user_id = uuid.uuid4(), uuid.uuid4()
+
+    record_write(user_id)
+
+    assert read_only(db_conn, user_id) is db_conn
+    assert read_only(db_conn, other_user_id) is not db_conn
+
+
+def test_read_your_writes_disabled(mock_pool: MagicMock) -> None:
+    db_conn = LazyConnection(mock_pool, replica_pool=MagicMock())
+    user_id = uuid.uuid4()
+
+    record_write(user_id)
+
+    assert read_only(db_conn, user_id) is not db_conn
@@ -0,0 +1,39 @@
+import pytest
+
+from api.emails import EmailTemplate, build_message, get_email_templates
+
+
+def test_build_confirmation_message() -> None:
+    message = build_message(
+        "confirmation", {"confirmation_url": "http://test/confirm?a=1&b=2"}
+    )
+
+    assert message["Subject"]["Data"].startswith("[Zapis Stavy]")
+    assert message["Subject"]["Charset"] == "UTF-8"
+    assert "href='http://test/confirm?a=1&amp;b=2'" in message["Body"]["Html"]["Data"]
+
+
+def test_email_templates_compiled_once() -> None:
+    assert get_email_templates() is get_email_templates()
+    assert "confirmation" in get_email_templates()
+
+
+def test_static_parts_prebuilt() -> None:
+    template = EmailTemplate(subject="Static subject", html_body="<p>$name</p>")
+
+    first = template.render({"name": "first"})
+    second = template.render({"name": "<second>"})
+
+    assert first["Subject"] is second["Subject"]
+    assert first["Body"]["Html"]["Data"] == "<p>first</p>"
+    assert second["Body"]["Html"]["Data"] == "<p>&lt;second&gt;</p>"
+
+
+def test_build_message_missing_param() -> None:
+    with pytest.raises(KeyError):
+        build_message("confirmation", {})
+
+
+def test_build_message_unknown_kind() -> None:
+    with pytest.raises(KeyError):
+        build_message("unknown", {})
@@ -0,0 +1,28 @@
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from psycopg import AsyncConnection
+
+from api.maintenance import MaintenanceWorker
+from api.repositories.refresh_tokens import RefreshTokensTable
+
+
+@pytest.mark.asyncio
+async def test_purge_once() -> None:
+    mock_pool = MagicMock()
+
+    @asynccontextmanager
+    async def connection() -> AsyncGenerator[AsyncMock, None]:
+        yield AsyncMock(spec=AsyncConnection)
+
+    mock_pool.connection = connection
+    maintenance_worker = MaintenanceWorker(mock_pool, interval=0)
+
+    with patch.object(
+        RefreshTokensTable, "delete_expired", return_value=3
+    ) as mock_delete_expired:
+        assert await maintenance_worker.purge_once() == 3
+
+    mock_delete_expired.assert_called_once()
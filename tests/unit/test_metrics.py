@@ -0,0 +1,78 @@
+from typing import AsyncGenerator
+from unittest.mock import MagicMock
+
+import pytest
+
+from api.cache import TTLCache
+from api.metrics import Histogram, Metrics, get_metrics, record_query
+
+
+def test_histogram() -> None:
+    histogram = Histogram(buckets=(1.0, 10.0))
+    for duration_ms in (0.5, 1.0, 5.0, 50.0):
+        histogram.observe(duration_ms)
+
+    assert histogram.stats() == {
+        "count": 4,
+        "mean_ms": 14.125,
+        "max_ms": 50.0,
+        "buckets": {"1": 2, "10": 1, "inf": 1},
+    }
+
+
+def test_histogram_empty() -> None:
+    assert Histogram().stats()["mean_ms"] == 0.0
+
+
+class Table:
+    """Repository table stub with recorded queries."""
+
+    @record_query
+    async def select(self, fail: bool = False) -> int:
+        if fail:
+            raise ValueError
+
+        return 1
+
+    @record_query
+    async def select_chunks(self) -> AsyncGenerator[list[int], None]:
+        yield [1, 2]
+        yield [3]
+
+
+@pytest.mark.asyncio
+async def test_record_query() -> None:
+    get_metrics.cache_clear()
+
+    assert await Table().select() == 1
+    with pytest.raises(ValueError):
+        await Table().select(fail=True)
+
+    metrics = get_metrics()
+    assert isinstance(metrics, Metrics)
+    assert metrics.queries["Table.select"].count == 2
+    get_metrics.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_record_query_async_generator() -> None:
+    get_metrics.cache_clear()
+
+    assert [chunk async for chunk in Table().select_chunks()] == [[1, 2], [3]]
+    assert get_metrics().queries["Table.select_chunks"].count == 1
+    get_metrics.cache_clear()
+
+
+def test_report_caches() -> None:
+    pool = MagicMock()
+    pool.get_stats.return_value = {"pool_size": 1}
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60)
+    cache.set("key", 1)
+    cache.get("key")
+    cache.get("missing")
+
+    report = Metrics().report(pool, caches={"users": cache})
+
+    assert report["caches"] == {
+        "users": {"size": 1, "maxsize": 10, "hits": 1, "misses": 1}
+    }
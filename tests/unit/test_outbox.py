@@ -0,0 +1,91 @@
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncGenerator
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from psycopg import AsyncConnection
+
+from api.outbox import EmailOutboxWorker, RateLimiter
+from api.repositories.email_outbox import EmailOutboxRow, EmailOutboxTable
+
+
+def _email_row(attempts: int = 1) -> EmailOutboxRow:
+    return EmailOutboxRow(
+        id=uuid.uuid4(),
+        created_at=datetime.now(timezone.utc),
+        recipient="test@test.net",
+        kind="confirmation",
+        params={"confirmation_url": "http://test/confirm"},
+        attempts=attempts,
+        next_attempt_at=datetime.now(timezone.utc),
+        last_error=None,
+    )
+
+
+@pytest.fixture
+def outbox_worker() -> EmailOutboxWorker:
+    mock_pool = MagicMock()
+
+    @asynccontextmanager
+    async def connection() -> AsyncGenerator[AsyncMock, None]:
+        yield AsyncMock(spec=AsyncConnection)
+
+    mock_pool.connection = connection
+    return EmailOutboxWorker(
+        mock_pool,
+        batch_size=10,
+        send_rate=1000,
+        max_attempts=3,
+        base_delay=30,
+        max_delay=100,
+        lease=60,
+        poll_interval=0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_drain_once(
+    outbox_worker: EmailOutboxWorker, mock_send_email: MagicMock
+) -> None:
+    sent_email, failed_email = _email_row(), _email_row(attempts=2)
+    mock_send_email.side_effect = [{"MessageId": "id"}, RuntimeError("failed")]
+
+    with (
+        patch.object(
+            EmailOutboxTable, "claim", return_value=[sent_email, failed_email]
+        ),
+        patch.object(EmailOutboxTable, "delete_many") as mock_delete_many,
+        patch.object(EmailOutboxTable, "reschedule") as mock_reschedule,
+    ):
+        assert await outbox_worker.drain_once() == 2
+
+    assert mock_send_email.call_count == 2
+    assert mock_delete_many.call_args.args[1] == [sent_email.id]
+    assert mock_reschedule.call_args.args[1:3] == (failed_email.id, 60)
+
+
+@pytest.mark.asyncio
+async def test_drain_once_empty(
+    outbox_worker: EmailOutboxWorker, mock_send_email: MagicMock
+) -> None:
+    with patch.object(EmailOutboxTable, "claim", return_value=[]):
+        assert await outbox_worker.drain_once() == 0
+
+    mock_send_email.assert_not_called()
+
+
+def test_backoff(outbox_worker: EmailOutboxWorker) -> None:
+    delays = [outbox_worker._get_delay(attempts) for attempts in range(1, 5)]
+    assert delays == [30, 60, 100, 100]
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter() -> None:
+    rate_limiter = RateLimiter(rate=100)
+    start = time.monotonic()
+    await asyncio.gather(*(rate_limiter.acquire() for _ in range(5)))
+    assert time.monotonic() - start >= 0.04
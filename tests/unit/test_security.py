@@ -1,9 +1,69 @@
+import os
+
 import pytest
+from fastapi import HTTPException
 
 from api.repositories.users import UserRow
-from api.security import verify_password
+from api.security import (
+    HashingPool,
+    get_password_hash,
+    get_password_hash_async,
+    verify_password,
+    verify_password_async,
+)
 
 
 @pytest.mark.asyncio
 async def test_verify_password(creds: dict[str, str], registered_user: UserRow) -> None:
     verify_password(creds["password"], registered_user.password_hash)
+
+
+@pytest.mark.asyncio
+async def test_get_password_hash_async(creds: dict[str, str]) -> None:
+    hashed_password = await get_password_hash_async(creds["password"])
+    assert verify_password(creds["password"], hashed_password)
+
+
+@pytest.mark.asyncio
+async def test_verify_password_async(
+    creds: dict[str, str], registered_user: UserRow
+) -> None:
+    assert await verify_password_async(creds["password"], registered_user.password_hash)
+    assert not await verify_password_async("invalid", registered_user.password_hash)
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_full(creds: dict[str, str]) -> None:
+    hashing_pool = HashingPool(workers=1, max_pending=0)
+    with pytest.raises(HTTPException) as exc_info:
+        await hashing_pool.run(get_password_hash, creds["password"])
+
+    assert exc_info.value.status_code == 503
+    hashing_pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_rebuilt(creds: dict[str, str]) -> None:
+    hashing_pool = HashingPool(workers=1, max_pending=1)
+    await hashing_pool.run(get_password_hash, creds["password"])  # start worker
+    broken_executor = hashing_pool.executor
+
+    for process in list(broken_executor._processes.values()):
+        process.kill()
+    hashed_password = await hashing_pool.run(get_password_hash, creds["password"])
+
+    assert verify_password(creds["password"], hashed_password)
+    assert hashing_pool.executor is not broken_executor, "Broken pool not rebuilt."
+    assert hashing_pool.pending == 0
+    hashing_pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_broken(creds: dict[str, str]) -> None:
+    hashing_pool = HashingPool(workers=1, max_pending=1)
+    with pytest.raises(HTTPException) as exc_info:
+        await hashing_pool.run(os._exit, 1)
+
+    assert exc_info.value.status_code == 503
+    assert await hashing_pool.run(get_password_hash, creds["password"])
+    hashing_pool.shutdown()
@@ -0,0 +1,77 @@
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import BaseModel
+from pydantic_core import SchemaSerializer
+
+from api.repositories.locations import LocationRow
+from api.schemas import Location, LocationsResponse
+from api.serializers import (
+    build_fields_schema,
+    dump_locations_ndjson,
+    dump_locations_response,
+)
+
+
+@pytest.fixture
+def location_rows() -> list[LocationRow]:
+    return [
+        LocationRow(
+            id=uuid.uuid4(),
+            created_at=datetime.now(timezone.utc),
+            user_id=uuid.uuid4(),
+            location_name=location_name,
+        )
+        for location_name in ("home", 'chata "U lesa"', "byt\tč. 5\n", "\u0001")
+    ]
+
+
+@pytest.mark.parametrize("next_cursor", [None, "cursor"])
+def test_dump_locations_response(
+    location_rows: list[LocationRow], next_cursor: str | None
+) -> None:
+    response = LocationsResponse(
+        locations=[Location(**loc._asdict()) for loc in location_rows],
+        next_cursor=next_cursor,
+    )
+
+    assert (
+        dump_locations_response(location_rows, next_cursor)
+        == response.model_dump_json().encode()
+    )
+
+
+def test_dump_locations_response_fields(location_rows: list[LocationRow]) -> None:
+    data = json.loads(dump_locations_response(location_rows))
+
+    assert data.keys() == LocationsResponse.model_fields.keys()
+    for location in data["locations"]:
+        assert location.keys() == Location.model_fields.keys()
+
+
+def test_dump_locations_ndjson(location_rows: list[LocationRow]) -> None:
+    assert dump_locations_ndjson(location_rows) == b"".join(
+        Location(**loc._asdict()).model_dump_json().encode() + b"\n"
+        for loc in location_rows
+    )
+
+
+class LocationTree(BaseModel):
+    """Recursive model, its core schema is wrapped in definitions."""
+
+    location: Location
+    children: list["LocationTree"] = []
+
+
+def test_build_fields_schema_definitions(location_rows: list[LocationRow]) -> None:
+    location = Location(**location_rows[0]._asdict())
+    tree = LocationTree(location=location, children=[LocationTree(location=location)])
+    serializer = SchemaSerializer(build_fields_schema(LocationTree))
+
+    assert LocationTree.__pydantic_core_schema__["type"] == "definitions"
+    assert (
+        serializer.to_json({"location": location, "children": tree.children})
+        == tree.model_dump_json().encode()
+    )
@@ -0,0 +1,118 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+from psycopg import AsyncConnection
+
+from api.auth import authenticate_user
+from api.config import ThrottleSettings
+from api.repositories.users import UserRow
+from api.throttle import LoginThrottle, get_login_throttle
+
+
+@pytest.fixture(
+    params=[
+        pytest.param(None, id="in-process"),
+        pytest.param("async+memory://", id="shared storage"),
+    ]
+)
+def login_throttle(request: pytest.FixtureRequest) -> LoginThrottle:
+    return LoginThrottle(
+        maxsize=10,
+        threshold=2,
+        base_delay=60,
+        max_delay=600,
+        window=3600,
+        storage_uri=request.param,
+    )
+
+
+@pytest.mark.asyncio
+async def test_login_throttle_below_threshold(login_throttle: LoginThrottle) -> None:
+    await login_throttle.failure("test@test.net")
+    await login_throttle.check("test@test.net")
+
+
+@pytest.mark.asyncio
+async def test_login_throttle_blocked(login_throttle: LoginThrottle) -> None:
+    for _ in range(2):
+        await login_throttle.failure("test@test.net")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await login_throttle.check("TEST@test.net ")
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers is not None
+    assert 0 < int(exc_info.value.headers["Retry-After"]) <= 60
+    await login_throttle.check("other@test.net")
+
+
+@pytest.mark.asyncio
+async def test_login_throttle_success_resets(login_throttle: LoginThrottle) -> None:
+    for _ in range(2):
+        await login_throttle.failure("test@test.net")
+
+    await login_throttle.success("test@test.net")
+    await login_throttle.check("test@test.net")
+
+
+def test_login_throttle_backoff() -> None:
+    login_throttle = LoginThrottle(
+        maxsize=10, threshold=2, base_delay=1, max_delay=10, window=3600
+    )
+    delays = [login_throttle._get_delay(failures) for failures in range(1, 8)]
+    assert delays == [0, 1, 2, 4, 8, 10, 10]
+
+
+@pytest.mark.asyncio
+async def test_login_throttle_storage_expiry_int() -> None:
+    """Redis EXPIRE rejects non-integer expiry."""
+    throttle_settings = ThrottleSettings(threshold=1)
+    login_throttle = LoginThrottle(
+        maxsize=throttle_settings.maxsize,
+        threshold=throttle_settings.threshold,
+        base_delay=throttle_settings.base_delay,
+        max_delay=throttle_settings.max_delay,
+        window=throttle_settings.window,
+        storage_uri="async+memory://",
+    )
+
+    with patch.object(
+        login_throttle.storage, "incr", wraps=login_throttle.storage.incr
+    ) as mock_incr:
+        await login_throttle.failure("test@test.net")
+
+    assert mock_incr.call_count == 2, "Email not blocked."
+    for call in mock_incr.call_args_list:
+        assert type(call.args[1]) is int
+
+
+@pytest.mark.asyncio
+async def test_login_throttle_maxsize() -> None:
+    login_throttle = LoginThrottle(
+        maxsize=2, threshold=1, base_delay=60, max_delay=600, window=3600
+    )
+    for email in ("a@test.net", "b@test.net", "c@test.net"):
+        await login_throttle.failure(email)
+
+    assert len(login_throttle.entries) == 2
+    await login_throttle.check("a@test.net")
+
+
+@pytest.mark.asyncio
+async def test_authenticate_user_throttled(
+    creds: dict[str, str], registered_user: UserRow
+) -> None:
+    for _ in range(get_login_throttle().threshold):
+        await get_login_throttle().failure(creds["email"])
+
+    with (
+        patch("api.auth.verify_and_update_password_async") as mock_verify,
+        pytest.raises(HTTPException) as exc_info,
+    ):
+        await authenticate_user(
+            AsyncMock(spec=AsyncConnection), creds["email"], creds["password"]
+        )
+
+    assert exc_info.value.status_code == 429
+    mock_verify.assert_not_called()
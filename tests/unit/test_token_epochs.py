@@ -0,0 +1,38 @@
+import uuid
+
+from api.token_epochs import TokenEpochs
+
+
+def test_token_epochs_is_stale() -> None:
+    token_epochs = TokenEpochs(maxsize=10)
+    user_id = uuid.uuid4()
+    assert not token_epochs.is_stale(user_id, 0), "Unknown user must not be stale."
+
+    token_epochs.set(user_id, 1)
+    assert token_epochs.is_stale(user_id, 0)
+    assert not token_epochs.is_stale(user_id, 1)
+
+
+def test_token_epochs_never_go_backwards() -> None:
+    token_epochs = TokenEpochs(maxsize=10)
+    user_id = uuid.uuid4()
+    token_epochs.set(user_id, 2)
+    token_epochs.set(user_id, 1)
+    assert token_epochs.is_stale(user_id, 1)
+
+
+def test_token_epochs_revoke() -> None:
+    token_epochs = TokenEpochs(maxsize=10)
+    user_id = uuid.uuid4()
+    token_epochs.revoke(user_id)
+    assert token_epochs.is_stale(user_id, 1_000_000)
+
+
+def test_token_epochs_maxsize() -> None:
+    token_epochs = TokenEpochs(maxsize=2)
+    user_ids = [uuid.uuid4() for _ in range(3)]
+    for user_id in user_ids:
+        token_epochs.set(user_id, 1)
+
+    assert len(token_epochs.epochs) == 2
+    assert not token_epochs.is_stale(user_ids[0], 0), "Oldest entry not evicted."
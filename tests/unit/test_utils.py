@@ -0,0 +1,106 @@
+import uuid
+from typing import AsyncGenerator
+
+import pytest
+from psycopg import sql
+
+from api.repositories.locations import locations_table
+from api.repositories.users import users_table
+from api.utils import (
+    Query,
+    build_column_list,
+    build_set_clause,
+    compile_query,
+    decode_cursor,
+    encode_cursor,
+    log_async_func,
+)
+
+
+def test_compile_query() -> None:
+    query = compile_query(
+        sql.SQL("""
+            SELECT * FROM {table}
+            WHERE id = %(id)s;
+        """).format(table=sql.Identifier("users"))
+    )
+
+    assert query.sql.split() == b'SELECT * FROM "users" WHERE id = %(id)s;'.split()
+    assert query.log == ' SELECT * FROM "users" WHERE id = %(id)s; '
+
+
+def test_build_set_clause_memoized() -> None:
+    set_clause = build_set_clause(frozenset(["password_hash", "email"]))
+
+    assert set_clause is build_set_clause(frozenset(["email", "password_hash"]))
+    assert (
+        sql.as_string(set_clause)
+        == '"email" = %(email)s, "password_hash" = %(password_hash)s'
+    )
+
+
+def test_build_column_list() -> None:
+    columns = build_column_list(("id", "confirmed"))
+
+    assert columns is build_column_list(("id", "confirmed"))
+    assert sql.as_string(columns) == '"id", "confirmed"'
+    assert sql.as_string(build_column_list(("id",), "locations")) == '"locations"."id"'
+
+
+def test_update_query_compiled_per_columns() -> None:
+    query = users_table.get_update_query(frozenset({"email": 1, "password_hash": 2}))
+
+    assert query is users_table.get_update_query(
+        frozenset({"password_hash": 2, "email": 1})
+    )
+    assert query is not users_table.get_update_query(frozenset({"email": 1}))
+    assert b"token_epoch = token_epoch + 1" in query.sql
+    assert b'"location_name" = %(location_name)s' in (
+        locations_table.get_update_if_confirmed_query(frozenset(["location_name"])).sql
+    )
+
+
+def test_cursor_roundtrip() -> None:
+    last_id = uuid.uuid4()
+    cursor = encode_cursor(last_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == last_id
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "!!!", "AAAA"])
+def test_decode_invalid_cursor(cursor: str) -> None:
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.asyncio
+async def test_log_async_func_async_generator() -> None:
+    log_messages: list[str] = []
+
+    @log_async_func(log_messages.append)
+    async def select_chunks() -> AsyncGenerator[list[int], None]:
+        yield [1, 2]
+        yield [3]
+
+    assert [chunk async for chunk in select_chunks()] == [[1, 2], [3]]
+    assert log_messages == [
+        "select_chunks() was called.",
+        "select_chunks() finished.",
+    ]
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        locations_table.insert_if_confirmed_query,
+        locations_table.delete_if_confirmed_query,
+        locations_table.select_first_page_if_confirmed_query,
+        locations_table.select_next_page_if_confirmed_query,
+        locations_table.get_update_if_confirmed_query(frozenset(["location_name"])),
+    ],
+)
+def test_guarded_query_filters_by_user_id(query: Query) -> None:
+    # filtering through the CTE loses the (user_id, id) index for keyset pages
+    assert b"IN (SELECT id FROM confirmed_user)" not in query.sql
+    assert b"EXISTS (SELECT 1 FROM confirmed_user)" in query.sql